@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import subprocess
+import importlib
 import sys
 import webbrowser
 
@@ -16,35 +16,33 @@ def set_style():
     style.configure('TLabel', font=('Helvetica', 12), background='#f0f0f0')
     style.configure('TFrame', background='#f0f0f0')
 
-def launch_edit_xml():
+# Run a tool's GUI inside this process. The tool module (and whatever heavy libraries it needs) is only
+# imported the first time its button is pressed, and importing it again is free, so there is no new
+# Python interpreter to start on every click. The tool is given the menu's window as parent and opens
+# Toplevel windows of it, so everything shares the menu's one Tk root and event loop.
+def run_tool(module_name, function_name, parent):
     try:
-        subprocess.run(['python', 'metadata_edit.py'], check=True)
+        module = importlib.import_module(module_name)
+        getattr(module, function_name)(parent)
+    except SystemExit:
+        pass  # The extractor calls sys.exit() when its directory dialog is cancelled; that should not close the menu
     except Exception as e:
-        messagebox.showerror("Error", f"Failed to launch metadata_edit.py: {e}")
+        messagebox.showerror("Error", f"Failed to launch {module_name}.py: {e}")
 
-def launch_metadata_extractor():
-    try:
-        subprocess.run(['python', 'metadata_extractor_main.py'], check=True)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to launch metadata_extractor_main.py: {e}")
-        
-def launch_folder_tree():
-    try:
-        subprocess.run(['python', 'metadata_foldertree.py'], check=True)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to launch metadata_foldertree.py: {e}")
+def launch_edit_xml(parent):
+    run_tool('metadata_edit', 'main_edit_function', parent)
 
-def launch_project_geophys():
-    try:
-        subprocess.run(['python', 'project_folder_geophys.py'], check=True)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to launch project_folder_geophys.py: {e}")
+def launch_metadata_extractor(parent):
+    run_tool('metadata_extractor_main', 'main', parent)
 
-def launch_project_archaeology():
-    try:
-        subprocess.run(['python', 'project_folder_archaeology.py'], check=True)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to launch project_folder_archaeology.py: {e}")
+def launch_folder_tree(parent):
+    run_tool('metadata_foldertree', 'generate_folder_tree', parent)
+
+def launch_project_geophys(parent):
+    run_tool('project_folder_geophys', 'main', parent)
+
+def launch_project_archaeology(parent):
+    run_tool('project_folder_archaeology', 'main', parent)
 
 def exit_application():
     if messagebox.askokcancel("Exit", "Are you sure you want to exit?"):
@@ -75,19 +73,19 @@ def main():
     description_label.pack(pady=10, fill=tk.X)
     description_label.bind('<Configure>', configure_label)  # Bind the configure event to the label
 
-    btn_metadata_extractor = ttk.Button(frame, text="Launch Metadata Extractor", command=launch_metadata_extractor)
+    btn_metadata_extractor = ttk.Button(frame, text="Launch Metadata Extractor", command=lambda: launch_metadata_extractor(root))
     btn_metadata_extractor.pack(pady=10, fill=tk.X)
 
-    btn_edit_xml = ttk.Button(frame, text="Edit an XML Metadata file", command=launch_edit_xml)
+    btn_edit_xml = ttk.Button(frame, text="Edit an XML Metadata file", command=lambda: launch_edit_xml(root))
     btn_edit_xml.pack(pady=10, fill=tk.X)
     
-    btn_folder_tree = ttk.Button(frame, text="Create a Folder Tree file", command=launch_folder_tree)
+    btn_folder_tree = ttk.Button(frame, text="Create a Folder Tree file", command=lambda: launch_folder_tree(root))
     btn_folder_tree.pack(pady=10, fill=tk.X)
 
-    btn_folder_geophys = ttk.Button(frame, text="Create a new geophysics project directory", command=launch_project_geophys)
+    btn_folder_geophys = ttk.Button(frame, text="Create a new geophysics project directory", command=lambda: launch_project_geophys(root))
     btn_folder_geophys.pack(pady=10, fill=tk.X)
 
-    btn_folder_project = ttk.Button(frame, text="Create a new archaeology project directory", command=launch_project_archaeology)
+    btn_folder_project = ttk.Button(frame, text="Create a new archaeology project directory", command=lambda: launch_project_archaeology(root))
     btn_folder_project.pack(pady=10, fill=tk.X)
 
     btn_exit = ttk.Button(frame, text="Exit", command=exit_application)
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+# The benchmarks live one level below the scripts they measure
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import metadata_extractor_main as extractor
+from metadata_scanner import scan_directory
+from config_performance import CACHE_FILE_NAME
+from synthetic_project import ensure_project, TEMPLATES
+
+##################
+##################
+######
+###### Benchmark harness
+######
+##################
+##################
+
+DEFAULT_SCALES = [10000, 100000]
+ALL_SCALES = [10000, 100000, 1000000]
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Each extractor stage: name -> function(project_dir, inventory) returning an iterator of (record, metadata)
+EXTRACTOR_STAGES = {
+    'image': lambda project, inventory: extractor.ImageMetadataExtractor().iter_image_metadata(project, inventory),
+    'geospatial': lambda project, inventory: extractor.GeospatialMetadataExtractor().iter_geospatial_metadata(project, inventory),
+    'other': lambda project, inventory: extractor.OtherMetadataExtractor().iter_other_metadata(project, inventory),
+    'model': lambda project, inventory: extractor.ThreeDimensionalModelMetadataExtractor().iter_model_metadata(project, inventory),
+    'control_point': lambda project, inventory: extractor.ControlPointMetadataExtractor().iter_control_point_metadata(project, inventory),
+    'geophysics': lambda project, inventory: extractor.GeophysicsMetadataExtractor().iter_geophysics_metadata(project, inventory),
+}
+STAGES = ['scan'] + list(EXTRACTOR_STAGES) + ['folder_tree', 'end_to_end_cold', 'end_to_end_warm', 'end_to_end_async']
+
+def remove_cache(project_dir):
+    cache_path = os.path.join(project_dir, CACHE_FILE_NAME)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+# Run one stage once and return (seconds, items handled)
+def time_stage(stage, project_dir, output_dir, inventory):
+    start = time.perf_counter()
+    if stage == 'scan':
+        items = len(scan_directory(project_dir).files)
+    elif stage in EXTRACTOR_STAGES:
+        items = sum(1 for _ in EXTRACTOR_STAGES[stage](project_dir, inventory))
+    elif stage == 'folder_tree':
+        extractor.write_folder_tree_xml(project_dir, os.path.join(output_dir, 'METADATA_FolderTree.xml'), inventory)
+        items = len(inventory.folders)
+    elif stage == 'end_to_end_cold':
+        remove_cache(project_dir)
+        extractor.run_extraction(project_dir, output_dir=output_dir, use_cache=False)
+        items = len(inventory.files)
+    elif stage == 'end_to_end_async':
+        remove_cache(project_dir)
+        extractor.run_extraction(project_dir, output_dir=output_dir, use_cache=False, async_io=True)
+        items = len(inventory.files)
+    elif stage == 'end_to_end_warm':
+        # Fill the cache outside the timed region, then time a run where nothing has changed
+        remove_cache(project_dir)
+        extractor.run_extraction(project_dir, output_dir=output_dir, use_cache=True)
+        start = time.perf_counter()
+        extractor.run_extraction(project_dir, output_dir=output_dir, use_cache=True)
+        items = len(inventory.files)
+    return time.perf_counter() - start, items
+
+def run_scale(scale, args):
+    project_dir = os.path.join(args.work_dir, f"{args.template}_{scale}")
+    output_dir = os.path.join(args.work_dir, f"{args.template}_{scale}_output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"Preparing {scale} file {args.template} project in {project_dir}")
+    start = time.perf_counter()
+    summary = ensure_project(project_dir, scale, args.template, args.seed, args.image_size, args.files_per_folder)
+    print(f"  ready in {time.perf_counter() - start:.1f}s: {summary['files']} files, {summary['bytes'] / 1e6:.1f} MB")
+
+    inventory = scan_directory(project_dir)
+    results = {'files': summary['files'], 'bytes': summary['bytes'], 'stages': {}}
+    for stage in args.stages:
+        timings = []
+        for _ in range(args.repeat):
+            seconds, items = time_stage(stage, project_dir, output_dir, inventory)
+            timings.append(seconds)
+        results['stages'][stage] = {
+            'items': items,
+            'best_seconds': round(min(timings), 4),
+            'median_seconds': round(statistics.median(timings), 4),
+            'files_per_second': round(summary['files'] / min(timings), 1) if min(timings) > 0 else None,
+        }
+        print(f"  {stage:<18} {min(timings):>9.3f}s best of {args.repeat}  ({items} items)")
+
+    remove_cache(project_dir)
+    if args.clean:
+        shutil.rmtree(project_dir)
+        os.remove(project_dir + '.json')
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+# Print each stage against the baseline; returns the stages slower than allowed
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['environment'].get('timestamp', '?')} "
+          f"(commit {baseline['environment'].get('commit', '?')}):")
+    for scale, scale_results in results['scales'].items():
+        baseline_stages = baseline['scales'].get(scale, {}).get('stages', {})
+        for stage, timing in scale_results['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            before, after = baseline_stages[stage]['best_seconds'], timing['best_seconds']
+            ratio = after / before if before > 0 else float('inf')
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  SLOWER'
+                regressions.append((scale, stage, ratio))
+            elif ratio < 1 - threshold:
+                flag = '  faster'
+            print(f"  {scale:>8} {stage:<18} {before:>9.3f}s -> {after:>9.3f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Time the extractors, folder tree and full runs on synthetic projects.")
+    parser.add_argument('--scales', type=lambda value: [int(scale) for scale in value.split(',')], default=DEFAULT_SCALES,
+                        help="Comma-separated file counts (default: 10000,100000)")
+    parser.add_argument('--full', action='store_true', help="Run 10k, 100k and 1M files")
+    parser.add_argument('--template', choices=TEMPLATES, default='archaeology')
+    parser.add_argument('--stages', type=lambda value: value.split(','), default=STAGES,
+                        help=f"Comma-separated stages (default: all of {','.join(STAGES)})")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the best time is reported (default: 3)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--image-size', type=int, default=64)
+    parser.add_argument('--files-per-folder', type=int, default=500)
+    parser.add_argument('--work-dir', default=os.path.join(REPO_DIR, 'benchmark_projects'),
+                        help="Where synthetic projects are generated")
+    parser.add_argument('--clean', action='store_true',
+                        help="Delete the generated projects afterwards (by default they are reused by the next run)")
+    parser.add_argument('--output', metavar='FILE', help="Write the results as JSON")
+    parser.add_argument('--save-baseline', metavar='NAME', help=f"Store the results as {BASELINE_DIR}/NAME.json")
+    parser.add_argument('--compare', metavar='FILE_OR_NAME', help="Compare with a results file or a saved baseline name")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10)")
+    return parser
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    if args.full:
+        args.scales = ALL_SCALES
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    results = {'environment': environment(), 'template': args.template, 'scales': {}}
+    for scale in args.scales:
+        results['scales'][str(scale)] = run_scale(scale, args)
+
+    for path in filter(None, [args.output, args.save_baseline and os.path.join(BASELINE_DIR, args.save_baseline + '.json')]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.compare:
+        baseline_path = args.compare if os.path.exists(args.compare) else os.path.join(BASELINE_DIR, args.compare + '.json')
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
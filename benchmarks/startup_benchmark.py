@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# The benchmarks live one level below the scripts they measure
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+##################
+##################
+######
+###### Startup (import-time) benchmark
+######
+##################
+##################
+
+# The modules a user starts: the GUI tools, the menu and the command-line entry points
+ENTRY_MODULES = [
+    'MainMenu',
+    'metadata_extractor_main',
+    'metadata_extractor_cli',
+    'metadata_batch',
+    'metadata_fixity',
+    'metadata_watch',
+    'metadata_edit',
+    'metadata_foldertree',
+    'project_folder_archaeology',
+    'project_folder_geophys',
+]
+
+# Libraries that must not be loaded until an extractor finds files that need them
+HEAVY_MODULES = ['rasterio', 'geopandas', 'pandas', 'shapely', 'pyproj', 'fiona', 'PIL', 'numpy']
+
+DEFAULT_BUDGET_MS = 300
+
+# Imports the module in a fresh interpreter and prints the import time and the heavy modules it loaded
+IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+def run_python(args):
+    return subprocess.run([sys.executable] + args, cwd=REPO_DIR, capture_output=True, text=True)
+
+def time_import(module):
+    result = run_python(['-c', IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)])
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+# Imports from python -X importtime as (cumulative microseconds, name)
+def import_times(code):
+    result = run_python(['-X', 'importtime', '-c', code])
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        imports.append((int(cumulative), name))
+    return imports
+
+# The slowest imports below the module, leaving out the ones every interpreter makes at startup
+def top_imports(module, count, startup_imports):
+    imports = sorted((cumulative, name) for cumulative, name in import_times(f'import {module}')
+                     if name != module and name not in startup_imports)
+    return [(name, cumulative / 1000) for cumulative, name in reversed(imports)][:count]
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Time how long each entry point takes to import in a fresh interpreter.")
+    parser.add_argument('--modules', type=lambda value: value.split(','), default=ENTRY_MODULES,
+                        help=f"Comma-separated modules (default: {','.join(ENTRY_MODULES)})")
+    parser.add_argument('--repeat', type=int, default=5, help="Imports per module; the best time is reported (default: 5)")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Import-time budget per module in ms (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument('--top', type=int, default=5, help="Show the slowest imports of each module (default: 5, 0 to skip)")
+    parser.add_argument('--output', metavar='FILE', help="Write the results as JSON")
+    return parser
+
+def main(argv=None):
+    args = build_argument_parser().parse_args(argv)
+    results = {}
+    failures = []
+    startup_imports = {name for _, name in import_times('pass')}
+
+    for module in args.modules:
+        timings = []
+        loaded = []
+        error = None
+        for _ in range(args.repeat):
+            timing, error = time_import(module)
+            if timing is None:
+                break
+            timings.append(timing['seconds'])
+            loaded = timing['loaded']
+        if error is not None:
+            print(f"  {module:<28} import failed: {error}")
+            failures.append(f"{module} does not import")
+            continue
+
+        best_ms = min(timings) * 1000
+        flag = ''
+        if best_ms > args.budget:
+            flag = '  OVER BUDGET'
+            failures.append(f"{module} takes {best_ms:.0f} ms (budget {args.budget:.0f} ms)")
+        if loaded:
+            flag += f"  loads {', '.join(loaded)}"
+            failures.append(f"{module} loads {', '.join(loaded)} at import")
+        print(f"  {module:<28} {best_ms:>8.1f} ms best of {args.repeat}{flag}")
+
+        slowest = top_imports(module, args.top, startup_imports) if args.top > 0 else []
+        for name, milliseconds in slowest:
+            print(f"      {milliseconds:>8.1f} ms  {name}")
+        results[module] = {'best_ms': best_ms, 'heavy_modules_loaded': loaded, 'slowest_imports': slowest}
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'budget_ms': args.budget, 'python': sys.version.split()[0], 'modules': results}, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,514 @@
+import json
+import math
+import os
+import random
+import struct
+import sys
+import zlib
+
+# The benchmarks live one level below the scripts they measure
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_folder_archaeology import directory_structure
+from project_folder_geophys import geophys_project_structure, create_directories
+
+##################
+##################
+######
+###### Synthetic project trees for benchmarking
+######
+##################
+##################
+
+# Every file is a small but real instance of its format, written without PIL, GDAL or geopandas,
+# so the same tree can be generated anywhere. Generation is deterministic for a given seed.
+
+BNG_WKT = ('PROJCS["OSGB 1936 / British National Grid",GEOGCS["OSGB 1936",DATUM["OSGB_1936",'
+           'SPHEROID["Airy 1830",6377563.396,299.3249646]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433]],'
+           'PROJECTION["Transverse_Mercator"],PARAMETER["latitude_of_origin",49],PARAMETER["central_meridian",-2],'
+           'PARAMETER["scale_factor",0.9996012717],PARAMETER["false_easting",400000],PARAMETER["false_northing",-100000],'
+           'UNIT["metre",1]]')
+BNG_EPSG = 27700
+SITE_ORIGIN = (412000.0, 287000.0)  # Somewhere in the English Midlands, in BNG metres
+
+######
+###### Raster formats
+######
+
+TIFF_SHORT, TIFF_LONG, TIFF_RATIONAL, TIFF_DOUBLE = 3, 4, 5, 12
+TIFF_TYPE_FORMATS = {TIFF_SHORT: 'H', TIFF_LONG: 'I', TIFF_RATIONAL: 'II', TIFF_DOUBLE: 'd'}
+
+# Uncompressed single-strip little-endian TIFF. geo=(origin_x, origin_y, pixel_size) adds GeoTIFF tags in BNG.
+def tiff_bytes(width, height, samples=1, dpi=300, geo=None, seed=0):
+    pixels = bytes((x * 7 + y * 3 + seed) & 0xFF for y in range(height) for x in range(width) for _ in range(samples))
+    tags = [
+        (256, TIFF_LONG, [width]),
+        (257, TIFF_LONG, [height]),
+        (258, TIFF_SHORT, [8] * samples),
+        (259, TIFF_SHORT, [1]),
+        (262, TIFF_SHORT, [2 if samples == 3 else 1]),
+        (273, TIFF_LONG, [0]),  # Strip offset, filled in below
+        (277, TIFF_SHORT, [samples]),
+        (278, TIFF_LONG, [height]),
+        (279, TIFF_LONG, [len(pixels)]),
+        (282, TIFF_RATIONAL, [dpi, 1]),
+        (283, TIFF_RATIONAL, [dpi, 1]),
+        (296, TIFF_SHORT, [2]),
+    ]
+    if geo is not None:
+        origin_x, origin_y, pixel_size = geo
+        tags += [
+            (33550, TIFF_DOUBLE, [pixel_size, pixel_size, 0.0]),
+            (33922, TIFF_DOUBLE, [0.0, 0.0, 0.0, origin_x, origin_y, 0.0]),
+            # GeoKey directory: projected, pixel-is-area, British National Grid
+            (34735, TIFF_SHORT, [1, 1, 0, 3, 1024, 0, 1, 1, 1025, 0, 1, 1, 3072, 0, 1, BNG_EPSG]),
+        ]
+
+    ifd_offset = 8
+    ifd_size = 2 + 12 * len(tags) + 4
+    extra_offset = ifd_offset + ifd_size
+    entries, extra = b'', b''
+    values_by_tag = {}
+    for tag, value_type, values in tags:
+        count = len(values) // 2 if value_type == TIFF_RATIONAL else len(values)
+        data = struct.pack('<' + TIFF_TYPE_FORMATS[value_type][0] * len(values), *values)
+        if len(data) <= 4:
+            entries += struct.pack('<HHI', tag, value_type, count) + data.ljust(4, b'\x00')
+        else:
+            values_by_tag[tag] = len(entries)
+            entries += struct.pack('<HHII', tag, value_type, count, extra_offset + len(extra))
+            extra += data + (b'\x00' if len(data) % 2 else b'')
+    strip_offset = extra_offset + len(extra)
+    # Patch the strip offset now that the layout is known
+    strip_entry = [index for index, (tag, _, _) in enumerate(tags) if tag == 273][0] * 12
+    entries = entries[:strip_entry + 8] + struct.pack('<I', strip_offset) + entries[strip_entry + 12:]
+    return b'II*\x00' + struct.pack('<I', ifd_offset) + struct.pack('<H', len(tags)) + entries + b'\x00\x00\x00\x00' + extra + pixels
+
+def _png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+
+# 8-bit RGB PNG with a pHYs chunk
+def png_bytes(width, height, dpi=300, seed=0):
+    rows = b''.join(b'\x00' + bytes((x * 5 + y + seed + channel * 40) & 0xFF for x in range(width) for channel in range(3))
+                    for y in range(height))
+    pixels_per_metre = int(round(dpi / 0.0254))
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + _png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1))
+            + _png_chunk(b'IDAT', zlib.compress(rows))
+            + _png_chunk(b'IEND', b''))
+
+# Baseline greyscale JPEG of a flat mid-grey image. Each Huffman table holds a single one-bit
+# code for symbol 0, so every 8x8 block is two zero bits (DC difference 0, then end of block).
+def jpeg_bytes(width, height, dpi=300):
+    def segment(marker, payload):
+        return b'\xff' + marker + struct.pack('>H', len(payload) + 2) + payload
+
+    single_code_table = bytes([1] + [0] * 15) + b'\x00'
+    blocks = math.ceil(width / 8) * math.ceil(height / 8)
+    bits = '00' * blocks
+    bits += '1' * (-len(bits) % 8)  # Pad the last byte with ones
+    scan_data = bytes(int(bits[i:i + 8], 2) for i in range(0, len(bits), 8))
+    return (b'\xff\xd8'
+            + segment(b'\xe0', b'JFIF\x00\x01\x01\x01' + struct.pack('>HH', dpi, dpi) + b'\x00\x00')
+            + segment(b'\xdb', b'\x00' + bytes([1] * 64))
+            + segment(b'\xc0', struct.pack('>BHHB', 8, height, width, 1) + b'\x01\x11\x00')
+            + segment(b'\xc4', b'\x00' + single_code_table)
+            + segment(b'\xc4', b'\x10' + single_code_table)
+            + segment(b'\xda', b'\x01\x01\x00\x00\x3f\x00')
+            + scan_data + b'\xff\xd9')
+
+######
+###### Vector formats
+######
+
+SHP_POINT, SHP_POLYGON, SHP_POINTZ = 1, 5, 11
+
+def _shp_header(shape_type, file_length_bytes, bbox, z_range=(0.0, 0.0)):
+    return (struct.pack('>7i', 9994, 0, 0, 0, 0, 0, file_length_bytes // 2)
+            + struct.pack('<2i', 1000, shape_type)
+            + struct.pack('<8d', bbox[0], bbox[1], bbox[2], bbox[3], z_range[0], z_range[1], 0.0, 0.0))
+
+def _shp_record_content(shape_type, geometry):
+    if shape_type == SHP_POINT:
+        return struct.pack('<i2d', shape_type, *geometry)
+    if shape_type == SHP_POINTZ:
+        return struct.pack('<i4d', shape_type, geometry[0], geometry[1], geometry[2], 0.0)
+    # Polygon: a single closed ring
+    xs, ys = [point[0] for point in geometry], [point[1] for point in geometry]
+    return (struct.pack('<i4d2i', shape_type, min(xs), min(ys), max(xs), max(ys), 1, len(geometry))
+            + struct.pack('<i', 0)
+            + b''.join(struct.pack('<2d', x, y) for x, y in geometry))
+
+# dBASE III table; fields are (name, type, length, decimals) and rows are lists of values
+def dbf_bytes(fields, rows):
+    record_length = 1 + sum(length for _, _, length, _ in fields)
+    header_length = 32 + 32 * len(fields) + 1
+    header = struct.pack('<BBBBIHH20x', 3, 124, 1, 1, len(rows), header_length, record_length)
+    descriptors = b''.join(struct.pack('<11sc4xBB14x', name.encode('ascii'), field_type.encode('ascii'), length, decimals)
+                           for name, field_type, length, decimals in fields)
+    records = b''
+    for row in rows:
+        records += b' '
+        for (_, field_type, length, decimals), value in zip(fields, row):
+            text = f"{value:.{decimals}f}" if field_type == 'N' and decimals else str(value)
+            records += (text.rjust(length) if field_type == 'N' else text.ljust(length))[:length].encode('latin-1')
+    return header + descriptors + b'\x0d' + records + b'\x1a'
+
+# Returns {extension: bytes} for a .shp/.shx/.dbf/.prj set
+def shapefile_set(shape_type, geometries, fields, rows):
+    contents = [_shp_record_content(shape_type, geometry) for geometry in geometries]
+    if shape_type == SHP_POLYGON:
+        points = [point for geometry in geometries for point in geometry]
+    else:
+        points = geometries
+    bbox = (min(p[0] for p in points), min(p[1] for p in points), max(p[0] for p in points), max(p[1] for p in points))
+    z_range = (min(p[2] for p in points), max(p[2] for p in points)) if shape_type == SHP_POINTZ else (0.0, 0.0)
+
+    shp_records, shx_records, offset = b'', b'', 100
+    for number, content in enumerate(contents, 1):
+        shp_records += struct.pack('>2i', number, len(content) // 2) + content
+        shx_records += struct.pack('>2i', offset // 2, len(content) // 2)
+        offset += 8 + len(content)
+    return {
+        '.shp': _shp_header(shape_type, 100 + len(shp_records), bbox, z_range) + shp_records,
+        '.shx': _shp_header(shape_type, 100 + len(shx_records), bbox, z_range) + shx_records,
+        '.dbf': dbf_bytes(fields, rows),
+        '.prj': BNG_WKT.encode('ascii'),
+    }
+
+######
+###### 3D and geophysics formats
+######
+
+# A triangulated height field: (vertices, triangles)
+def _grid_mesh(size, rng):
+    vertices = [(x * 0.1, y * 0.1, rng.uniform(0, 0.5)) for y in range(size) for x in range(size)]
+    triangles = []
+    for y in range(size - 1):
+        for x in range(size - 1):
+            a = y * size + x
+            triangles += [(a, a + 1, a + size), (a + 1, a + size + 1, a + size)]
+    return vertices, triangles
+
+def obj_files(stem, rng, size=12):
+    vertices, triangles = _grid_mesh(size, rng)
+    lines = [f"mtllib {stem}.mtl", f"o {stem}"]
+    lines += [f"v {x:.4f} {y:.4f} {z:.4f}" for x, y, z in vertices]
+    lines += [f"vt {(i % size) / size:.4f} {(i // size) / size:.4f}" for i in range(len(vertices))]
+    lines += ["usemtl stone", "s 1"]
+    lines += [f"f {a + 1}/{a + 1} {b + 1}/{b + 1} {c + 1}/{c + 1}" for a, b, c in triangles]
+    mtl = "\n".join(["newmtl stone", "Ka 1.000 1.000 1.000", "Kd 0.640 0.600 0.550", "Ks 0.100 0.100 0.100",
+                     "Ns 10.0", f"map_Kd {stem}_texture.jpg", ""])
+    return {'.obj': ("\n".join(lines) + "\n").encode('ascii'), '.mtl': mtl.encode('ascii')}
+
+def stl_bytes(rng, size=12):
+    vertices, triangles = _grid_mesh(size, rng)
+    body = b''.join(struct.pack('<12fH', 0.0, 0.0, 1.0, *vertices[a], *vertices[b], *vertices[c], 0) for a, b, c in triangles)
+    return b'synthetic terrain'.ljust(80, b' ') + struct.pack('<I', len(triangles)) + body
+
+def pts_bytes(rng, points=500):
+    origin_x, origin_y = SITE_ORIGIN
+    lines = [str(points)]
+    for _ in range(points):
+        lines.append(f"{origin_x + rng.uniform(0, 50):.3f} {origin_y + rng.uniform(0, 50):.3f} {rng.uniform(80, 90):.3f} "
+                     f"{rng.randint(-2048, 2047)} {rng.randint(0, 255)} {rng.randint(0, 255)} {rng.randint(0, 255)}")
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+GEOPHYSICS_DUMMY = 2047.5
+
+# TerraSurveyor-style grid: an XML header followed by the readings
+def xgd_bytes(rng, grid_size=20, x_interval=0.25, y_interval=1.0):
+    readings = ' '.join(f"{rng.gauss(0, 3):.2f}" if rng.random() > 0.05 else f"{GEOPHYSICS_DUMMY}"
+                        for _ in range(int(grid_size / x_interval) * int(grid_size / y_interval)))
+    return "\n".join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<Grid>',
+        '  <Instrument>Bartington Grad601-2</Instrument>',
+        '  <Method>Magnetometry</Method>',
+        '  <Units>nT</Units>',
+        '  <Sensors>2</Sensors>',
+        f'  <GridSize>{grid_size} x {grid_size}</GridSize>',
+        f'  <XInterval>{x_interval}</XInterval>',
+        f'  <YInterval>{y_interval}</YInterval>',
+        '  <TraverseDirection>North</TraverseDirection>',
+        f'  <DummyValue>{GEOPHYSICS_DUMMY}</DummyValue>',
+        f'  <Data>{readings}</Data>',
+        '</Grid>',
+        '',
+    ]).encode('utf-8')
+
+# TerraSurveyor-style composite header
+def xcp_bytes(rng, grids=(4, 3), grid_size=20):
+    origin_x, origin_y = SITE_ORIGIN
+    width, height = grids[0] * grid_size, grids[1] * grid_size
+    return "\n".join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<Composite>',
+        '  <Instrument>Bartington Grad601-2</Instrument>',
+        '  <Method>Magnetometry</Method>',
+        '  <Units>nT</Units>',
+        '  <Sensors>2</Sensors>',
+        f'  <CompositeSize>{width} x {height}</CompositeSize>',
+        f'  <SurveySize>{width * height} m2</SurveySize>',
+        f'  <GridSize>{grid_size} x {grid_size}</GridSize>',
+        '  <XInterval>0.25</XInterval>',
+        '  <YInterval>1</YInterval>',
+        '  <TraverseDirection>North</TraverseDirection>',
+        f'  <DummyValue>{GEOPHYSICS_DUMMY}</DummyValue>',
+        f'  <NWCoordinate>{origin_x:.2f}, {origin_y + height:.2f}</NWCoordinate>',
+        f'  <SECoordinate>{origin_x + width:.2f}, {origin_y:.2f}</SECoordinate>',
+        f'  <CentralCoordinate>{origin_x + width / 2:.2f}, {origin_y + height / 2:.2f}</CentralCoordinate>',
+        '  <Comments>Synthetic composite</Comments>',
+        '</Composite>',
+        '',
+    ]).encode('utf-8')
+
+# Gridded x y value readings with scattered dummy values
+def xyz_bytes(rng, columns=80, rows=20, x_interval=0.25, y_interval=1.0):
+    origin_x, origin_y = SITE_ORIGIN
+    lines = []
+    for row in range(rows):
+        for column in range(columns):
+            value = GEOPHYSICS_DUMMY if rng.random() < 0.05 else round(rng.gauss(0, 3), 2)
+            lines.append(f"{origin_x + column * x_interval:.3f} {origin_y + row * y_interval:.3f} {value}")
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+######
+###### Control points and documents
+######
+
+def gcp_csv_bytes(rng, points=12):
+    origin_x, origin_y = SITE_ORIGIN
+    lines = ["Label,X,Y,Z,SX,SY,SZ"]
+    for number in range(1, points + 1):
+        lines.append(f"GCP{number:02d},{origin_x + rng.uniform(0, 100):.3f},{origin_y + rng.uniform(0, 100):.3f},"
+                     f"{rng.uniform(80, 95):.3f},{rng.uniform(0.005, 0.02):.4f},{rng.uniform(0.005, 0.02):.4f},{rng.uniform(0.01, 0.04):.4f}")
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+def camera_positions_csv_bytes(rng, cameras=40):
+    origin_x, origin_y = SITE_ORIGIN
+    lines = ["Label,X,Y,Z,Yaw,Pitch,Roll"]
+    for number in range(1, cameras + 1):
+        lines.append(f"DSC{number:05d}.JPG,{origin_x + rng.uniform(0, 100):.3f},{origin_y + rng.uniform(0, 100):.3f},"
+                     f"{rng.uniform(120, 140):.3f},{rng.uniform(0, 360):.2f},{rng.uniform(-5, 5):.2f},{rng.uniform(-5, 5):.2f}")
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+def gcp_shapefile_set(rng, points=12):
+    origin_x, origin_y = SITE_ORIGIN
+    geometries = [(origin_x + rng.uniform(0, 100), origin_y + rng.uniform(0, 100), rng.uniform(80, 95)) for _ in range(points)]
+    fields = [('ID', 'N', 6, 0), ('X', 'N', 12, 3), ('Y', 'N', 12, 3), ('Z', 'N', 9, 3),
+              ('SX', 'N', 8, 4), ('SY', 'N', 8, 4), ('SZ', 'N', 8, 4)]
+    rows = [[number, x, y, z, rng.uniform(0.005, 0.02), rng.uniform(0.005, 0.02), rng.uniform(0.01, 0.04)]
+            for number, (x, y, z) in enumerate(geometries, 1)]
+    return shapefile_set(SHP_POINTZ, geometries, fields, rows)
+
+def feature_shapefile_set(rng, features=20):
+    origin_x, origin_y = SITE_ORIGIN
+    geometries = []
+    for _ in range(features):
+        x, y, size = origin_x + rng.uniform(0, 200), origin_y + rng.uniform(0, 200), rng.uniform(0.5, 5)
+        geometries.append([(x, y), (x, y + size), (x + size, y + size), (x + size, y), (x, y)])
+    fields = [('CONTEXT', 'N', 6, 0), ('TYPE', 'C', 20, 0)]
+    rows = [[1000 + number, rng.choice(['Pit', 'Ditch', 'Posthole', 'Wall'])] for number in range(features)]
+    return shapefile_set(SHP_POLYGON, geometries, fields, rows)
+
+def pdf_bytes(title):
+    content = f"BT /F1 12 Tf 72 720 Td ({title}) Tj ET".encode('ascii')
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+               b"<< /Length " + str(len(content)).encode('ascii') + b" >>\nstream\n" + content + b"\nendstream",
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n".encode('ascii') + obj + b"\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    body += b"".join(f"{offset:010d} 00000 n \n".encode('ascii') for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii')
+    return body
+
+def dxf_bytes(rng):
+    lines = ["0", "SECTION", "2", "ENTITIES"]
+    for _ in range(10):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        lines += ["0", "LINE", "8", "0", "10", f"{x:.3f}", "20", f"{y:.3f}", "11", f"{x + 1:.3f}", "21", f"{y + 1:.3f}"]
+    lines += ["0", "ENDSEC", "0", "EOF"]
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+def text_bytes(rng):
+    words = ['context', 'trench', 'sherd', 'ditch', 'fill', 'cut', 'posthole', 'sample', 'phase', 'layer']
+    return (" ".join(rng.choice(words) for _ in range(200)) + "\n").encode('ascii')
+
+def csv_bytes(rng, rows=50):
+    lines = ["ID,Context,Type,Count"]
+    lines += [f"{number},{rng.randint(1000, 1999)},{rng.choice(['Pottery', 'Bone', 'Flint'])},{rng.randint(1, 40)}" for number in range(rows)]
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+######
+###### File kinds and where they go
+######
+
+# kind -> function(stem, rng, options) returning {file name: bytes}
+def _files(stem, rng, options, kind):
+    size = options['image_size']
+    origin_x, origin_y = SITE_ORIGIN
+    if kind == 'jpg':
+        return {stem + '.jpg': jpeg_bytes(size, size)}
+    if kind == 'tif':
+        return {stem + '.tif': tiff_bytes(size, size, samples=3, seed=rng.randint(0, 255))}
+    if kind == 'png':
+        return {stem + '.png': png_bytes(size, size, seed=rng.randint(0, 255))}
+    if kind == 'geotiff':
+        geo = (origin_x + rng.uniform(0, 500), origin_y + rng.uniform(0, 500), 0.05)
+        return {stem + '.tif': tiff_bytes(size, size, samples=1, geo=geo, seed=rng.randint(0, 255))}
+    if kind == 'comp_png':
+        return {stem + '_COMP_.png': png_bytes(size, size, seed=rng.randint(0, 255))}
+    if kind == 'shapefile':
+        return {stem + extension: data for extension, data in feature_shapefile_set(rng).items()}
+    if kind == 'gcp_shp':
+        return {stem + '_GCP' + extension: data for extension, data in gcp_shapefile_set(rng).items()}
+    if kind == 'gcp_csv':
+        return {stem + '_GCP.csv': gcp_csv_bytes(rng)}
+    if kind == 'camera_csv':
+        return {stem + '_CameraPositions.csv': camera_positions_csv_bytes(rng)}
+    if kind == 'obj':
+        return {stem + extension: data for extension, data in obj_files(stem, rng).items()}
+    if kind == 'stl':
+        return {stem + '.stl': stl_bytes(rng)}
+    if kind == 'pts':
+        return {stem + '.pts': pts_bytes(rng)}
+    if kind == 'xgd':
+        return {stem + '.xgd': xgd_bytes(rng)}
+    if kind == 'xcp':
+        return {stem + '.xcp': xcp_bytes(rng)}
+    if kind == 'xyz':
+        return {stem + '.xyz': xyz_bytes(rng)}
+    if kind == 'pdf':
+        return {stem + '.pdf': pdf_bytes(stem)}
+    if kind == 'dxf':
+        return {stem + '.dxf': dxf_bytes(rng)}
+    if kind == 'csv':
+        return {stem + '.csv': csv_bytes(rng)}
+    return {stem + '.txt': text_bytes(rng)}
+
+PHOTO_CONTENT = [('jpg', 8), ('tif', 1)]
+DOCUMENT_CONTENT = [('txt', 3), ('pdf', 3), ('csv', 2)]
+MODEL_CONTENT = [('obj', 2), ('stl', 2), ('pts', 1), ('png', 1)]
+GEOPHYSICS_CONTENT = [('xgd', 4), ('xyz', 2), ('xcp', 1), ('comp_png', 1), ('geotiff', 1)]
+
+# Leaf folder name -> (relative weight, [(kind, weight)]); unlisted folders hold documents
+FOLDER_CONTENT = {
+    'PHOTOGRAPHY_Objects': (4, PHOTO_CONTENT),
+    'PHOTOGRAPHY_Photogrammetry': (10, [('jpg', 1)]),
+    'PHOTOGRAPHY_Rectified': (2, [('tif', 1)]),
+    'YEAR': (10, PHOTO_CONTENT),
+    'PHOTOGRAPHY_UAV': (8, [('jpg', 1)]),
+    'RASTER_Orthophotos': (3, [('geotiff', 1)]),
+    'RASTER_Surface': (2, [('geotiff', 1)]),
+    'GEODATA_Shapefile': (2, [('shapefile', 1)]),
+    '3D_Recording': (4, [('gcp_csv', 1), ('gcp_shp', 1), ('camera_csv', 1), ('obj', 2), ('pts', 2), ('jpg', 4)]),
+    'PROJECT_BasicModel': (2, MODEL_CONTENT),
+    'PROJECT_TechnicalModel': (2, MODEL_CONTENT),
+    'PROJECT_MaterialLibraries': (1, [('png', 1)]),
+    'ASSETS_Images': (1, [('png', 1), ('jpg', 1)]),
+    'DATA_Working': (3, GEOPHYSICS_CONTENT),
+    'DATA_Preservation': (2, [('xgd', 2), ('xcp', 1)]),
+    'DATA_Rasters': (2, [('comp_png', 2), ('geotiff', 1)]),
+    'DRAWINGS_CAD': (1, [('dxf', 1)]),
+    'DRAWINGS_Scans': (2, [('tif', 1), ('pdf', 1)]),
+    'SURVEY_RAWData': (1, [('csv', 2), ('pts', 1), ('txt', 1)]),
+}
+
+TEMPLATES = ('archaeology', 'geophys')
+
+def template_structure(template):
+    if template == 'geophys':
+        return geophys_project_structure('SITE', 2024, 'SURVEY', 2024)
+    return directory_structure
+
+def leaf_folders(structure, base=''):
+    leaves = []
+    for name, children in structure.items():
+        path = os.path.join(base, name) if base else name
+        if children:
+            leaves.extend(leaf_folders(children, path))
+        else:
+            leaves.append(path)
+    return leaves
+
+def _weighted_choice(rng, choices):
+    total = sum(weight for _, weight in choices)
+    point = rng.uniform(0, total)
+    for item, weight in choices:
+        point -= weight
+        if point <= 0:
+            return item
+    return choices[-1][0]
+
+# Build a synthetic project of about file_count files under root. Files are spread over the
+# template's leaf folders, in BATCH_nnnn subfolders of at most files_per_folder files.
+# Returns a summary with the number of files and bytes written per kind.
+def generate_project(root, file_count, template='archaeology', seed=0, image_size=64, files_per_folder=500):
+    rng = random.Random(seed)
+    structure = template_structure(template)
+    create_directories(root, structure)
+
+    leaves = leaf_folders(structure)
+    leaf_choices = [(leaf, FOLDER_CONTENT.get(os.path.basename(leaf), (1, DOCUMENT_CONTENT))[0]) for leaf in leaves]
+    options = {'image_size': image_size}
+    folder_counts = {}
+    summary = {'files': 0, 'bytes': 0, 'kinds': {}}
+
+    while summary['files'] < file_count:
+        leaf = _weighted_choice(rng, leaf_choices)
+        kind = _weighted_choice(rng, FOLDER_CONTENT.get(os.path.basename(leaf), (1, DOCUMENT_CONTENT))[1])
+
+        count = folder_counts.get(leaf, 0)
+        folder = os.path.join(root, leaf)
+        if files_per_folder and count >= files_per_folder:
+            folder = os.path.join(folder, f"BATCH_{count // files_per_folder:04d}")
+        os.makedirs(folder, exist_ok=True)
+
+        stem = f"{os.path.basename(leaf).split('_')[-1].upper()}_{summary['files']:07d}"
+        for file_name, data in _files(stem, rng, options, kind).items():
+            with open(os.path.join(folder, file_name), 'wb') as f:
+                f.write(data)
+            summary['files'] += 1
+            summary['bytes'] += len(data)
+            folder_counts[leaf] = folder_counts.get(leaf, 0) + 1
+        summary['kinds'][kind] = summary['kinds'].get(kind, 0) + 1
+
+    return summary
+
+# Generate the project unless a matching one is already in place (recorded in a .json next to it)
+def ensure_project(root, file_count, template='archaeology', seed=0, image_size=64, files_per_folder=500):
+    parameters = {'file_count': file_count, 'template': template, 'seed': seed, 'image_size': image_size,
+                  'files_per_folder': files_per_folder}
+    marker_path = root.rstrip(os.sep) + '.json'
+    if os.path.isdir(root) and os.path.exists(marker_path):
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            marker = json.load(f)
+        if marker.get('parameters') == parameters:
+            return marker['summary']
+        raise ValueError(f"{root} was generated with different parameters; remove it or use another --work-dir")
+
+    summary = generate_project(root, **parameters)
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump({'parameters': parameters, 'summary': summary}, f, indent=2)
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a synthetic archaeology or geophysics project tree.")
+    parser.add_argument('root', help="Folder to create the project in")
+    parser.add_argument('--files', type=int, default=10000, help="Approximate number of files (default: 10000)")
+    parser.add_argument('--template', choices=TEMPLATES, default='archaeology')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--image-size', type=int, default=64, help="Width and height of generated images in pixels")
+    parser.add_argument('--files-per-folder', type=int, default=500)
+    args = parser.parse_args()
+    result = generate_project(args.root, args.files, args.template, args.seed, args.image_size, args.files_per_folder)
+    print(f"Wrote {result['files']} files ({result['bytes'] / 1e6:.1f} MB) to {args.root}")
@@ -22,9 +22,13 @@ THREED_FILE_TYPES = ['.obj', '.mtl', '.x3d', '.stl', '.pts']
 # Laser Scanning file types
 LASER_FILE_TYPES = []
 
+# Control point file types (only when the name also contains one of the conditions below)
+CONTROL_POINT_FILE_TYPES = ['.shp', '.csv']
+
 # Excluded directory suffixes
 EXCLUDED_DIRECTORY_SUFFIXES = [".files", ".gdb", ".Overviews"]
 
 # Special condition for file naming conventions
 GEOPHYSICS_COMP_CONDITION = "_COMP_"
 VECTOR_DWG_CONDITION = "_DWG_"
+CONTROL_POINT_CONDITIONS = ["_GCP", "_CameraPositions"]
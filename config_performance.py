@@ -0,0 +1,55 @@
+# Image metadata extraction
+IMAGE_WORKERS = None  # Worker processes for image extraction (None = one per CPU core, 1 = serial)
+IMAGE_CHUNKSIZE = 64  # Images handed to a worker at a time
+IMAGE_PARALLEL_MIN_FILES = 200  # Below this many images the pool start-up cost is not worth paying
+
+# Persistent metadata cache (stored in the project directory)
+USE_METADATA_CACHE = True
+CACHE_FILE_NAME = '.metadata_cache.sqlite'
+
+# GeoTIFF metadata extraction (threads sharing one rasterio.Env)
+GEOTIFF_WORKERS = 8  # Worker threads; GDAL releases the GIL while reading headers (1 = serial)
+GEOTIFF_PARALLEL_MIN_FILES = 16  # Below this many GeoTIFFs the files are read serially
+GDAL_ENV_OPTIONS = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',  # Sidecars are found from the scan, not by GDAL listing the folder
+    'GDAL_CACHEMAX': 64,  # Only headers are read, so a small block cache per run is enough
+}
+GEOTIFF_SIDECAR_EXTENSIONS = ['.tfw', '.tifw', '.aux.xml', '.ovr', '.prj']  # Sidecars GDAL needs to be allowed to find
+
+# Progress reporting (see metadata_progress.py)
+PROGRESS_INTERVAL = 0.5  # Seconds between progress events from a running stage (0 = one per file)
+
+# 3D model statistics (see metadata_model.py)
+MODEL_CHUNK_SIZE = 16 * 1024 * 1024  # Bytes of a mapped OBJ/STL/PTS file processed at a time
+
+# Geophysics files (see metadata_geophysics.py)
+GEOPHYSICS_DUMMY_VALUE = 2047.5  # TerraSurveyor's dummy (no reading) value
+GEOPHYSICS_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes of an .xyz file parsed at a time
+GEOPHYSICS_HEADER_BYTES = 64 * 1024  # Bytes read from the start of an .xgd/.xcp to find its header fields
+
+# Control point statistics (see metadata_control_points.py)
+CONTROL_POINT_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes of a _GCP/_CameraPositions .csv, .shp or .dbf processed at a time
+
+# Asynchronous I/O mode for archives on network shares (see metadata_async.py)
+USE_ASYNC_IO = False  # Keep many stat/listdir/open calls in flight instead of issuing them one after another
+ASYNC_IO_CONCURRENCY = 32  # Metadata probes running at once; raise until the share's IOPS, not its latency, is the limit
+ASYNC_SCAN_CONCURRENCY = 16  # Folders listed at once during the scan
+
+# Content fingerprints and duplicate detection (see metadata_fingerprint.py)
+FINGERPRINT_FILES = False  # Add FILE_CHECKSUM and a Duplicate_Files section to METADATA.xml
+FINGERPRINT_CHECKSUM_ALL = False  # Hash every file in full, not only files that may be duplicates
+FINGERPRINT_ALGORITHM = 'sha256'  # Any hashlib algorithm; 'blake2b' is faster on CPUs without SHA extensions
+FINGERPRINT_PARTIAL_BYTES = 64 * 1024  # Bytes hashed from each end of a file before deciding whether to hash it all
+FINGERPRINT_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes of a mapped file hashed at a time
+FINGERPRINT_WORKERS = None  # Hashing threads (None = one per CPU core, 1 = serial); hashlib releases the GIL while hashing
+FINGERPRINT_PARALLEL_MIN_FILES = 16  # Below this many files they are hashed serially
+FIXITY_MANIFEST = False  # Also write METADATA_Fixity.xml with a checksum for every file (see metadata_fixity.py)
+
+# Incremental merge with an existing METADATA.xml (see metadata_merge.py)
+MERGE_EXISTING_METADATA = False  # Keep curated fields and only re-extract new or changed files
+MERGE_MANUAL_FIELDS = ['FILE_TITLE', 'FILE_DESCRIPTION', 'FILE_KEYWORDS']  # Curated values kept even when re-extraction fills them in
+
+# Watch mode (see metadata_watch.py)
+WATCH_DEBOUNCE_SECONDS = 5  # Wait until no file has changed for this long before updating the XML
+WATCH_MAX_DELAY_SECONDS = 60  # ...but never longer than this after the first change
+WATCH_POLL_INTERVAL = 30  # Seconds between polls where inotify is unavailable
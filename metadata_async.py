@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config_performance import ASYNC_IO_CONCURRENCY, ASYNC_SCAN_CONCURRENCY
+from metadata_scanner import FileInventory, list_folder, add_folder_listing
+
+##################
+##################
+######
+###### Asynchronous I/O pipeline for high-latency (SMB/NFS) shares
+######
+##################
+##################
+
+# On a network share every stat, listdir and open waits for a round trip. The pipeline keeps many of these
+# in flight: an asyncio event loop schedules the blocking calls on a bounded thread pool, with at most
+# ASYNC_SCAN_CONCURRENCY folder listings and ASYNC_IO_CONCURRENCY metadata probes running at once.
+# Results are still delivered in scan order, so the XML is identical to a serial run.
+class AsyncIOPipeline:
+    def __init__(self, io_concurrency=ASYNC_IO_CONCURRENCY, scan_concurrency=ASYNC_SCAN_CONCURRENCY):
+        self.io_concurrency = io_concurrency
+        self.scan_concurrency = scan_concurrency
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=max(io_concurrency, scan_concurrency), thread_name_prefix='metadata-io')
+        self._semaphores = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.executor.shutdown(cancel_futures=True)
+        self.loop.close()
+
+    # Semaphores are created on first use, from inside the pipeline's own event loop
+    def _semaphore(self, kind):
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(self.scan_concurrency if kind == 'scan' else self.io_concurrency)
+        return self._semaphores[kind]
+
+    async def _call(self, kind, function, *args):
+        async with self._semaphore(kind):
+            return await self.loop.run_in_executor(self.executor, function, *args)
+
+    # Drive an async generator from ordinary code, one item at a time. The loop only runs while the
+    # next item is awaited, but calls already handed to the thread pool carry on in between.
+    def _iterate(self, async_iterator):
+        try:
+            while True:
+                try:
+                    yield self.loop.run_until_complete(async_iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.loop.run_until_complete(async_iterator.aclose())
+
+    ######
+    ###### Extraction: a drop-in for Executor.map
+    ######
+
+    # Yield function(item) for each item in order while keeping up to io_concurrency calls running.
+    # At most twice that many results are held, so a slow file never stalls the others or fills memory.
+    def map(self, function, iterable, chunksize=1):  # chunksize is accepted for Executor.map compatibility
+        return self._iterate(self._map(function, iterable))
+
+    async def _map(self, function, iterable):
+        pending = deque()
+        try:
+            for item in iterable:
+                pending.append(self.loop.create_task(self._call('io', function, item)))
+                if len(pending) >= 2 * self.io_concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    ######
+    ###### Scan
+    ######
+
+    # The same inventory as metadata_scanner.scan_directory, in the same order. Every folder's subfolders
+    # are queued for listing as soon as it has been read, and the results are added depth first.
+    def scan_directory(self, start_dir, apply_exclusions=True, progress=None):
+        return self.loop.run_until_complete(self._scan_directory(start_dir, apply_exclusions, progress))
+
+    async def _scan_directory(self, start_dir, apply_exclusions, progress):
+        inventory = FileInventory(start_dir)
+        listings = {start_dir: self.loop.create_task(self._call('scan', list_folder, start_dir, apply_exclusions))}
+        stack = [start_dir]
+        discovered_bytes = 0
+        try:
+            while stack:
+                folder_path = stack.pop()
+                entries, subdirs, records = await listings.pop(folder_path)
+                discovered_bytes += add_folder_listing(inventory, folder_path, entries, subdirs, records)
+                for subdir in subdirs:
+                    listings[subdir] = self.loop.create_task(self._call('scan', list_folder, subdir, apply_exclusions))
+                stack.extend(reversed(subdirs))
+
+                if progress is not None:
+                    progress.discovered(len(inventory.files), len(inventory.folders), discovered_bytes)
+        finally:
+            for task in listings.values():
+                task.cancel()
+        return inventory
@@ -0,0 +1,215 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Heavy libraries (rasterio, geopandas, PIL) are loaded by the first project that needs them, then shared by the rest
+import metadata_extractor_main as extractor
+from metadata_extractor_cli import build_project_metadata, positive_int, add_async_io_arguments, add_fingerprint_arguments
+from metadata_scanner import scan_directory
+from metadata_progress import PROGRESS_SINKS, build_progress_reporter
+from metadata_profile import Profiler
+from config_performance import IMAGE_WORKERS, GEOTIFF_WORKERS, USE_METADATA_CACHE, MERGE_EXISTING_METADATA
+
+##################
+##################
+######
+###### Batch extraction over many project folders
+######
+##################
+##################
+
+# Expand project roots given as paths, glob patterns or @list files (one root per line)
+def expand_project_roots(patterns):
+    roots = []
+    for pattern in patterns:
+        if pattern.startswith('@'):
+            with open(pattern[1:], 'r', encoding='utf-8') as f:
+                candidates = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+        elif glob.has_magic(pattern):
+            candidates = sorted(glob.glob(pattern))
+        else:
+            candidates = [pattern]
+        roots.extend(os.path.abspath(candidate) for candidate in candidates if os.path.isdir(candidate))
+
+    # Keep the first occurrence of each project, in the order given
+    return list(dict.fromkeys(roots))
+
+# Project metadata for one root: the shared --metadata file, replaced by a per-project file if there is one
+def project_metadata_for(root, shared_metadata_path, metadata_name, field_overrides):
+    metadata_path = shared_metadata_path
+    if metadata_name and os.path.isfile(os.path.join(root, metadata_name)):
+        metadata_path = os.path.join(root, metadata_name)
+    return build_project_metadata(metadata_path, field_overrides)
+
+# Each project gets its own output folder under output_dir, named after the project
+def project_output_dir(root, output_dir):
+    if not output_dir:
+        return None
+    project_dir = os.path.join(output_dir, os.path.basename(root.rstrip(os.sep)))
+    os.makedirs(project_dir, exist_ok=True)
+    return project_dir
+
+# Run one project over the shared pools and return its throughput summary
+def extract_project(root, project_metadata, output_dir, use_cache, image_executor, geotiff_executor, image_workers, geotiff_workers,
+                    progress=None, profiler=None, io_pipeline=None, fingerprint=False, checksum_all=False, fingerprint_workers=None,
+                    fixity=False, merge=False):
+    start_time = time.perf_counter()
+    try:
+        if io_pipeline is not None:
+            inventory = io_pipeline.scan_directory(root, progress=progress)
+        else:
+            inventory = scan_directory(root, progress=progress)
+        scan_seconds = time.perf_counter() - start_time
+
+        combined_xml_path, folder_tree_xml_path, total_folders = extractor.run_extraction(
+            root,
+            extractor.project_metadata_element(project_metadata),
+            output_dir=output_dir,
+            use_cache=use_cache,
+            image_workers=image_workers,
+            geotiff_workers=geotiff_workers,
+            inventory=inventory,
+            image_executor=image_executor,
+            geotiff_executor=geotiff_executor,
+            progress=progress,
+            profiler=profiler,
+            io_pipeline=io_pipeline,
+            fingerprint=fingerprint,
+            checksum_all=checksum_all,
+            fingerprint_workers=fingerprint_workers,
+            fixity=fixity,
+            merge=merge,
+        )
+    finally:
+        if progress is not None:
+            progress.close()  # Also when the scan or the extraction fails part way
+    elapsed = time.perf_counter() - start_time
+
+    file_count = len(inventory.files)
+    total_bytes = sum(record.size or 0 for record in inventory.files)
+    return {
+        'project': root,
+        'status': 'ok',
+        'metadata_xml': combined_xml_path,
+        'folder_tree_xml': folder_tree_xml_path,
+        'folders': total_folders,
+        'files': file_count,
+        'bytes': total_bytes,
+        'scan_seconds': round(scan_seconds, 3),
+        'seconds': round(elapsed, 3),
+        'files_per_second': round(file_count / elapsed, 1) if elapsed > 0 else None,
+        'mb_per_second': round(total_bytes / 1e6 / elapsed, 2) if elapsed > 0 else None,
+    }
+
+def print_project_summary(summary):
+    if summary['status'] != 'ok':
+        print(f"FAILED  {summary['project']}: {summary['error']}")
+        return
+    print(f"OK      {summary['project']}: {summary['files']} files, {summary['bytes'] / 1e6:.1f} MB "
+          f"in {summary['seconds']:.1f}s ({summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s)")
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Extract metadata for many project folders in one run, sharing a single worker pool.")
+    parser.add_argument('projects', nargs='+',
+                        help="Project directories, glob patterns (quote them) or @FILE listing one directory per line")
+    parser.add_argument('--metadata', metavar='FILE', help="JSON or YAML project metadata used for every project")
+    parser.add_argument('--metadata-name', metavar='NAME',
+                        help="JSON or YAML file inside a project root that replaces --metadata for that project")
+    parser.add_argument('--field', metavar='KEY=VALUE', action='append', default=[],
+                        help="Set a project metadata field for every project (repeatable)")
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help="Write each project's XML files to DIR/<project name> (default: inside each project)")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore and do not update the metadata caches")
+    parser.add_argument('--image-workers', type=positive_int, default=IMAGE_WORKERS,
+                        help="Processes in the shared image pool (default: one per CPU core; 1 = serial)")
+    parser.add_argument('--geotiff-workers', type=positive_int, default=GEOTIFF_WORKERS,
+                        help=f"Threads in the shared GeoTIFF pool (default: {GEOTIFF_WORKERS}; 1 = serial)")
+    add_async_io_arguments(parser)
+    add_fingerprint_arguments(parser)
+    parser.add_argument('--merge', action='store_true', default=MERGE_EXISTING_METADATA,
+                        help="Update each project's existing METADATA.xml, keeping curated fields")
+    parser.add_argument('--report', metavar='FILE', help="Write the per-project throughput report as JSON")
+    parser.add_argument('--progress', choices=['none'] + list(PROGRESS_SINKS), default='none',
+                        help="Where to send progress events (default: none; jsonl writes one JSON object per line)")
+    parser.add_argument('--progress-file', metavar='FILE', help="Append --progress jsonl events to FILE instead of stdout")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="Time every extraction across the batch; write the report to PREFIX.txt and PREFIX.json")
+    return parser
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    roots = expand_project_roots(args.projects)
+    if not roots:
+        parser.error("no project directories matched")
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        parser.error(f"output directory not found: {args.output_dir}")
+
+    use_cache = USE_METADATA_CACHE and not args.no_cache
+
+    # One pool of each kind for the whole batch, so worker start-up is paid once rather than per project.
+    # With --async-io a single I/O pipeline does the scans and all of the extraction instead.
+    io_pipeline = None
+    if args.async_io:
+        from metadata_async import AsyncIOPipeline  # asyncio is only loaded in async mode
+        io_pipeline = AsyncIOPipeline(args.io_concurrency, args.scan_concurrency)
+    image_executor = ProcessPoolExecutor(max_workers=args.image_workers) if args.image_workers != 1 and io_pipeline is None else None
+    geotiff_executor = ThreadPoolExecutor(max_workers=args.geotiff_workers) if args.geotiff_workers != 1 and io_pipeline is None else None
+
+    profiler = Profiler() if args.profile else None
+    summaries = []
+    batch_start = time.perf_counter()
+    try:
+        for index, root in enumerate(roots, 1):
+            print(f"[{index}/{len(roots)}] {root}")
+            try:
+                project_metadata = project_metadata_for(root, args.metadata, args.metadata_name, args.field)
+                summary = extract_project(root, project_metadata, project_output_dir(root, args.output_dir), use_cache,
+                                          image_executor, geotiff_executor, args.image_workers, args.geotiff_workers,
+                                          build_progress_reporter(args.progress, args.progress_file), profiler, io_pipeline,
+                                          args.fingerprint or args.checksum_all, args.checksum_all, args.hash_workers, args.fixity,
+                                          args.merge)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); start a fresh pool for the remaining projects
+                summary = {'project': root, 'status': 'failed', 'error': f"image worker pool broke: {e}"}
+                image_executor.shutdown(cancel_futures=True)
+                image_executor = ProcessPoolExecutor(max_workers=args.image_workers)
+            except Exception as e:
+                # One bad project should not stop the rest of the batch
+                summary = {'project': root, 'status': 'failed', 'error': str(e)}
+            summaries.append(summary)
+            print_project_summary(summary)
+    finally:
+        if image_executor is not None:
+            image_executor.shutdown(cancel_futures=True)
+        if geotiff_executor is not None:
+            geotiff_executor.shutdown(cancel_futures=True)
+        if io_pipeline is not None:
+            io_pipeline.close()
+
+    batch_seconds = time.perf_counter() - batch_start
+    completed = [summary for summary in summaries if summary['status'] == 'ok']
+    total_files = sum(summary['files'] for summary in completed)
+    total_bytes = sum(summary['bytes'] for summary in completed)
+    print(f"{len(completed)}/{len(roots)} projects in {batch_seconds:.1f}s, {total_files} files, {total_bytes / 1e6:.1f} MB"
+          + (f" ({total_files / batch_seconds:.1f} files/s)" if batch_seconds > 0 else ""))
+
+    if profiler is not None:
+        text_path, json_path = profiler.write_report(args.profile)
+        print(f"Profile written to {text_path} and {json_path}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'seconds': round(batch_seconds, 3), 'projects': summaries}, f, indent=2)
+
+    return 0 if len(completed) == len(roots) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
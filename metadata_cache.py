@@ -0,0 +1,73 @@
+import json
+import os
+import sqlite3
+
+##################
+##################
+######
+###### Persistent metadata cache
+######
+##################
+##################
+
+# Extractor output is stored per file and reused while the file's size, modification
+# time and the extractor's version are unchanged.
+class MetadataCache:
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.connection = sqlite3.connect(cache_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            " extractor TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " payload TEXT,"
+            " PRIMARY KEY (extractor, path))"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    # Returns (True, metadata) for an up-to-date entry, otherwise (False, None).
+    # signature is the (size, mtime) to check against, by default the file's own.
+    def get(self, extractor, record, signature=None):
+        size, mtime = signature or (record.size, record.mtime)
+        row = self.connection.execute(
+            "SELECT size, mtime, version, payload FROM metadata WHERE extractor = ? AND path = ?",
+            (type(extractor).__name__, record.path),
+        ).fetchone()
+        if row is not None and row[0] == size and row[1] == mtime and row[2] == extractor.EXTRACTOR_VERSION:
+            self.hits += 1
+            return True, json.loads(row[3])
+        self.misses += 1
+        return False, None
+
+    def put(self, extractor, record, metadata, signature=None):
+        size, mtime = signature or (record.size, record.mtime)
+        # Values are written out with str() anyway, so store them as strings to keep JSON round trips exact
+        if metadata is not None:
+            metadata = {key: str(value) for key, value in metadata.items()}
+        self.connection.execute(
+            "INSERT OR REPLACE INTO metadata (extractor, path, size, mtime, version, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (type(extractor).__name__, record.path, size, mtime, extractor.EXTRACTOR_VERSION, json.dumps(metadata)),
+        )
+
+    # Drop entries for files that are no longer in the project (or in extra_records, files found outside the scan)
+    def prune(self, inventory, extra_records=()):
+        current_paths = {record.path for record in inventory.files}
+        current_paths.update(record.path for record in extra_records)
+        stale = [(path,) for (path,) in self.connection.execute("SELECT DISTINCT path FROM metadata") if path not in current_paths]
+        self.connection.executemany("DELETE FROM metadata WHERE path = ?", stale)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+# Open the cache stored in the project directory
+def open_project_cache(directory, cache_file_name):
+    try:
+        return MetadataCache(os.path.join(directory, cache_file_name))
+    except sqlite3.Error as e:
+        print(f"Metadata cache unavailable, extracting everything: {e}")
+        return None
@@ -0,0 +1,81 @@
+from config_file_types import IMAGE_FILE_TYPES, VECTOR_FILE_TYPES, GEOSPATIAL_FILE_TYPES, OTHER_FILE_TYPES, GEOPHYSICS_FILE_TYPES
+from config_file_types import CAD_FILE_TYPES, THREED_FILE_TYPES, LASER_FILE_TYPES, CONTROL_POINT_FILE_TYPES
+from config_file_types import GEOPHYSICS_COMP_CONDITION, VECTOR_DWG_CONDITION, CONTROL_POINT_CONDITIONS
+
+##################
+##################
+######
+###### File classification, compiled once from config_file_types.py
+######
+##################
+##################
+
+# Extension list -> category. GeoTIFFs and shapefiles also get their own category, since they are read differently.
+EXTENSION_CATEGORIES = [
+    (IMAGE_FILE_TYPES, 'image'),
+    (VECTOR_FILE_TYPES, 'vector'),
+    (GEOSPATIAL_FILE_TYPES, 'geospatial'),
+    (OTHER_FILE_TYPES, 'other'),
+    (GEOPHYSICS_FILE_TYPES, 'geophysics'),
+    (CAD_FILE_TYPES, 'cad'),
+    (THREED_FILE_TYPES, 'model'),
+    (LASER_FILE_TYPES, 'laser'),
+]
+GEOSPATIAL_SUBCATEGORIES = {'.shp': 'shapefile', '.tif': 'geotiff', '.tiff': 'geotiff'}
+ZIP_CATEGORIES = frozenset(['zip'])  # Zip files are skipped by every extractor
+
+# Maps a file name to the set of categories (extractors) it belongs to. The extension lists are merged into
+# one dict, and the answer for each combination of extension and naming conditions (_COMP_, _DWG_, _GCP, ...)
+# is worked out once and then shared, so classifying a file is a handful of string checks and a dict lookup.
+# Extensions are matched on the last '.' of the name, so they must be single suffixes such as '.tif'.
+class FileClassifier:
+    def __init__(self, extension_categories=EXTENSION_CATEGORIES, comp_condition=GEOPHYSICS_COMP_CONDITION,
+                 dwg_condition=VECTOR_DWG_CONDITION, control_point_types=CONTROL_POINT_FILE_TYPES,
+                 control_point_conditions=CONTROL_POINT_CONDITIONS):
+        self.extensions = {}
+        for extensions, category in extension_categories:
+            for extension in extensions:
+                categories = self.extensions.setdefault(extension.lower(), set())
+                categories.add(category)
+                if category == 'geospatial' and extension.lower() in GEOSPATIAL_SUBCATEGORIES:
+                    categories.add(GEOSPATIAL_SUBCATEGORIES[extension.lower()])
+        self.comp_condition = comp_condition.upper()
+        self.dwg_condition = dwg_condition.upper()
+        self.control_point_types = frozenset(extension.lower() for extension in control_point_types)
+        self.control_point_conditions = tuple(control_point_conditions)
+        self._results = {}  # (extension, is_comp, is_dwg, is_control_point) -> frozenset of categories
+
+    def classify(self, file_name):
+        dot = file_name.rfind('.')
+        extension = file_name[dot:].lower() if dot >= 0 else ''
+        name_upper = file_name.upper()
+        key = (
+            extension,
+            self.comp_condition in name_upper,
+            self.dwg_condition in name_upper,
+            extension in self.control_point_types and any(condition in file_name for condition in self.control_point_conditions),
+        )
+        categories = self._results.get(key)
+        if categories is None:
+            categories = self._results[key] = self._categories(*key)
+        return categories
+
+    def _categories(self, extension, is_comp, is_dwg, is_control_point):
+        if extension == '.zip':
+            return ZIP_CATEGORIES
+        categories = set(self.extensions.get(extension, ()))
+        if is_comp:
+            # Composite geophysics images are reported as geophysics, not as ordinary images
+            categories.discard('image')
+            categories.update(('comp', 'geophysics'))
+        if is_dwg:
+            categories.add('dwg')
+        if is_control_point:
+            categories.add('control_point')
+        return frozenset(categories)
+
+    def is_category(self, file_name, category):
+        return category in self.classify(file_name)
+
+# Shared by the scanner and the extractors
+FILE_CLASSIFIER = FileClassifier()
@@ -0,0 +1,317 @@
+import csv
+import os
+import re
+import struct
+
+import numpy as np
+
+from config_performance import CONTROL_POINT_CHUNK_SIZE
+from metadata_shapefile import SHP_FILE_CODE, SHP_HEADER_SIZE, SHAPE_TYPES, POINT_SHAPE_TYPES, MULTIPOINT_SHAPE_TYPES, Z_SHAPE_TYPES
+from metadata_shapefile import find_sidecar, read_dbf_header
+
+##################
+##################
+######
+###### Streaming control point statistics (_GCP / _CameraPositions .csv and .shp)
+######
+##################
+##################
+
+# CSV rows and shapefile records are read CONTROL_POINT_CHUNK_SIZE bytes at a time and summarised
+# with NumPy, so multi-million-row camera exports are handled in constant memory.
+
+# Column -> accepted header spellings, compared lower case with anything after a '/' and all punctuation removed
+# (Agisoft writes headers such as "#Label,X/Easting,Y/Northing,Z/Altitude,X_error,...").
+COLUMN_NAMES = {
+    'x': ['x', 'easting', 'east', 'longitude', 'lon', 'long'],
+    'y': ['y', 'northing', 'north', 'latitude', 'lat'],
+    'z': ['z', 'altitude', 'elevation', 'height', 'alt', 'elev'],
+    'sx': ['sx', 'cx', 'xerror', 'xaccuracy', 'accuracyx', 'errorx', 'stdx', 'xstd', 'sigmax'],
+    'sy': ['sy', 'cy', 'yerror', 'yaccuracy', 'accuracyy', 'errory', 'stdy', 'ystd', 'sigmay'],
+    'sz': ['sz', 'cz', 'zerror', 'zaccuracy', 'accuracyz', 'errorz', 'stdz', 'zstd', 'sigmaz'],
+}
+NAME_TO_COLUMN = {spelling: column for column, spellings in COLUMN_NAMES.items() for spelling in spellings}
+COLUMNS = list(COLUMN_NAMES)  # Order of the columns in the arrays passed to PointStatistics.update
+
+def _normalise_column(name):
+    return re.sub(r'[^a-z0-9]', '', name.strip().lstrip('#').split('/')[0].lower())
+
+# Running count, extent, sums and accuracy summaries over (n, 6) arrays of x y z sx sy sz, NaN where missing
+class PointStatistics:
+    def __init__(self):
+        self.count = 0
+        self.minimum = np.full(len(COLUMNS), np.inf)
+        self.maximum = np.full(len(COLUMNS), -np.inf)
+        self.sums = np.zeros(len(COLUMNS))
+        self.valid = np.zeros(len(COLUMNS), dtype=np.int64)
+
+    # Points without both X and Y are ignored. With count_points=False the values only add to the
+    # column summaries (e.g. accuracies from a .dbf whose points were counted from the .shp).
+    def update(self, values, count_points=True):
+        if count_points:
+            values = values[np.isfinite(values[:, 0]) & np.isfinite(values[:, 1])]
+            self.count += len(values)
+        if not len(values):
+            return
+        valid = np.isfinite(values)
+        self.minimum = np.minimum(self.minimum, np.where(valid, values, np.inf).min(axis=0))
+        self.maximum = np.maximum(self.maximum, np.where(valid, values, -np.inf).max(axis=0))
+        self.sums += np.where(valid, values, 0.0).sum(axis=0)
+        self.valid += valid.sum(axis=0)
+
+    def column(self, name):
+        index = COLUMNS.index(name)
+        if not self.valid[index]:
+            return None
+        return {
+            'min': float(self.minimum[index]),
+            'max': float(self.maximum[index]),
+            'mean': float(self.sums[index] / self.valid[index]),
+            'count': int(self.valid[index]),
+        }
+
+    def summary(self):
+        columns = {name: self.column(name) for name in COLUMNS}
+        return {'count': self.count, **columns}
+
+# (n, 6) array from the columns that were read, with NaN for the ones the file does not have
+def _to_columns(values, names):
+    result = np.full((len(values), len(COLUMNS)), np.nan)
+    for position, name in enumerate(names):
+        result[:, COLUMNS.index(name)] = values[:, position]
+    return result
+
+######
+###### CSV
+######
+
+# The header line's column positions and delimiter, or (None, None) if the line has no X and Y columns
+def _csv_header(line):
+    delimiter = max((',', ';', '\t'), key=line.count)
+    fields = next(csv.reader([line], delimiter=delimiter), [])
+    columns = {}
+    for position, name in enumerate(fields):
+        column = NAME_TO_COLUMN.get(_normalise_column(name))
+        if column and column not in columns:
+            columns[column] = position
+    if 'x' in columns and 'y' in columns:
+        return columns, delimiter
+    return None, None
+
+def _parse_csv_value(row, position):
+    try:
+        return float(row[position])
+    except (IndexError, ValueError):
+        return np.nan
+
+def _parse_csv_lines(lines, positions, delimiter):
+    if not lines:
+        return np.empty((0, len(positions)), dtype=np.float64)  # A CSV with only a header
+    try:
+        return np.loadtxt(lines, delimiter=delimiter, usecols=positions, ndmin=2, dtype=np.float64, comments='#', quotechar='"')
+    except (ValueError, TypeError):
+        # Empty cells or stray text somewhere in the chunk: parse it row by row, keeping what does parse
+        rows = [row for row in csv.reader(lines, delimiter=delimiter) if row and not row[0].startswith('#')]
+        return np.array([[_parse_csv_value(row, position) for position in positions] for row in rows], dtype=np.float64).reshape(-1, len(positions))
+
+def read_csv_points(csv_path, chunk_size=CONTROL_POINT_CHUNK_SIZE):
+    stats = PointStatistics()
+    columns = delimiter = None
+    with open(csv_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        while True:
+            lines = f.readlines(chunk_size)  # Whole lines, about chunk_size bytes of them
+            if not lines:
+                break
+            if columns is None:
+                while lines and columns is None:
+                    columns, delimiter = _csv_header(lines.pop(0))  # Comments and titles before the header are skipped
+                if columns is None:
+                    return None  # No X/Y header in the first chunk: not a control point table
+            names = list(columns)
+            values = _parse_csv_lines(lines, [columns[name] for name in names], delimiter)
+            stats.update(_to_columns(values, names))
+    return stats if columns is not None else None
+
+######
+###### Shapefile (.shp geometry, .dbf accuracies)
+######
+
+# Single-part point shapefiles have fixed-size records, which are read as NumPy structured arrays.
+# Returns False if the records turn out not to be uniform, so the caller can walk them one by one.
+def _read_fixed_point_records(f, shape_type, file_size, stats, chunk_size):
+    f.seek(SHP_HEADER_SIZE)
+    record_header = f.read(8)
+    if len(record_header) < 8:
+        return True  # No records
+    content_length = struct.unpack('>2i', record_header)[1] * 2
+    record_size = 8 + content_length
+    has_z = shape_type == 11
+    if content_length < (28 if has_z else 20) or (file_size - SHP_HEADER_SIZE) % record_size:
+        return False
+
+    fields = [('length', '>i4'), ('type', '<i4'), ('x', '<f8'), ('y', '<f8')]
+    if has_z:
+        fields.append(('z', '<f8'))
+    dtype = np.dtype({'names': [name for name, _ in fields], 'formats': [fmt for _, fmt in fields],
+                      'offsets': [4, 8, 12, 20, 28][:len(fields)], 'itemsize': record_size})
+
+    f.seek(SHP_HEADER_SIZE)
+    records_per_chunk = max(1, chunk_size // record_size)
+    while True:
+        records = np.fromfile(f, dtype=dtype, count=records_per_chunk)
+        if not len(records):
+            break
+        if (records['length'] != content_length // 2).any() or (records['type'] != shape_type).any():
+            return False
+        values = np.full((len(records), len(COLUMNS)), np.nan)
+        values[:, 0], values[:, 1] = records['x'], records['y']
+        if has_z:
+            values[:, 2] = records['z']
+        stats.update(values)
+    return True
+
+# Every vertex of every record, for multipoint, line and polygon shapefiles (and mixed point files)
+def _read_point_records(f, stats, chunk_size):
+    f.seek(SHP_HEADER_SIZE)
+    batch = []
+    while True:
+        record_header = f.read(8)
+        if len(record_header) < 8:
+            break
+        content = f.read(struct.unpack('>2i', record_header)[1] * 2)
+        if len(content) < 4:
+            break
+        shape_type = struct.unpack('<i', content[:4])[0]
+        if shape_type in POINT_SHAPE_TYPES:
+            x, y = struct.unpack('<2d', content[4:20])
+            batch.append([x, y, struct.unpack('<d', content[20:28])[0] if shape_type == 11 else np.nan])
+        elif shape_type in SHAPE_TYPES and shape_type != 0:
+            if shape_type in MULTIPOINT_SHAPE_TYPES:
+                num_points, points_offset = struct.unpack('<i', content[36:40])[0], 40
+            else:
+                num_parts, num_points = struct.unpack('<2i', content[36:44])
+                points_offset = 44 + 4 * num_parts
+            points = np.frombuffer(content, dtype='<f8', count=2 * num_points, offset=points_offset).reshape(-1, 2)
+            z = np.full(num_points, np.nan)
+            if shape_type in Z_SHAPE_TYPES:
+                z = np.frombuffer(content, dtype='<f8', count=num_points, offset=points_offset + 16 * num_points + 16)
+            batch.extend(np.column_stack((points, z)).tolist())
+        if len(batch) * 24 >= chunk_size:
+            stats.update(_to_columns(np.array(batch, dtype=np.float64), ['x', 'y', 'z']))
+            batch = []
+    if batch:
+        stats.update(_to_columns(np.array(batch, dtype=np.float64), ['x', 'y', 'z']))
+
+def _dbf_floats(values):
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        # Blank or overflowed ('*****') numbers in this chunk
+        return np.array([_parse_dbf_value(value) for value in values], dtype=np.float64)
+
+def _parse_dbf_value(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+# Add the given columns (by their COLUMN_NAMES spellings) of every non-deleted .dbf record to stats
+def read_dbf_columns(dbf_path, stats, wanted, chunk_size=CONTROL_POINT_CHUNK_SIZE):
+    header = read_dbf_header(dbf_path)
+    names, formats, offsets = ['deleted'], ['S1'], [0]
+    offset = 1
+    for field in header['fields']:
+        column = NAME_TO_COLUMN.get(_normalise_column(field['name']))
+        if column in wanted and column not in names and field['type'] in 'NF':
+            names.append(column)
+            formats.append(f"S{field['length']}")
+            offsets.append(offset)
+        offset += field['length']
+    if len(names) == 1:
+        return []
+    dtype = np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': header['record_length']})
+
+    remaining = header['record_count']
+    records_per_chunk = max(1, chunk_size // header['record_length'])
+    with open(dbf_path, 'rb') as f:
+        f.seek(header['header_length'])
+        while remaining > 0:
+            records = np.fromfile(f, dtype=dtype, count=min(records_per_chunk, remaining))
+            if not len(records):
+                break
+            remaining -= len(records)
+            records = records[records['deleted'] != b'*']
+            values = np.column_stack([_dbf_floats(records[name]) for name in names[1:]])
+            stats.update(_to_columns(values, names[1:]), count_points=False)
+    return names[1:]
+
+def read_shapefile_points(shp_path, chunk_size=CONTROL_POINT_CHUNK_SIZE, directory_index=None):
+    file_size = os.path.getsize(shp_path)
+    with open(shp_path, 'rb') as f:
+        header = f.read(SHP_HEADER_SIZE)
+        if len(header) < SHP_HEADER_SIZE or struct.unpack('>i', header[:4])[0] != SHP_FILE_CODE:
+            return None
+        shape_type = struct.unpack('<i', header[32:36])[0]
+        if shape_type not in SHAPE_TYPES:
+            return None
+        stats = PointStatistics()
+        if shape_type not in (1, 11) or not _read_fixed_point_records(f, shape_type, file_size, stats, chunk_size):
+            stats = PointStatistics()
+            _read_point_records(f, stats, chunk_size)
+
+    # Accuracies come from the attribute table, and so does Z when the geometry is only 2D
+    dbf_path = find_sidecar(shp_path, '.dbf', directory_index)
+    if dbf_path:
+        wanted = ['sx', 'sy', 'sz'] if stats.valid[COLUMNS.index('z')] else ['z', 'sx', 'sy', 'sz']
+        read_dbf_columns(dbf_path, stats, wanted, chunk_size)
+    return stats
+
+# Statistics for shapely point geometries, e.g. from a shapefile read with geopandas
+def point_statistics_from_geometries(geometries):
+    stats = PointStatistics()
+    points = [(point.x, point.y, point.z if point.has_z else np.nan) for point in geometries
+              if point is not None and point.geom_type == 'Point']
+    if points:
+        stats.update(_to_columns(np.array(points, dtype=np.float64), ['x', 'y', 'z']))
+    return stats
+
+######
+###### Metadata fields
+######
+
+def read_control_point_stats(file_path, chunk_size=CONTROL_POINT_CHUNK_SIZE, directory_index=None):
+    lower_path = file_path.lower()
+    if lower_path.endswith('.shp'):
+        return read_shapefile_points(file_path, chunk_size, directory_index)
+    if lower_path.endswith('.csv'):
+        return read_csv_points(file_path, chunk_size)
+    return None
+
+def _format_range(column):
+    return f"{column['min']:.3f} to {column['max']:.3f}" if column else ''
+
+def _format_accuracy(column):
+    return f"{column['mean']:.4f} (max {column['max']:.4f})" if column else ''
+
+# Metadata fields for a PointStatistics, ready to merge into the extractor's record
+def point_statistics_fields(stats):
+    summary = stats.summary()
+    x, y, z = summary['x'], summary['y'], summary['z']
+    coverage = ''
+    if x and y:
+        coverage = f"BoundingBox(min=({x['min']:.3f}, {y['min']:.3f}), max=({x['max']:.3f}, {y['max']:.3f}))"
+    return {
+        'CONTL_X': f"{x['mean']:.3f}" if x else '',  # Centroid of the points
+        'CONTL_Y': f"{y['mean']:.3f}" if y else '',
+        'CONTL_Z': f"{z['mean']:.3f}" if z else '',
+        'CONTL_COUNT': summary['count'],
+        'CONTL_Z_RANGE': _format_range(z),
+        'CONTL_CX': _format_accuracy(summary['sx']),  # Mean and largest X accuracy
+        'CONTL_CY': _format_accuracy(summary['sy']),
+        'CONTL_CZ': _format_accuracy(summary['sz']),
+        'FILE_COVERAGE': coverage,
+    }
+
+def control_point_fields(file_path, directory_index=None):
+    stats = read_control_point_stats(file_path, directory_index=directory_index)
+    return point_statistics_fields(stats) if stats is not None else None
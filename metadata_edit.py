@@ -3,7 +3,8 @@ from tkinter import filedialog, Label, Entry, Button, Frame, Scrollbar, Canvas,
 import webbrowser
 import xml.etree.ElementTree as ET
 
-def main_edit_function():
+# parent is MainMenu's window when launched from the menu; run standalone, the editor has its own Tk root
+def main_edit_function(parent=None):
 
     def open_github():
         webbrowser.open_new("https://github.com/atrbirkett/ArchMetadataExtractor")
@@ -88,7 +89,7 @@ def main_edit_function():
             self.next_button.pack(side='left', padx=10)
 
         def load_xml(self):
-            file_path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")])
+            file_path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")], parent=self.root)
             if file_path:
                 self.tree = ET.parse(file_path)
                 self.root_xml = self.tree.getroot()
@@ -166,8 +167,12 @@ def main_edit_function():
             for widget in self.button_frame.winfo_children():
                 widget.grid_forget()
 
-# Create the main window
-root = tk.Tk()
-root.title("XML Editor")
-app = XmlEditor(root)
-root.mainloop()
+    # Create the main window; from the menu, the menu's event loop runs it
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
+    root.title("XML Editor")
+    app = XmlEditor(root)
+    if parent is None:
+        root.mainloop()
+
+if __name__ == "__main__":
+    main_edit_function()
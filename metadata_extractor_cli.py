@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# The extractor module only imports tkinter inside its GUI functions, so this runs on headless servers
+import metadata_extractor_main as extractor
+from metadata_progress import PROGRESS_SINKS, build_progress_reporter
+from metadata_profile import Profiler, run_with_cprofile
+from config_performance import IMAGE_WORKERS, GEOTIFF_WORKERS, USE_METADATA_CACHE
+from config_performance import USE_ASYNC_IO, ASYNC_IO_CONCURRENCY, ASYNC_SCAN_CONCURRENCY
+from config_performance import FINGERPRINT_FILES, FINGERPRINT_CHECKSUM_ALL, FINGERPRINT_WORKERS, FIXITY_MANIFEST
+from config_performance import MERGE_EXISTING_METADATA
+
+##################
+##################
+######
+###### Command-line (headless) metadata extraction
+######
+##################
+##################
+
+# Load project metadata from a JSON or YAML file
+def load_project_metadata_file(metadata_path):
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        if metadata_path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is needed to read YAML metadata files (pip install pyyaml)")
+            data = yaml.safe_load(f) or {}
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{metadata_path} must contain a mapping of project metadata fields")
+    return data
+
+# Combine the metadata file and --field overrides into the same dictionary the GUI form produces
+def build_project_metadata(metadata_path=None, field_overrides=()):
+    supplied = load_project_metadata_file(metadata_path) if metadata_path else {}
+    for override in field_overrides:
+        key, separator, value = override.partition('=')
+        if not separator:
+            raise ValueError(f"--field expects KEY=VALUE, got '{override}'")
+        supplied[key.strip()] = value
+
+    # Every form field is written, in form order, even when left empty; extra fields follow
+    project_metadata = {field: str(supplied.pop(field, '') or '') for field in extractor.PROJECT_METADATA_FIELDS}
+    for key, value in supplied.items():
+        project_metadata[key] = '' if value is None else str(value)
+    return project_metadata
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be 1 or more")
+    return number
+
+# Shared with the batch runner
+def add_async_io_arguments(parser):
+    parser.add_argument('--async-io', action='store_true', default=USE_ASYNC_IO,
+                        help="Keep many file system calls in flight at once, for projects on SMB/NFS shares")
+    parser.add_argument('--io-concurrency', type=positive_int, default=ASYNC_IO_CONCURRENCY,
+                        help=f"Metadata probes in flight with --async-io (default: {ASYNC_IO_CONCURRENCY})")
+    parser.add_argument('--scan-concurrency', type=positive_int, default=ASYNC_SCAN_CONCURRENCY,
+                        help=f"Folders listed at once with --async-io (default: {ASYNC_SCAN_CONCURRENCY})")
+
+# Shared with the batch runner
+def add_fingerprint_arguments(parser):
+    parser.add_argument('--fingerprint', action='store_true', default=FINGERPRINT_FILES,
+                        help="Add FILE_CHECKSUM to each file and list identical files under Duplicate_Files")
+    parser.add_argument('--checksum-all', action='store_true', default=FINGERPRINT_CHECKSUM_ALL,
+                        help="With --fingerprint, hash every file in full rather than only possible duplicates")
+    parser.add_argument('--hash-workers', type=positive_int, default=FINGERPRINT_WORKERS,
+                        help="Threads hashing files for --fingerprint and --fixity (default: one per CPU core; 1 = serial)")
+    parser.add_argument('--fixity', action='store_true', default=FIXITY_MANIFEST,
+                        help="Also write METADATA_Fixity.xml with a checksum for every file (verify with metadata_fixity.py)")
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Extract archaeological project metadata to METADATA.xml and METADATA_FolderTree.xml without the GUI.")
+    parser.add_argument('project_dir', help="Project directory to scan")
+    parser.add_argument('--metadata', metavar='FILE', help="JSON or YAML file with the project metadata fields")
+    parser.add_argument('--field', metavar='KEY=VALUE', action='append', default=[],
+                        help="Set a project metadata field (repeatable, overrides --metadata)")
+    parser.add_argument('--output-dir', metavar='DIR', help="Where to write the XML files (default: the project directory)")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore and do not update the metadata cache")
+    parser.add_argument('--image-workers', type=positive_int, default=IMAGE_WORKERS,
+                        help="Processes for image extraction (default: one per CPU core; 1 = serial)")
+    parser.add_argument('--geotiff-workers', type=positive_int, default=GEOTIFF_WORKERS,
+                        help=f"Threads for GeoTIFF extraction (default: {GEOTIFF_WORKERS}; 1 = serial)")
+    add_async_io_arguments(parser)
+    add_fingerprint_arguments(parser)
+    parser.add_argument('--merge', action='store_true', default=MERGE_EXISTING_METADATA,
+                        help="Update the existing METADATA.xml: keep curated fields, re-extract only new or changed files")
+    parser.add_argument('--merge-from', metavar='FILE',
+                        help="Merge with this XML (e.g. one saved by metadata_edit.py) instead of the existing METADATA.xml")
+    parser.add_argument('--progress', choices=['none'] + list(PROGRESS_SINKS), default='console',
+                        help="Where to send progress events (default: console; jsonl writes one JSON object per line)")
+    parser.add_argument('--progress-file', metavar='FILE', help="Append --progress jsonl events to FILE instead of stdout")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="Time every extraction and phase; write the report to PREFIX.txt and PREFIX.json")
+    parser.add_argument('--cprofile', metavar='FILE', help="Also dump cProfile statistics for the run to FILE")
+    return parser
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.project_dir):
+        parser.error(f"project directory not found: {args.project_dir}")
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        parser.error(f"output directory not found: {args.output_dir}")
+    if args.merge_from and not os.path.isfile(args.merge_from):
+        parser.error(f"file to merge with not found: {args.merge_from}")
+    try:
+        project_metadata = build_project_metadata(args.metadata, args.field)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    profiler = Profiler() if args.profile else None
+    run = extractor.run_extraction
+    if args.cprofile:
+        run = lambda *run_args, **run_kwargs: run_with_cprofile(args.cprofile, extractor.run_extraction, *run_args, **run_kwargs)
+
+    io_pipeline = None
+    if args.async_io:
+        from metadata_async import AsyncIOPipeline  # asyncio is only loaded in async mode
+        io_pipeline = AsyncIOPipeline(args.io_concurrency, args.scan_concurrency)
+    progress = build_progress_reporter(args.progress, args.progress_file)
+    start_time = time.perf_counter()
+    try:
+        combined_xml_path, folder_tree_xml_path, total_folders = run(
+            args.project_dir,
+            extractor.project_metadata_element(project_metadata),
+            output_dir=args.output_dir,
+            use_cache=USE_METADATA_CACHE and not args.no_cache,
+            image_workers=args.image_workers,
+            geotiff_workers=args.geotiff_workers,
+            progress=progress,
+            profiler=profiler,
+            io_pipeline=io_pipeline,
+            fingerprint=args.fingerprint or args.checksum_all,
+            checksum_all=args.checksum_all,
+            fingerprint_workers=args.hash_workers,
+            fixity=args.fixity,
+            merge=args.merge or args.merge_from is not None,
+            merge_from=args.merge_from,
+        )
+    finally:
+        progress.close()  # A failed run never reaches progress.finished(), which closes it otherwise
+        if io_pipeline is not None:
+            io_pipeline.close()
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Metadata written to {combined_xml_path}")
+    print(f"Folder tree written to {folder_tree_xml_path}")
+    if args.fixity:
+        print(f"Fixity manifest written to {os.path.join(os.path.dirname(folder_tree_xml_path), 'METADATA_Fixity.xml')}")
+    print(f"Total folders scanned: {total_folders} in {elapsed:.1f}s")
+    if profiler is not None:
+        text_path, json_path = profiler.write_report(args.profile)
+        print(f"Profile written to {text_path} and {json_path}")
+    if args.cprofile:
+        print(f"cProfile statistics written to {args.cprofile}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
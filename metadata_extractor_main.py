@@ -1,24 +1,59 @@
 import os
-import tkinter as tk
-import PIL
-from PIL import Image, ImageFile
-from tkinter import filedialog, simpledialog, Label, Text, Entry, Tk, Button, Frame, Scrollbar, Canvas, ttk
-from tkinter.simpledialog import askstring
-import tkinter.messagebox as mb
-import webbrowser
-from numpy import rad2deg
-import rasterio
-import geopandas as gpd
 from datetime import datetime
 import xml.etree.ElementTree as ET
 import sys 
+import subprocess
 import csv
 import re
 import warnings
+import struct
+import time
+from functools import partial
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Import the configuration file
 from config_file_types import IMAGE_FILE_TYPES, GEOSPATIAL_FILE_TYPES, OTHER_FILE_TYPES, GEOPHYSICS_FILE_TYPES, EXCLUDED_DIRECTORY_SUFFIXES, GEOPHYSICS_COMP_CONDITION, THREED_FILE_TYPES
 
+# Streaming writer for METADATA.xml and METADATA_FolderTree.xml
+from metadata_xml_writer import StreamingXMLWriter, metadata_element
+
+# Header-only shapefile reader, used before falling back to geopandas
+from metadata_shapefile import read_shapefile_header, crs_from_wkt, crs_authority_string
+
+# Header-only reader for TIFF/PNG/JPEG, used before falling back to PIL
+from metadata_image_header import probe_image_header
+
+# Single-pass scanner shared by the folder tree and every extractor
+from metadata_scanner import scan_directory, is_excluded_dir, is_geophysics_file
+
+# Import the performance settings
+from config_performance import IMAGE_WORKERS, IMAGE_CHUNKSIZE, IMAGE_PARALLEL_MIN_FILES, USE_METADATA_CACHE, CACHE_FILE_NAME
+from config_performance import GEOTIFF_WORKERS, GEOTIFF_PARALLEL_MIN_FILES, GDAL_ENV_OPTIONS, GEOTIFF_SIDECAR_EXTENSIONS
+from config_performance import USE_ASYNC_IO
+from config_performance import FINGERPRINT_FILES, FINGERPRINT_CHECKSUM_ALL, FINGERPRINT_WORKERS, FIXITY_MANIFEST
+from config_performance import MERGE_EXISTING_METADATA
+
+# On-disk cache of extractor output, keyed by path, size, mtime and extractor version
+from metadata_cache import open_project_cache
+
+# Progress and throughput events for the console, JSON-lines logs or a Tk window
+from metadata_progress import ProgressReporter, TkProgressSink
+
+# Optional per-extractor latency and phase timing
+from metadata_profile import timed_call
+
+# rasterio, geopandas (with pandas, shapely, pyproj and fiona), PIL and NumPy take seconds to import.
+# They are imported inside the extractors that use them, so a run only loads what the project's files
+# need, and the CLI and MainMenu start quickly. The same goes for the NumPy-based readers:
+# metadata_model (3D models), metadata_geophysics (.xgd/.xcp/.xyz) and metadata_control_points (_GCP/_CameraPositions).
+
+# RasterioError when rasterio has been loaded, otherwise an empty tuple, which no exception matches
+def rasterio_errors():
+    rasterio = sys.modules.get('rasterio')
+    return (rasterio.errors.RasterioError,) if rasterio is not None else ()
+
+
 ##################
 ##################
 ######
@@ -27,20 +62,30 @@ from config_file_types import IMAGE_FILE_TYPES, GEOSPATIAL_FILE_TYPES, OTHER_FIL
 ##################
 ##################
 
+# tkinter is only imported by the GUI functions, so headless runs (see metadata_extractor_cli.py) never load it.
+# The GUI functions take an optional parent window: launched from MainMenu they open Toplevel windows of the
+# menu's Tk root, and only a standalone run creates a Tk root of its own.
+
 # Function to prompt for project directory
-def get_directory_info_via_gui():
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+def get_directory_info_via_gui(parent=None):
+    import tkinter as tk
+    from tkinter import filedialog
+
+    root = None
+    if parent is None:
+        root = tk.Tk()
+        root.withdraw()  # Hide the main window
 
     # Ask for the project directory
-    directory = filedialog.askdirectory(title="Select Project Directory")
+    directory = filedialog.askdirectory(title="Select Project Directory", parent=parent if parent is not None else root)
+    if root is not None:
+        root.destroy()  # Close the Tkinter root window
 
     if not directory:
         # User clicked "Cancel," so exit the program
         sys.exit()
 
     save_directory = directory
-    root.destroy()  # Close the Tkinter root window
     return directory, save_directory
 
 ##################
@@ -51,8 +96,16 @@ def get_directory_info_via_gui():
 ##################
 ##################
 
+# Project metadata fields, in the order they are asked for and written
+PROJECT_METADATA_FIELDS = ['Title', 'Description', 'Subject', 'Site_Location', 'Grid_Refrence',
+                           'Coverage', 'Creators', 'Publisher', 'Contributors', 'Project_ID',
+                           'Dates', 'Copyright']
+
 # Function to prompt for project metadata and return it as a dictionary
-def get_project_metadata():
+def get_project_metadata(parent=None):
+    import tkinter as tk
+    from tkinter import Canvas, ttk
+
     def on_ok():
         for key in entries:
             project_metadata[key] = entries[key].get("1.0", "end-1c")
@@ -63,11 +116,9 @@ def get_project_metadata():
         return "break"  # prevent the default tab behavior
 
     project_metadata = {}
-    fields = ['Title', 'Description', 'Subject', 'Site_Location', 'Grid_Refrence', 
-              'Coverage', 'Creators', 'Publisher', 'Contributors', 'Project_ID', 
-              'Dates', 'Copyright']
+    fields = PROJECT_METADATA_FIELDS
 
-    root = tk.Tk()
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
     root.title("Project Metadata")
     root.geometry("700x500")
 
@@ -95,29 +146,35 @@ def get_project_metadata():
 
     ttk.Button(root, text='OK', command=on_ok).pack(pady=10)
 
-    root.mainloop()
+    if parent is not None:
+        parent.wait_window(root)  # The menu's event loop keeps running until OK is pressed
+    else:
+        root.mainloop()
     return project_metadata
 
-# Function to write the project metadata 
-def process_project_metadata():
-    project_metadata = get_project_metadata()
+# Function to build the Project_Level element from a project metadata dictionary
+def project_metadata_element(project_metadata):
     root = ET.Element("Project_Level")
     for key, value in project_metadata.items():
         ET.SubElement(root, key).text = value
-        
-    return root  
 
-##################
-##################
-######
-###### Exclusion of GIT, Agisoft and ArcGIS files from search and file tree
-######
-##################
-##################
+    return root
 
-# Excludes Agisoft and ArcGIS files
-def is_excluded_dir(dir_name):
-    return any(dir_name.endswith(suffix) for suffix in EXCLUDED_DIRECTORY_SUFFIXES)
+# Fields left empty this time keep the value from the existing METADATA.xml (project_metadata may be None)
+def merge_project_metadata(project_metadata, existing_fields):
+    if not existing_fields:
+        return project_metadata
+    if project_metadata is None:
+        return project_metadata_element(existing_fields)
+    for element in project_metadata:
+        if not element.text and existing_fields.get(element.tag):
+            element.text = existing_fields[element.tag]
+    return project_metadata
+
+# Function to write the project metadata 
+def process_project_metadata(parent=None):
+    project_metadata = get_project_metadata(parent)
+    return project_metadata_element(project_metadata)
 
 ##################
 ##################
@@ -128,65 +185,84 @@ def is_excluded_dir(dir_name):
 ##################
 
 # Function to count folders for pop-up window
-def count_total_folders(folder_path):
-    folder_count = 0
-    for _, dirs, _ in os.walk(folder_path):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Apply exclusion
-        folder_count += len(dirs)
-    return folder_count
+def count_total_folders(folder_path, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(folder_path)
+    return len(inventory.folders) - 1  # Exclude the starting folder itself
 
 # Function to get folder info and count
-def get_folder_size_and_file_count(folder_path):
-    total_size = 0
-    file_count = 0
-    for root, dirs, files in os.walk(folder_path):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Apply exclusion
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not os.path.islink(file_path):  # Skip symbolic links
-                total_size += os.path.getsize(file_path)
-                file_count += 1
+def get_folder_size_and_file_count(folder_path, inventory):
+    total_size, file_count = inventory.folder_totals(folder_path)  # Aggregated once, bottom-up
     SizeMB = total_size / (1024 * 1024)  # Convert bytes to megabytes
     return round(SizeMB, 2), file_count
 
 # Function to create XML elements
-def create_folder_element(folder_path, parent_xml_element):
+def create_folder_element(folder_path, parent_xml_element, inventory):
     folder_name = os.path.basename(folder_path)
     if is_excluded_dir(folder_name):
         return  # Skip excluded folders
 
-    folder_size, file_count = get_folder_size_and_file_count(folder_path)
+    folder_size, file_count = get_folder_size_and_file_count(folder_path, inventory)
     folder_element = ET.SubElement(parent_xml_element, 'FOLDER', {
         'Name': folder_name,
         'Size_MB': str(folder_size),
         'FileCount': str(file_count)
     })
 
-    for item in os.listdir(folder_path):
+    for item, is_dir in inventory.entries.get(folder_path, []):
         item_full_path = os.path.join(folder_path, item)
-        if os.path.isdir(item_full_path):
-            create_folder_element(item_full_path, folder_element)
+        if is_dir:
+            create_folder_element(item_full_path, folder_element, inventory)
         else:
             file_element = ET.SubElement(folder_element, 'FILE', {'Name': item})
 
-# Function to create XML Folder Tree file with message box
-def create_folder_tree_xml(start_dir):
-    # Count the total number of folders
-    total_folders = count_total_folders(start_dir)
+# Function to stream XML elements straight to the folder tree file; progress advances once per folder
+def write_folder_element(folder_path, writer, inventory, progress=None):
+    folder_name = os.path.basename(folder_path)
+    if is_excluded_dir(folder_name):
+        return  # Skip excluded folders
+
+    folder_size, file_count = get_folder_size_and_file_count(folder_path, inventory)
+    writer.start('FOLDER', {
+        'Name': folder_name,
+        'Size_MB': str(folder_size),
+        'FileCount': str(file_count)
+    })
 
-    # Create and display the message window
-    message_root = tk.Tk()
-    message_root.title("Processing")
-    message_label = tk.Label(message_root, text=f"Creating file tree ({total_folders} folders)... please wait")
-    message_label.pack(padx=20, pady=20)
-    message_root.update()
+    for item, is_dir in inventory.entries.get(folder_path, []):
+        item_full_path = os.path.join(folder_path, item)
+        if is_dir:
+            write_folder_element(item_full_path, writer, inventory, progress)
+        else:
+            writer.write_element(ET.Element('FILE', {'Name': item}))
+
+    writer.end()
+    if progress is not None:
+        progress.item_processed()
+
+# Function to write the XML Folder Tree file, without holding the tree in memory
+def write_folder_tree_xml(start_dir, folder_tree_xml_path, inventory=None, progress=None):
+    if inventory is None:
+        inventory = scan_directory(start_dir)
+    if progress is None:
+        progress = ProgressReporter()
+
+    # Every scanned folder is written, the project folder included
+    progress.stage_start('folder_tree', len(inventory.folders), unit='folders')
+    try:
+        with StreamingXMLWriter(folder_tree_xml_path, 'Folder_Tree') as writer:
+            write_folder_element(start_dir, writer, inventory, progress)
+    finally:
+        progress.stage_end()
+
+# Function to create XML Folder Tree file
+def create_folder_tree_xml(start_dir, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(start_dir)
 
     # Perform folder tree creation
     root = ET.Element('Folder_Tree')
-    create_folder_element(start_dir, root)
-
-    # Close the message window
-    message_root.destroy()
+    create_folder_element(start_dir, root, inventory)
     return root
 
 ##################
@@ -197,131 +273,48 @@ def create_folder_tree_xml(start_dir):
 ##################
 ##################
 
-# Get total number of files in directory
-def count_files(directory, extensions):
-    file_count = 0
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-        for file in files:
-            if file.lower().endswith('.zip'):
-                continue  # Skip zip files
-            if any(file.lower().endswith(ext) for ext in extensions):
-                file_count += 1
-    return file_count
+# Progress for the searches below is reported by run_extraction as each file is processed
 
 # Recursively search for image files
-def search_image_files(directory):
-    total_files = count_files(directory, IMAGE_FILE_TYPES)
-
-    # Create and display the message window
-    message_root = tk.Tk()
-    message_root.title("Processing")
-    message_label = tk.Label(message_root, text=f"Searching image files ({total_files} files)... please wait")
-    message_label.pack(padx=20, pady=20)
-    message_root.update()
-
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-        for file in files:
-            if file.lower().endswith('.zip'):
-                continue  # Skip zip files
-            if any(file.lower().endswith(ext) for ext in IMAGE_FILE_TYPES) and GEOPHYSICS_COMP_CONDITION not in file:
-                yield os.path.join(root, file)
-
-    # Close the message window
-    message_root.destroy()
+def search_image_files(directory, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(directory)
+    for record in inventory.files_in_category('image'):
+        yield record.path
 
 # Recursively search for both .shp and .tif/.tiff files -- for Geospatial Files
-def search_geodata_files(start_dir):
-    total_files = count_files(start_dir, GEOSPATIAL_FILE_TYPES)
-
-    # Create and display the message window
-    message_root = tk.Tk()
-    message_root.title("Processing")
-    message_label = tk.Label(message_root, text=f"Searching geospatial files ({total_files} files)... please wait")
-    message_label.pack(padx=20, pady=20)
-    message_root.update()
-
-    shp_files = []
-    geotiff_files = []
-
-    for root, dirs, files in os.walk(start_dir):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-        for file in files:
-            if file.lower().endswith('.zip'):
-                continue  # Skip zip files
-            if any(file.lower().endswith(ext) for ext in GEOSPATIAL_FILE_TYPES):
-                if file.lower().endswith('.shp'):
-                    shp_files.append(os.path.join(root, file))
-                elif file.lower().endswith('.tif') or file.lower().endswith('.tiff'):
-                    geotiff_files.append(os.path.join(root, file))
-
-    # Close the message window
-    message_root.destroy()
-
+def search_geodata_files(start_dir, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(start_dir)
+    shp_files = [record.path for record in inventory.files_in_category('shapefile')]
+    geotiff_files = [record.path for record in inventory.files_in_category('geotiff')]
     return shp_files, geotiff_files
 
 # New function to search for control point files
-def search_control_point_files(directory):
-    control_point_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(('.shp', '.csv')) and ('_GCP' in file or '_CameraPositions' in file):
-                control_point_files.append(os.path.join(root, file))
-    return control_point_files
+def search_control_point_files(directory, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(directory)
+    return [record.path for record in inventory.files_in_category('control_point')]
 
 # New function to search for 3D model files
-def search_model_files(directory):
-    model_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(tuple(THREED_FILE_TYPES)):  # Assuming THREED_FILE_TYPES is defined
-                model_files.append(os.path.join(root, file))
-    return model_files
+def search_model_files(directory, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(directory)
+    return [record.path for record in inventory.files_in_category('model')]
 
 # Recursively search for "other" files
-def search_other_files(directory):
-    total_files = count_files(directory, OTHER_FILE_TYPES)
-
-    # Create and display the message window
-    message_root = tk.Tk()
-    message_root.title("Processing")
-    message_label = tk.Label(message_root, text=f"Searching for other files ({total_files} files)... please wait")
-    message_label.pack(padx=20, pady=20)
-    message_root.update()
-
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-        for file in files:
-            if file.lower().endswith('.zip'):
-                continue  # Skip zip files
-            if any(file.lower().endswith(ext) for ext in OTHER_FILE_TYPES):
-                yield os.path.join(root, file), file
-
-    # Close the message window
-    message_root.destroy()
+def search_other_files(directory, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(directory)
+    for record in inventory.files_in_category('other'):
+        yield record.path, record.name
 
 # Recursively search for geophysics files
-def search_geophysics_files(directory):
-    total_files = count_files(directory, GEOPHYSICS_FILE_TYPES)
-
-    # Create and display the message window
-    message_root = tk.Tk()
-    message_root.title("Processing")
-    message_label = tk.Label(message_root, text=f"Searching geophysics files ({total_files} files)... please wait")
-    message_label.pack(padx=20, pady=20)
-    message_root.update()
-
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-        for file in files:
-            if file.lower().endswith('.zip'):
-                continue  # Skip zip files
-            if any(file.lower().endswith(ext) for ext in GEOPHYSICS_FILE_TYPES) or GEOPHYSICS_COMP_CONDITION in file.upper():
-                yield os.path.join(root, file)
-
-    # Close the message window
-    message_root.destroy()
+def search_geophysics_files(directory, inventory=None):
+    if inventory is None:
+        inventory = scan_directory(directory)
+    for record in inventory.files_in_category('geophysics'):
+        yield record.path
 
 ##################
 ##################
@@ -332,24 +325,130 @@ def search_geophysics_files(directory):
 ##################
 
 class BaseMetadataExtractor:
+    EXTRACTOR_VERSION = 1  # Bump when extract_metadata output changes so cached results are refreshed
+    CACHE_INCLUDES_SIDECARS = False  # Set when the output also depends on files sharing the stem (.prj, .dbf, ...)
+    profiler = None  # A metadata_profile.Profiler to time every extract_metadata call
+
     def extract_metadata(self, file_path):
         raise NotImplementedError("This method should be implemented by subclasses")
 
+    # Call extract_metadata, timing it when a profiler is attached
+    def profiled_extract_metadata(self, record, *args, **kwargs):
+        if self.profiler is None:
+            return self.extract_metadata(record.path, *args, **kwargs)
+        start = time.perf_counter()
+        metadata = self.extract_metadata(record.path, *args, **kwargs)
+        self.profiler.record(type(self).__name__, record, time.perf_counter() - start)
+        return metadata
+
+    # The (size, mtime) a cached entry must match for this file to count as unchanged
+    def cache_signature(self, record, inventory=None):
+        if self.CACHE_INCLUDES_SIDECARS and inventory is not None:
+            return inventory.directory_index.sidecar_signature(record)
+        return record.size, record.mtime
+
+    # Serve unchanged files from the metadata cache, extracting (and caching) everything else.
+    # Extractors that look at sidecar files take the inventory as a keyword argument.
+    def cached_extract_metadata(self, cache, record, *args, **kwargs):
+        if cache is None:
+            return self.profiled_extract_metadata(record, *args, **kwargs)
+        signature = self.cache_signature(record, kwargs.get('inventory'))
+        hit, metadata = cache.get(self, record, signature)
+        if hit:
+            if self.profiler is not None:
+                self.profiler.record_cache_hit(type(self).__name__)
+            return metadata
+        metadata = self.profiled_extract_metadata(record, *args, **kwargs)
+        cache.put(self, record, metadata, signature)
+        return metadata
+
+    # Yield (record, metadata) for many files in their original order. Cache hits are served
+    # directly; misses go through extract_function(file_path), on the executor's workers if given.
+    # The cache is only touched from the calling thread. With a profiler attached, the workers
+    # time each call themselves and send the latency back with the metadata.
+    def cached_extract_many(self, cache, records, extract_function, executor=None, chunksize=1, inventory=None):
+        cached = {}
+        signatures = {}
+        pending_paths = []
+        for index, record in enumerate(records):
+            if cache is not None:
+                signatures[index] = self.cache_signature(record, inventory)
+                hit, metadata = cache.get(self, record, signatures[index])
+            else:
+                hit, metadata = False, None
+            if hit:
+                cached[index] = metadata
+            else:
+                pending_paths.append(record.path)
+
+        profiler = self.profiler
+        if profiler is not None:
+            extract_function = partial(timed_call, extract_function)
+
+        if executor is not None:
+            extracted = executor.map(extract_function, pending_paths, chunksize=chunksize)
+        else:
+            extracted = map(extract_function, pending_paths)
+
+        for index, record in enumerate(records):
+            if index in cached:
+                metadata = cached[index]
+                if profiler is not None:
+                    profiler.record_cache_hit(type(self).__name__)
+            else:
+                metadata = next(extracted)
+                if profiler is not None:
+                    metadata, seconds = metadata
+                    profiler.record(type(self).__name__, record, seconds)
+                if cache is not None:
+                    cache.put(self, record, metadata, signatures[index])
+            yield record, metadata
+
+# FILE_BITDEPTH from the image mode, the same whether the header reader or PIL opened the file
+def image_bit_depth(mode):
+    if mode == 'RGB':
+        return 24  # 8 bits per channel
+    elif mode == 'L':
+        return 8   # 8 bits for grayscale
+    return None  # Undefined or varies for other modes
+
+# FILE_RESOLUTION from an (x, y) dpi pair; whole numbers are written as integers (300, not 300.0)
+def image_resolution(dpi):
+    if not dpi:
+        return ''
+    return int(dpi[0]) if float(dpi[0]).is_integer() else dpi[0]
+
 class ImageMetadataExtractor(BaseMetadataExtractor):
+    EXTRACTOR_VERSION = 2  # EXIF and TIFF resolutions now read as PIL reads them
+
     def extract_metadata(self, file_path):
         file_size_bytes = os.path.getsize(file_path)
         file_SizeMB = file_size_bytes / (1024 * 1024)  # Convert bytes to megabytes
         file_name, _ = os.path.splitext(os.path.basename(file_path))
+
+        # Fast path: read dimensions, mode and DPI straight from the header
+        header = probe_image_header(file_path)
+        if header is not None:
+            return {
+                'FILE_TITLE': os.path.splitext(file_name)[0],  # File name without extension
+                'FILE_PATH': file_path,
+                'FILE_DESCRIPTION': '',  # Placeholder for manual entry
+                'FILE_COVERAGE': '',  # Placeholder for manual entry (coverage information)
+                'FILE_PCS': '',  # Placeholder if PCS is applicable
+                'FILE_GCS': '',  # Placeholder if GCS is applicable
+                'FILE_KEYWORDS': '',  # Placeholder for manual entry
+                'FILE_VERSION': '',
+                'FILE_SIZE': f"{file_SizeMB:.2f}MB",
+                'FILE_RESOLUTION': image_resolution(header['dpi']),
+                'FILE_DIMENSIONS': f"{header['width']} x {header['height']}px",
+                'FILE_COLOUR': 'RGB' if header['mode'] == 'RGB' else 'grayscale' if header['mode'] == 'L' else header['mode'],
+                'FILE_BITDEPTH': image_bit_depth(header['mode']),
+            }
+
+        # Fall back to PIL for anything the header reader does not understand
+        from PIL import Image
         try:
             with Image.open(file_path) as img:
-                # Determine bit depth based on image mode
-                if img.mode == 'RGB':
-                    bit_depth = 24  # 8 bits per channel
-                elif img.mode == 'L':
-                    bit_depth = 8   # 8 bits for grayscale
-                else:
-                    bit_depth = None  # Undefined or varies for other modes
-
                 metadata = {
                     'FILE_TITLE': os.path.splitext(file_name)[0],  # File name without extension
                     'FILE_PATH': file_path,
@@ -360,14 +459,14 @@ class ImageMetadataExtractor(BaseMetadataExtractor):
                     'FILE_KEYWORDS': '',  # Placeholder for manual entry
                     'FILE_VERSION': img.format_version if hasattr(img, 'format_version') else '',
                     'FILE_SIZE': f"{file_SizeMB:.2f}MB",
-                    'FILE_RESOLUTION': img.info.get('dpi', ())[0] if 'dpi' in img.info else '',
+                    'FILE_RESOLUTION': image_resolution(img.info.get('dpi')),
                     'FILE_DIMENSIONS': f"{img.width} x {img.height}px",
                     'FILE_COLOUR': 'RGB' if img.mode == 'RGB' else 'grayscale' if img.mode == 'L' else img.mode,
-                    'FILE_BITDEPTH': bit_depth,
+                    'FILE_BITDEPTH': image_bit_depth(img.mode),
                 }
                 return metadata
                 pass
-        except PIL.Image.DecompressionBombError:
+        except Image.DecompressionBombError:
             # If the image is too large, set a placeholder or maximum size
             return {
                 'FILE_TITLE': os.path.splitext(os.path.basename(file_path))[0],
@@ -389,22 +488,39 @@ class ImageMetadataExtractor(BaseMetadataExtractor):
             print(f"Error opening file {file_path}: {e}")
             return None
 
-    def create_image_metadata(self, start_dir):  # Include 'self' as the first parameter
-        metadata_records = []
-        root = ET.Element("Raster_And_Vector_File_Metadata")
+    # Yield (file record, metadata) for each image, in scan order, as soon as it is extracted
+    # An already running process pool can be passed in as executor (e.g. shared across a batch of projects)
+    def iter_image_metadata(self, start_dir, inventory=None, workers=IMAGE_WORKERS, chunksize=IMAGE_CHUNKSIZE, cache=None, executor=None):
+        if inventory is None:
+            inventory = scan_directory(start_dir)
 
-        for file_path in search_image_files(start_dir):
-            metadata = self.extract_metadata(file_path)  # Use 'self' to call another instance method
-            if metadata:
-                metadata_records.append(metadata)
+        file_records = [inventory.get(file_path) for file_path in search_image_files(start_dir, inventory)]
 
-        for metadata in metadata_records:
-            image_element = ET.SubElement(root, "File")
-            for key, value in metadata.items():
-                ET.SubElement(image_element, key).text = str(value)
+        own_executor = None
+        if executor is None and workers != 1 and len(file_records) >= IMAGE_PARALLEL_MIN_FILES:
+            # Fan the header reads out over a process pool; map() keeps results in file path order
+            executor = own_executor = ProcessPoolExecutor(max_workers=workers)
+
+        try:
+            # Only files missing from the cache (or changed since) need to be opened
+            for record, metadata in self.cached_extract_many(cache, file_records, extract_image_metadata, executor, chunksize):
+                if metadata:
+                    yield record, metadata
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(cancel_futures=True)
+
+    def create_image_metadata(self, start_dir, inventory=None, workers=IMAGE_WORKERS, chunksize=IMAGE_CHUNKSIZE, cache=None):  # Include 'self' as the first parameter
+        root = ET.Element("Raster_And_Vector_File_Metadata")
+        for _, metadata in self.iter_image_metadata(start_dir, inventory, workers, chunksize, cache):
+            root.append(metadata_element(metadata))
 
         return root
 
+# Module-level so it can be sent to the worker processes of the image pool
+def extract_image_metadata(file_path):
+    return ImageMetadataExtractor().extract_metadata(file_path)
+
 class OtherMetadataExtractor(BaseMetadataExtractor):
     def extract_metadata(self, file_path, file_extension):
         file_stats = os.stat(file_path)
@@ -443,28 +559,40 @@ class OtherMetadataExtractor(BaseMetadataExtractor):
 
         return common_metadata
     
-    def process_other_metadata(self, start_dir):  # Include 'start_dir' as a parameter
-        root = ET.Element("Other_Files_Metadata")
-        for path, name in search_other_files(start_dir):
-            file_extension = os.path.splitext(name)[1]
-            metadata = self.extract_metadata(path, file_extension)
+    # executor (e.g. an AsyncIOPipeline) runs the extractions concurrently; results stay in scan order
+    def iter_other_metadata(self, start_dir, inventory=None, cache=None, executor=None):
+        if inventory is None:
+            inventory = scan_directory(start_dir)
+        file_records = [inventory.get(path) for path, _ in search_other_files(start_dir, inventory)]
+
+        def extract_other(file_path):
+            return self.extract_metadata(file_path, os.path.splitext(file_path)[1])
+
+        for record, metadata in self.cached_extract_many(cache, file_records, extract_other, executor):
             if metadata:
-                file_element = ET.SubElement(root, "File")
-                for key, value in metadata.items():
-                    ET.SubElement(file_element, key).text = str(value)
+                yield record, metadata
+
+    def process_other_metadata(self, start_dir, inventory=None, cache=None):  # Include 'start_dir' as a parameter
+        root = ET.Element("Other_Files_Metadata")
+        for _, metadata in self.iter_other_metadata(start_dir, inventory, cache):
+            root.append(metadata_element(metadata))
 
         return root
 
 ## Geophysics Files: Looking for XCP and XGD files (Terrasurveyor) or files labled with _COMP_ for the composite image files.
 class GeophysicsMetadataExtractor(BaseMetadataExtractor):
-    def extract_metadata(self, file_path):
+    EXTRACTOR_VERSION = 2
+
+    # file_size comes from the scan when called through iter_geophysics_metadata, so no extra stat is needed
+    def extract_metadata(self, file_path, file_size=None):
         file_name = os.path.basename(file_path)
-        file_size_bytes = os.path.getsize(file_path)
-        file_SizeMB = file_size_bytes / (1024 * 1024)  # Convert bytes to megabytes
 
-        # Check if the file name contains "_COMP_" or the file extension is .xcp or .xgd
-        if GEOPHYSICS_COMP_CONDITION in file_name.upper() or file_name.lower().endswith(tuple(GEOPHYSICS_FILE_TYPES)):
-            return {
+        # Check if the file name contains "_COMP_" or the file extension is .xcp, .xgd or .xyz, before touching the file
+        if is_geophysics_file(file_name):
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
+            file_SizeMB = file_size / (1024 * 1024)  # Convert bytes to megabytes
+            metadata = {
                 'FILE_PATH': file_path,
                 'FILE_NAME': file_name,
                 'FILE_DESCRIPTION': '',  # Placeholder for manual entry
@@ -483,41 +611,60 @@ class GeophysicsMetadataExtractor(BaseMetadataExtractor):
                 'FILE_GRID_SIZE': '',  # Placeholder for manual entry
                 'FILE_X_INTERVAL': '',  # Placeholder for manual entry
                 'FILE_Y_INTERVAL': '',  # Placeholder for manual entry
+                'FILE_POINT_COUNT': '',  # Readings in an .xyz file
+                'FILE_DUMMY_COUNT': '',  # Dummy (no reading) values in an .xyz file
+                'FILE_VALUE_RANGE': '',  # Lowest and highest reading in an .xyz file
                 'FILE_SIZE': f"{file_SizeMB:.2f}MB",  # Include file size in MB
             }
 
+            # Fill in whatever the .xgd/.xcp header or the .xyz readings provide
+            try:
+                from metadata_geophysics import geophysics_fields
+                metadata.update(geophysics_fields(file_path))
+            except (OSError, ValueError) as e:
+                print(f"Error reading geophysics file {file_path}: {e}")
+            return metadata
+
         # Default metadata for non-compressed files
         return None
     
-    def process_geophysics_metadata(self, start_dir):  # Add 'start_dir' as an argument
-        root = ET.Element("Geophysics_Files")
+    def iter_geophysics_metadata(self, start_dir, inventory=None, cache=None, executor=None):
+        if inventory is None:
+            inventory = scan_directory(start_dir)
+        # Only the files classified as geophysics by the scan
+        file_records = [inventory.get(file_path) for file_path in search_geophysics_files(start_dir, inventory)]
 
-        geophysics_file_paths = search_geophysics_files(start_dir)
+        def extract_geophysics(file_path):
+            return self.extract_metadata(file_path, file_size=inventory.get(file_path).size)
 
-        for root_dir, _, files in os.walk(start_dir):
-            for file in files:
-                file_path = os.path.join(root_dir, file)
-                file_metadata = self.extract_metadata(file_path)
-                if file_metadata:
-                    file_element = ET.SubElement(root, "File")
-                    for key, value in file_metadata.items():
-                        ET.SubElement(file_element, key).text = str(value)
+        for record, file_metadata in self.cached_extract_many(cache, file_records, extract_geophysics, executor):
+            if file_metadata:
+                yield record, file_metadata
+
+    def process_geophysics_metadata(self, start_dir, inventory=None, cache=None):  # Add 'start_dir' as an argument
+        root = ET.Element("Geophysics_Files")
+        for _, file_metadata in self.iter_geophysics_metadata(start_dir, inventory, cache):
+            root.append(metadata_element(file_metadata))
 
         return root
 
 class GeospatialMetadataExtractor(BaseMetadataExtractor):
-    def extract_metadata(self, file_path, file_extension):
+    EXTRACTOR_VERSION = 3
+    CACHE_INCLUDES_SIDECARS = True
+
+    def extract_metadata(self, file_path, file_extension, inventory=None):
         associated_files = []  # Initialize the list for associated files
         try:
             if file_extension.lower() in ['.tif', '.tiff']:
                 # For GeoTIFF files
+                import rasterio
                 with rasterio.open(file_path) as src:
                     tags = src.tags()
                     file_size_bytes = os.path.getsize(file_path)
                     file_SizeMB = file_size_bytes / 1048576  # Convert bytes to megabytes
 
                     # Get associated files based on the raster file name
-                    associated_files = self.get_associated_files(file_path)
+                    associated_files = self.get_associated_files(file_path, inventory)
 
                     return {
                         'FILE_TITLE': tags.get('Title', 'Unknown'),  # Adding FILE_TITLE
@@ -536,19 +683,32 @@ class GeospatialMetadataExtractor(BaseMetadataExtractor):
                         'FILE_ASSOCIATED': ', '.join(associated_files),  # Include associated files
                     }
             elif file_extension.lower() == '.shp':
-                # For shapefiles
-                gdf = gpd.read_file(file_path)
-                geometry_type = gdf.geometry.geom_type.unique()[0] if len(gdf) > 0 else 'Unknown'
-                feature_count = len(gdf)
+                # For shapefiles: read the .shp/.shx/.dbf/.prj headers, only loading geometries if that fails
+                header = read_shapefile_header(file_path, inventory.directory_index if inventory is not None else None)
+                if header is not None:
+                    geometry_type = header['geometry_type']
+                    feature_count = header['feature_count']
+                    pcs, gcs = crs_from_wkt(header['prj_wkt']) if header['prj_wkt'] else ('Unknown', 'Unknown')
+                    coverage = "BoundingBox(left={}, bottom={}, right={}, top={})".format(*header['bbox']) if feature_count > 0 else ''
+                else:
+                    import geopandas as gpd
+                    gdf = gpd.read_file(file_path)
+                    geometry_type = gdf.geometry.geom_type.unique()[0] if len(gdf) > 0 else 'Unknown'
+                    feature_count = len(gdf)
+                    # Same CRS strings as the header path (e.g. 'EPSG:27700'), whichever reads the file
+                    pcs = crs_authority_string(gdf.crs) if gdf.crs else 'Unknown'
+                    gcs = crs_authority_string(gdf.crs.geodetic_crs) if gdf.crs and gdf.crs.geodetic_crs else 'Unknown'
+                    coverage = "BoundingBox(left={}, bottom={}, right={}, top={})".format(*gdf.total_bounds) if feature_count > 0 else ''
                 file_creation_date = datetime.fromtimestamp(os.path.getctime(file_path)).strftime('%Y-%m-%d')
-                pcs = gdf.crs.to_string() if gdf.crs else 'Unknown'
-                gcs = gdf.crs.geodetic_crs.to_string() if gdf.crs and gdf.crs.geodetic_crs else 'Unknown'
                 file_name_without_extension, _ = os.path.splitext(os.path.basename(file_path))
                 file_size_bytes = os.path.getsize(file_path)
                 file_SizeMB = file_size_bytes / 1024 / 1024  # Convert bytes to MB
                 
                 # Get associated files for shapefile
-                associated_files = [f for f in os.listdir(os.path.dirname(file_path)) if f.startswith(file_name_without_extension)]
+                if inventory is not None:
+                    associated_files = inventory.directory_index.siblings(file_path)
+                else:
+                    associated_files = [f for f in os.listdir(os.path.dirname(file_path)) if f.startswith(file_name_without_extension)]
 
                 return {
                     'FILE_PROJECTID': '',  # Placeholder for manual entry
@@ -561,13 +721,13 @@ class GeospatialMetadataExtractor(BaseMetadataExtractor):
                     'FILE_FEATURE_COUNT': str(feature_count),
                     'FILE_METHOD': '',  # Placeholder for manual entry
                     'FILE_DATES': file_creation_date,
-                    'FILE_COVERAGE': '',  # Placeholder for manual entry
+                    'FILE_COVERAGE': coverage,  # Bounding box of all features
                     'FILE_PCS': pcs,
                     'FILE_GCS': gcs,
                     'FILE_SCALE': '',  # Placeholder for manual entry
                     'FILE_ASSOCIATED': ', '.join(associated_files),  # Include associated files
                 }
-        except rasterio.errors.RasterioError as e:
+        except rasterio_errors() as e:
             # Handle rasterio-specific errors
             print(f"Rasterio error with file {file_path}: {e}")
             return None
@@ -577,22 +737,58 @@ class GeospatialMetadataExtractor(BaseMetadataExtractor):
             print(f"General error reading {file_path}: {e}")
             return None   
 
-    def process_geospatial_metadata(self, directory):
-        shp_files, geotiff_files = self.search_geodata_files(directory)
-        geospatial_metadata_records = []
+    def iter_geospatial_metadata(self, directory, inventory=None, cache=None, workers=GEOTIFF_WORKERS, executor=None):
+        if inventory is None:
+            inventory = scan_directory(directory)
+        shp_files, geotiff_files = self.search_geodata_files(directory, inventory)
 
-        # Append extracted metadata to the list
-        for file_path in shp_files + geotiff_files:
-            metadata = self.extract_metadata(file_path, os.path.splitext(file_path)[1])
+        # Yield extracted metadata as each file is read
+        for file_path in shp_files:
+            record = inventory.get(file_path)
+            metadata = self.cached_extract_metadata(cache, record, os.path.splitext(file_path)[1], inventory=inventory)
             if metadata:
-                geospatial_metadata_records.append(metadata)
+                yield record, metadata
+
+        # GeoTIFFs are opened inside one GDAL environment, on a thread pool for larger folders.
+        # rasterio (and GDAL) are only loaded when the project has GeoTIFFs.
+        geotiff_records = [inventory.get(file_path) for file_path in geotiff_files]
+        if not geotiff_records:
+            return
+        import rasterio
+        own_executor = None
+        if executor is None and workers != 1 and len(geotiff_records) >= GEOTIFF_PARALLEL_MIN_FILES:
+            executor = own_executor = ThreadPoolExecutor(max_workers=workers)
 
+        try:
+            with rasterio.Env(**GDAL_ENV_OPTIONS):
+                def extract_geotiff(file_path):
+                    return self.extract_geotiff_metadata(file_path, inventory)
+
+                for record, metadata in self.cached_extract_many(cache, geotiff_records, extract_geotiff, executor, inventory=inventory):
+                    if metadata:
+                        yield record, metadata
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(cancel_futures=True)
+
+    # Open a GeoTIFF with GDAL's directory listing turned off. GDAL is only allowed to look for
+    # sidecars (world files, .aux.xml, overviews) when the scan shows the file actually has some.
+    def extract_geotiff_metadata(self, file_path, inventory):
+        file_name = os.path.basename(file_path)
+        has_sidecars = any(
+            name != file_name and name.lower().endswith(tuple(GEOTIFF_SIDECAR_EXTENSIONS))
+            for name in inventory.directory_index.siblings(file_path)
+        )
+        # Each worker thread needs its own rasterio.Env; it reuses the drivers registered by the outer one
+        import rasterio
+        with rasterio.Env(**dict(GDAL_ENV_OPTIONS, GDAL_DISABLE_READDIR_ON_OPEN='TRUE' if has_sidecars else 'EMPTY_DIR')):
+            return self.extract_metadata(file_path, os.path.splitext(file_path)[1], inventory)
+
+    def process_geospatial_metadata(self, directory, inventory=None, cache=None):
         # Now write the metadata to the XML tree
         root = ET.Element("Geospatial_Files")
-        for metadata in geospatial_metadata_records:
-            file_element = ET.SubElement(root, "File")
-            for key, value in metadata.items():
-                ET.SubElement(file_element, key).text = str(value)
+        for _, metadata in self.iter_geospatial_metadata(directory, inventory, cache):
+            root.append(metadata_element(metadata))
 
         # Return the constructed XML tree root
         return root
@@ -608,48 +804,24 @@ class GeospatialMetadataExtractor(BaseMetadataExtractor):
         return self.create_Geospatial_metadata(geospatial_metadata_records, "output_path.xml", "Geospatial_Files")
 
     @staticmethod
-    def get_associated_files(file_path):
+    def get_associated_files(file_path, inventory=None):
         """Get associated files based on the main raster file's name."""
         file_name_without_extension = os.path.splitext(os.path.basename(file_path))[0]
         folder_path = os.path.dirname(file_path)
         # Define the extensions for associated files
         associated_extensions = ['.tfw', '.prj', '.kml', '.shp', '.shx', '.dbf']
-        associated_files = [f for f in os.listdir(folder_path) if f.startswith(file_name_without_extension) and f.endswith(tuple(associated_extensions))]
+        # Use the shared directory index rather than listing the folder again
+        if inventory is not None:
+            candidates = inventory.directory_index.with_prefix(folder_path, file_name_without_extension)
+        else:
+            candidates = [f for f in os.listdir(folder_path) if f.startswith(file_name_without_extension)]
+        associated_files = [f for f in candidates if f.endswith(tuple(associated_extensions))]
         return associated_files
 
+    # The shapefile and GeoTIFF counts are reported in the scan_complete progress event, not file by file
     @staticmethod
-    def search_geodata_files(start_dir):
-        total_files = count_files(start_dir, GEOSPATIAL_FILE_TYPES)
-
-        # Create and display the message window
-        message_root = tk.Tk()
-        message_root.title("Processing")
-        message_label = tk.Label(message_root, text=f"Searching geospatial files ({total_files} files)... please wait")
-        message_label.pack(padx=20, pady=20)
-        message_root.update()
-
-        shp_files = []
-        geotiff_files = []
-
-        for root, dirs, files in os.walk(start_dir):
-            dirs[:] = [d for d in dirs if not is_excluded_dir(d)]  # Exclude certain directories
-            for file in files:
-                # Define the full file path
-                file_path = os.path.join(root, file)
-                if file.lower().endswith('.zip'):
-                    continue  # Skip zip files
-                if any(file.lower().endswith(ext) for ext in GEOSPATIAL_FILE_TYPES):
-                    if file.lower().endswith('.shp'):
-                        shp_files.append(file_path)
-                        print(f"Detected shapefile: {file_path}")  # Debugging log for shapefiles
-                    elif file.lower().endswith('.tif') or file.lower().endswith('.tiff'):
-                        geotiff_files.append(file_path)
-                        print(f"Detected GeoTIFF file: {file_path}")  # Debugging log for GeoTIFF files
-
-        # Close the message window
-        message_root.destroy()
-
-        return shp_files, geotiff_files
+    def search_geodata_files(start_dir, inventory=None):
+        return search_geodata_files(start_dir, inventory)
 
 # New Folder Level Metadata Extractor
 class FolderLevelMetadataExtractor(BaseMetadataExtractor):
@@ -674,17 +846,19 @@ class FolderLevelMetadataExtractor(BaseMetadataExtractor):
 
         return metadata
 
-    def process_folder_metadata(self, start_dir):
+    def process_folder_metadata(self, start_dir, inventory=None):
         """
         Process only the "3D_Recording" folder and its subfolders, generating folder-level metadata.
         """
         root = ET.Element("Folder_Level_Metadata")
+        if inventory is None:
+            inventory = scan_directory(start_dir)
 
         # Look for "3D_Recording" folder and process its subfolders
-        for root_dir, dirs, _ in os.walk(start_dir):
+        for root_dir in inventory.folders:
             # Check if the current folder is "3D_Recording"
             if "3D_Recording" in os.path.basename(root_dir):
-                for subfolder in dirs:
+                for subfolder in inventory.subfolders(root_dir):
                     # Skip .zip folders
                     if not subfolder.endswith('.zip'):
                         folder_path = os.path.join(root_dir, subfolder)
@@ -699,84 +873,106 @@ class FolderLevelMetadataExtractor(BaseMetadataExtractor):
 
 # New Control Point Metadata Extractor
 class ControlPointMetadataExtractor(BaseMetadataExtractor):
-    def extract_metadata(self, file_path):
+    EXTRACTOR_VERSION = 3
+    CACHE_INCLUDES_SIDECARS = True
+
+    def extract_metadata(self, file_path, inventory=None):
         metadata = {}
         file_name = os.path.splitext(os.path.basename(file_path))[0]
         file_directory = os.path.dirname(file_path)
 
         # Look for associated files (e.g., .xml, .shx, .dbf, etc.)
-        associated_files = [f for f in os.listdir(file_directory) if f.startswith(file_name)]
+        if inventory is not None:
+            associated_files = inventory.directory_index.siblings(file_path)
+        else:
+            associated_files = [f for f in os.listdir(file_directory) if f.startswith(file_name)]
         linked_files = ', '.join(associated_files)
 
-        # Process the main control point data (coordinates, etc.)
-        if file_path.endswith(".shp"):
-            # Example extraction from shapefile (using libraries like geopandas)
-            gdf = gpd.read_file(file_path)
-            # Assuming we extract the first point for simplicity, handle iteration for multiple
-            first_point = gdf.geometry.iloc[0]
-            metadata['CONTL_X'] = first_point.x
-            metadata['CONTL_Y'] = first_point.y
-            metadata['CONTL_Z'] = first_point.z if hasattr(first_point, 'z') else ''
-
-        elif file_path.endswith(".csv"):
-            # Example CSV extraction for control points (assuming columns for X, Y, Z)
-            with open(file_path, 'r') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    metadata['CONTL_X'] = row.get('X')
-                    metadata['CONTL_Y'] = row.get('Y')
-                    metadata['CONTL_Z'] = row.get('Z', '')  # Handle missing Z
-
-        # Add other metadata fields
         metadata.update({
-            'CONTL_CX': '',  # Placeholder for Covariance X (from .dbf if available)
-            'CONTL_CY': '',  # Placeholder for Covariance Y
-            'CONTL_CZ': '',  # Placeholder for Covariance Z
+            'CONTL_X': '',  # Centroid of the points
+            'CONTL_Y': '',
+            'CONTL_Z': '',
+            'CONTL_COUNT': '',  # Number of points
+            'CONTL_Z_RANGE': '',  # Lowest and highest Z
+            'CONTL_CX': '',  # Mean and largest X accuracy (SX/X_error column, from the .dbf for shapefiles)
+            'CONTL_CY': '',  # Mean and largest Y accuracy
+            'CONTL_CZ': '',  # Mean and largest Z accuracy
             'CONTL_Location': '',  # Placeholder for textual description of location
             'FILE_DATES': '',  # Placeholder for dates (if present in attributes)
             'FILE_PROJECTID': '',  # Placeholder for project ID or reference code
-            'FILE_COVERAGE': '',  # Placeholder for site location or coverage
+            'FILE_COVERAGE': '',  # Bounding box of the points
             'FILE_PCS': '',  # Placeholder for Projected Coordinate System (from .prj file)
             'FILE_GCS': '',  # Placeholder for Geographic Coordinate System (from .prj file)
             'FILE_LINKED': linked_files  # Add the associated files as a comma-separated list
         })
 
+        # Count, centroid, extent, Z range and accuracies, read in chunks from the .csv or the .shp and its .dbf
+        from metadata_control_points import control_point_fields, point_statistics_fields, point_statistics_from_geometries
+        try:
+            point_fields = control_point_fields(file_path, inventory.directory_index if inventory is not None else None)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error reading control points {file_path}: {e}")
+            point_fields = None
+        if point_fields is None and file_path.lower().endswith(".shp"):
+            # Fall back to geopandas for shapefiles the streaming reader cannot parse
+            import geopandas as gpd
+            gdf = gpd.read_file(file_path)
+            point_fields = point_statistics_fields(point_statistics_from_geometries(gdf.geometry))
+        if point_fields:
+            metadata.update(point_fields)
+
         return metadata
 
-    def process_control_point_metadata(self, start_dir):
-        root = ET.Element("Three_Dimensional_Control_Point_Metadata")
-        for file_path in search_control_point_files(start_dir):  # Function to search relevant files
-            metadata = self.extract_metadata(file_path)
+    def iter_control_point_metadata(self, start_dir, inventory=None, cache=None, executor=None):
+        if inventory is None:
+            inventory = scan_directory(start_dir)
+        file_records = [inventory.get(file_path) for file_path in search_control_point_files(start_dir, inventory)]  # Function to search relevant files
+        extract_control_points = partial(self.extract_metadata, inventory=inventory)
+        for record, metadata in self.cached_extract_many(cache, file_records, extract_control_points, executor, inventory=inventory):
             if metadata:
-                file_element = ET.SubElement(root, "File")
-                for key, value in metadata.items():
-                    ET.SubElement(file_element, key).text = str(value)
+                yield record, metadata
+
+    def process_control_point_metadata(self, start_dir, inventory=None, cache=None):
+        root = ET.Element("Three_Dimensional_Control_Point_Metadata")
+        for _, metadata in self.iter_control_point_metadata(start_dir, inventory, cache):
+            root.append(metadata_element(metadata))
 
         return root
 
 # New Three-Dimensional Model Metadata Extractor
 class ThreeDimensionalModelMetadataExtractor(BaseMetadataExtractor):
+    EXTRACTOR_VERSION = 2
+    CACHE_INCLUDES_SIDECARS = True  # Materials and textures come from the .mtl next to an .obj
+
     def extract_metadata(self, file_path):
         metadata = {}
         file_name = os.path.splitext(os.path.basename(file_path))[0]
         file_directory = os.path.dirname(file_path)
         file_size = os.path.getsize(file_path) / (1024 * 1024)  # Convert to MB
 
+        # Vertex/face counts, bounding box, materials and textures, read in chunks from the mapped file
+        from metadata_model import read_model_stats
+        try:
+            stats = read_model_stats(file_path) or {}
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error reading 3D model {file_path}: {e}")
+            stats = {}
+
         metadata.update({
             'FILE_NAME': file_name,
             'FILE_PATH': file_directory,
             'FILE_EXTENSION': os.path.splitext(file_path)[1],
             'FILE_SIZE': f"{file_size:.2f}MB",
-            'FILE_VERT': '',  # Number of vertices (to be extracted from model if available)
-            'FILE_POLY': '',  # Number of polygons
-            'FILE_GEOMTYPE': '',  # Geometry type
+            'FILE_VERT': stats.get('vertices', ''),  # Number of vertices
+            'FILE_POLY': stats.get('polygons', ''),  # Number of polygons (faces or triangles)
+            'FILE_GEOMTYPE': stats.get('geometry_type', ''),  # Geometry type
             'FILE_UNITSCALE': '',  # Scale in units
-            'FILE_COVERAGE': '',  # Coverage information
+            'FILE_COVERAGE': stats.get('bbox', ''),  # Bounding box of the vertices
             'FILE_PCS': '',  # Projected Coordinate System (if available)
             'FILE_GCS': '',  # Geographic Coordinate System (if available)
             'FILE_LAYERS': '',  # Number of layers if applicable
-            'FILE_TEXTURES': '',  # Texture info if available
-            'FILE_MATERIAL': '',  # Material info if available
+            'FILE_TEXTURES': ', '.join(stats.get('textures', [])),  # Texture maps named in the .mtl
+            'FILE_MATERIAL': ', '.join(stats.get('materials', [])),  # Materials defined in the .mtl
             'FILE_LIGHT': '',  # Light source information
             'FILE_TYPE': '',  # Basic, technical, or extended file type
             'FILE_LOD': '',  # Level of detail
@@ -784,14 +980,18 @@ class ThreeDimensionalModelMetadataExtractor(BaseMetadataExtractor):
 
         return metadata
 
-    def process_model_metadata(self, start_dir):
-        root = ET.Element("Three_Dimensional_Model_Metadata")
-        for file_path in search_model_files(start_dir):  # Function to search relevant files
-            metadata = self.extract_metadata(file_path)
+    def iter_model_metadata(self, start_dir, inventory=None, cache=None, executor=None):
+        if inventory is None:
+            inventory = scan_directory(start_dir)
+        file_records = [inventory.get(file_path) for file_path in search_model_files(start_dir, inventory)]  # Function to search relevant files
+        for record, metadata in self.cached_extract_many(cache, file_records, self.extract_metadata, executor, inventory=inventory):
             if metadata:
-                file_element = ET.SubElement(root, "File")
-                for key, value in metadata.items():
-                    ET.SubElement(file_element, key).text = str(value)
+                yield record, metadata
+
+    def process_model_metadata(self, start_dir, inventory=None, cache=None):
+        root = ET.Element("Three_Dimensional_Model_Metadata")
+        for _, metadata in self.iter_model_metadata(start_dir, inventory, cache):
+            root.append(metadata_element(metadata))
 
         return root
 
@@ -805,6 +1005,9 @@ def open_folder(path):
 
 # Function to create a custom dialog
 def custom_message_box(parent, folder_tree_xml_path, combined_xml_path, total_folders):
+    import tkinter as tk
+    from tkinter import ttk
+
     # Create a Toplevel window
     dialog = tk.Toplevel(parent)
     dialog.title("Process Complete")
@@ -848,6 +1051,213 @@ def custom_message_box(parent, folder_tree_xml_path, combined_xml_path, total_fo
 ######
 ##################
 ##################
+# Categories counted in the scan_complete progress event
+PROGRESS_CATEGORIES = ['image', 'shapefile', 'geotiff', 'other', 'model', 'control_point', 'geophysics']
+
+# The METADATA.xml section each extractor's files are written under
+EXTRACTOR_SECTIONS = {
+    'ImageMetadataExtractor': 'Raster_And_Vector_File_Metadata',
+    'GeospatialMetadataExtractor': 'Geospatial_Files',
+    'OtherMetadataExtractor': 'Other_Files_Metadata',
+    'ThreeDimensionalModelMetadataExtractor': 'Three_Dimensional_Model_Metadata',
+    'ControlPointMetadataExtractor': 'Three_Dimensional_Control_Point_Metadata',
+    'GeophysicsMetadataExtractor': 'Geophysics_Files',
+}
+
+# Run every extractor over a project and write METADATA.xml and METADATA_FolderTree.xml.
+# project_metadata is a Project_Level element (or None). Returns the two XML paths and the folder count.
+# A ready-made inventory and long-lived image/GeoTIFF executors can be passed in by batch runs.
+# progress is a ProgressReporter that receives scan, per-stage and throughput events;
+# profiler is an optional metadata_profile.Profiler that times every extraction and phase.
+# With async_io (or a shared io_pipeline), the scan and every extractor keep many file system calls in
+# flight through a metadata_async.AsyncIOPipeline, for projects on high-latency network shares.
+# With fingerprint, every <File> gets a FILE_CHECKSUM and identical files are listed under Duplicate_Files
+# (see metadata_fingerprint.py); checksum_all hashes every file in full, not only possible duplicates.
+# With fixity, the same hashing pass also writes METADATA_Fixity.xml (see metadata_fixity.py).
+# With merge, an existing METADATA.xml (or merge_from) is updated: unchanged files keep their curated
+# <File> elements as they are, new and changed files are extracted with their manual fields carried
+# over, and deleted files are dropped (see metadata_merge.py). With merge_strict, an existing file that
+# cannot be read raises instead of being replaced by a fresh extraction.
+def run_extraction(directory, project_metadata=None, output_dir=None, use_cache=USE_METADATA_CACHE,
+                   image_workers=IMAGE_WORKERS, geotiff_workers=GEOTIFF_WORKERS,
+                   inventory=None, image_executor=None, geotiff_executor=None, progress=None, profiler=None,
+                   async_io=USE_ASYNC_IO, io_pipeline=None, fingerprint=FINGERPRINT_FILES,
+                   checksum_all=FINGERPRINT_CHECKSUM_ALL, fingerprint_workers=FINGERPRINT_WORKERS, fixity=FIXITY_MANIFEST,
+                   merge=MERGE_EXISTING_METADATA, merge_from=None, merge_strict=False):
+    own_pipeline = None
+    if async_io and io_pipeline is None:
+        from metadata_async import AsyncIOPipeline  # asyncio is only loaded in async mode
+        io_pipeline = own_pipeline = AsyncIOPipeline()
+    # A reporter passed in belongs to the caller, who closes it if the run fails part way
+    own_progress = None
+    if progress is None:
+        progress = own_progress = ProgressReporter()
+    try:
+        return _run_extraction(directory, project_metadata, output_dir, use_cache, image_workers, geotiff_workers,
+                               inventory, image_executor, geotiff_executor, progress, profiler, io_pipeline,
+                               fingerprint, checksum_all, fingerprint_workers, fixity, merge, merge_from, merge_strict)
+    finally:
+        if own_progress is not None:
+            own_progress.close()
+        if own_pipeline is not None:
+            own_pipeline.close()
+
+def _run_extraction(directory, project_metadata, output_dir, use_cache, image_workers, geotiff_workers,
+                    inventory, image_executor, geotiff_executor, progress, profiler, io_pipeline,
+                    fingerprint, checksum_all, fingerprint_workers, fixity, merge, merge_from, merge_strict):
+    output_dir = output_dir or directory
+    phase = profiler.phase if profiler is not None else lambda name: nullcontext()
+
+    # In async mode the pipeline stands in for the image and GeoTIFF pools unless others are passed in
+    if io_pipeline is not None:
+        image_executor = image_executor or io_pipeline
+        geotiff_executor = geotiff_executor or io_pipeline
+
+    # Scan the project once; every extractor and the folder tree share this inventory
+    if inventory is None:
+        with phase('scan'):
+            if io_pipeline is not None:
+                inventory = io_pipeline.scan_directory(directory, progress=progress)
+            else:
+                inventory = scan_directory(directory, progress=progress)
+    progress.scan_complete(inventory, PROGRESS_CATEGORIES)
+
+    # Unchanged files are served from the cache kept in the project directory
+    with phase('cache_open'):
+        cache = open_project_cache(directory, CACHE_FILE_NAME) if use_cache else None
+
+    # Content hashes are needed before the first <File> is written. The fixity manifest needs a full hash
+    # of every file, including those in excluded folders, so it shares one hashing pass with the duplicates.
+    # Duplicates are only looked for among the scanned files, so files inside excluded folders are hashed
+    # for the manifest but never listed under Duplicate_Files.
+    fingerprints = None
+    fixity_files = []
+    if fingerprint or fixity:
+        from metadata_fingerprint import ContentFingerprinter, duplicate_group_element
+        records = None
+        if fixity:
+            from metadata_fixity import FIXITY_XML_NAME, fixity_records, write_fixity_manifest
+            fixity_files = fixity_records(inventory, output_dir)
+            manifest_paths = {record.path for record in fixity_files}
+            records = fixity_files + [record for record in inventory.files if record.path not in manifest_paths]
+        with phase('fingerprint'):
+            fingerprinter = ContentFingerprinter(workers=fingerprint_workers, checksum_all=checksum_all or fixity)
+            fingerprints = fingerprinter.fingerprint(inventory, cache=cache, executor=io_pipeline, progress=progress,
+                                                     records=records, duplicate_records=inventory.files)
+        if fingerprint:
+            progress.emit('duplicates', groups=len(fingerprints.duplicate_groups),
+                          files=sum(len(group.records) for group in fingerprints.duplicate_groups),
+                          redundant_bytes=fingerprints.redundant_bytes)
+
+    # In merge mode the previous METADATA.xml is indexed before it is replaced, and stands in front of the cache
+    combined_xml_path = os.path.join(output_dir, 'METADATA.xml')
+    existing = None
+    extract_cache = cache
+    if merge:
+        from metadata_merge import load_existing_metadata, merge_fields, signature_attributes, MergeCache
+        with phase('merge_index'):
+            existing = load_existing_metadata(merge_from or combined_xml_path, strict=merge_strict)
+        if existing is not None:
+            extract_cache = MergeCache(existing, cache, EXTRACTOR_SECTIONS)
+            project_metadata = merge_project_metadata(project_metadata, existing.project_level)
+    counts = {'new': 0, 'updated': 0}
+
+    # Write Combined Metadata XML, one File element at a time as each extractor yields it
+    with StreamingXMLWriter(combined_xml_path, "CombinedMetadata") as writer:
+
+        # Each section is passed through progress.track, which times files as they are yielded
+        def write_section(section_tag, stage, extractor, records, metadata_iterator):
+            extractor.profiler = profiler
+            with phase(f'extract_{stage}'):
+                writer.start(section_tag)
+                for record, metadata in progress.track(stage, records, metadata_iterator):
+                    if fingerprint:
+                        metadata = dict(metadata, FILE_CHECKSUM=fingerprints.checksum(record.path))
+                    attrib = None
+                    if merge:
+                        # Record what the file looked like, so the next merge can tell whether it changed
+                        attrib = signature_attributes(record.path, extractor.cache_signature(record, inventory),
+                                                      extractor.EXTRACTOR_VERSION)
+                        entry = existing.get(section_tag, record.path) if existing is not None else None
+                        if entry is None:
+                            counts['new'] += 1
+                        else:
+                            existing.used.add((section_tag, record.path))
+                            if entry[0] != attrib:
+                                counts['updated'] += 1
+                            metadata = merge_fields(metadata, entry[1])
+                    with phase('serialize'):
+                        writer.write_metadata(metadata, attrib=attrib)
+                writer.end()
+
+        if project_metadata is not None:
+            writer.write_element(project_metadata)
+
+        # Process Image Metadata
+        image_extractor = ImageMetadataExtractor()
+        write_section("Raster_And_Vector_File_Metadata", 'image', image_extractor, inventory.files_in_category('image'),
+                      image_extractor.iter_image_metadata(directory, inventory, workers=image_workers, cache=extract_cache, executor=image_executor))
+
+        # Process Geospatial Metadata
+        geospatial_extractor = GeospatialMetadataExtractor()
+        write_section("Geospatial_Files", 'geospatial', geospatial_extractor,
+                      inventory.files_in_category('shapefile') + inventory.files_in_category('geotiff'),
+                      geospatial_extractor.iter_geospatial_metadata(directory, inventory, cache=extract_cache, workers=geotiff_workers, executor=geotiff_executor))
+
+        # Process Other Metadata
+        other_extractor = OtherMetadataExtractor()
+        write_section("Other_Files_Metadata", 'other', other_extractor, inventory.files_in_category('other'),
+                      other_extractor.iter_other_metadata(directory, inventory, cache=extract_cache, executor=io_pipeline))
+
+        # Process 3D Model Metadata
+        model_extractor = ThreeDimensionalModelMetadataExtractor()
+        write_section("Three_Dimensional_Model_Metadata", 'model', model_extractor, inventory.files_in_category('model'),
+                      model_extractor.iter_model_metadata(directory, inventory, cache=extract_cache, executor=io_pipeline))
+
+        # Process Control Point Metadata
+        control_point_extractor = ControlPointMetadataExtractor()
+        write_section("Three_Dimensional_Control_Point_Metadata", 'control_point', control_point_extractor,
+                      inventory.files_in_category('control_point'),
+                      control_point_extractor.iter_control_point_metadata(directory, inventory, cache=extract_cache, executor=io_pipeline))
+
+        # Process Geophysics Metadata
+        geophysics_extractor = GeophysicsMetadataExtractor()
+        write_section("Geophysics_Files", 'geophysics', geophysics_extractor, inventory.files_in_category('geophysics'),
+                      geophysics_extractor.iter_geophysics_metadata(directory, inventory, cache=extract_cache, executor=io_pipeline))
+
+        # Every set of identical files in the project, whichever section (if any) they appear in
+        if fingerprint:
+            writer.start("Duplicate_Files")
+            for group in fingerprints.duplicate_groups:
+                writer.write_element(duplicate_group_element(group))
+            writer.end()
+
+    if existing is not None:
+        progress.emit('merge', kept=extract_cache.kept, updated=counts['updated'], new=counts['new'],
+                      dropped=len(existing.dropped()))
+
+    # Save newly extracted metadata for the next run
+    if cache is not None:
+        progress.emit('cache', hits=cache.hits, misses=cache.misses)
+        with phase('cache_save'):
+            cache.prune(inventory, fixity_files)
+            cache.close()
+
+    # Write Folder Tree XML
+    folder_tree_xml_path = os.path.join(output_dir, 'METADATA_FolderTree.xml')
+    with phase('folder_tree'):
+        write_folder_tree_xml(directory, folder_tree_xml_path, inventory, progress)
+
+    # Write the fixity manifest alongside the folder tree
+    if fixity:
+        with phase('fixity'):
+            write_fixity_manifest(os.path.join(output_dir, FIXITY_XML_NAME), directory, fixity_files,
+                                  fingerprints.checksums, fingerprinter.algorithm)
+
+    total_folders = count_total_folders(directory, inventory)
+    progress.finished(metadata_xml=combined_xml_path, folder_tree_xml=folder_tree_xml_path, folders=total_folders)
+    return combined_xml_path, folder_tree_xml_path, total_folders
+
 def open_folder(path):
     # Function to open the folder, adjust based on your platform
     if sys.platform == "win32":
@@ -856,9 +1266,12 @@ def open_folder(path):
         opener = "open" if sys.platform == "darwin" else "xdg-open"
         subprocess.call([opener, path])
 
-def show_completion_window(folder_tree_xml_path, combined_xml_path, total_folders, directory):
+def show_completion_window(folder_tree_xml_path, combined_xml_path, total_folders, directory, parent=None):
+    import tkinter as tk
+    from tkinter import ttk
+
     # Create a new window to show completion message
-    completion_window = tk.Tk()
+    completion_window = tk.Toplevel(parent) if parent is not None else tk.Tk()
     completion_window.title("Process Complete")
 
     # Message label
@@ -877,70 +1290,29 @@ def show_completion_window(folder_tree_xml_path, combined_xml_path, total_folder
     exit_button = ttk.Button(completion_window, text="Finish", command=completion_window.destroy)
     exit_button.pack(side=tk.RIGHT, padx=10, pady=10)
 
-    # Run the window's main loop
-    completion_window.mainloop()
+    # Run the window's main loop; from the menu, the menu's loop already does
+    if parent is None:
+        completion_window.mainloop()
 
-if __name__ == "__main__":
+# Run the extractor's GUI. MainMenu calls this in-process with its root window as parent, so the heavy
+# libraries are only loaded once it starts and every window belongs to the menu's Tk interpreter.
+def main(parent=None):
 
     # Get directory details and location for saving the XML
-    directory, save_directory = get_directory_info_via_gui()
-    combined_root = ET.Element("CombinedMetadata")
+    directory, save_directory = get_directory_info_via_gui(parent)
 
     # Process project metadata
-    project_metadata = process_project_metadata()
-    if project_metadata is not None:
-        combined_root.append(project_metadata)
-
-    # Process Image Metadata
-    image_extractor = ImageMetadataExtractor()
-    image_metadata = image_extractor.create_image_metadata(directory)
-    if image_metadata is not None:
-        combined_root.append(image_metadata)
-
-    # Process Geospatial Metadata
-    geospatial_extractor = GeospatialMetadataExtractor()
-    geospatial_metadata = geospatial_extractor.process_geospatial_metadata(directory)
-    if geospatial_metadata is not None:
-        combined_root.append(geospatial_metadata)
-
-    # Process Other Metadata
-    other_extractor = OtherMetadataExtractor()
-    other_metadata = other_extractor.process_other_metadata(directory)  # Pass 'directory' as an argument
-    if other_metadata is not None:
-        combined_root.append(other_metadata)
-
-    # Process 3D Model Metadata
-    model_extractor = ThreeDimensionalModelMetadataExtractor()
-    model_metadata = model_extractor.process_model_metadata(directory)
-    if model_metadata is not None:
-        combined_root.append(model_metadata)
-
-    # Process Control Point Metadata
-    control_point_extractor = ControlPointMetadataExtractor()
-    control_point_metadata = control_point_extractor.process_control_point_metadata(directory)
-    if control_point_metadata is not None:
-        combined_root.append(control_point_metadata)
-
-    # Process Geophysics Metadata
-    
-    geophysics_extractor = GeophysicsMetadataExtractor()
-    geophysics_metadata = geophysics_extractor.process_geophysics_metadata(directory)  # Pass 'directory' as an argument
-    if geophysics_metadata is not None:
-        combined_root.append(geophysics_metadata)
+    project_metadata = process_project_metadata(parent)
 
-    # Write Combined Metadata XML
-    combined_tree = ET.ElementTree(combined_root)
-    combined_xml_path = os.path.join(directory, 'METADATA.xml')
-    combined_tree.write(combined_xml_path, encoding='utf-8', xml_declaration=True)
-
-    # Write Folder Tree XML
-    folder_tree_root = create_folder_tree_xml(directory)
-    folder_tree = ET.ElementTree(folder_tree_root)
-    folder_tree_xml_path = os.path.join(directory, 'METADATA_FolderTree.xml')
-    folder_tree.write(folder_tree_xml_path, encoding='utf-8', xml_declaration=True)
-
-    # Total folders processed (assuming you have a variable total_folders from create_folder_tree_xml)
-    total_folders = count_total_folders(directory)
+    # Extract everything and write the XML files, with a progress window in place of the old "please wait" boxes
+    progress = ProgressReporter([TkProgressSink(parent=parent)])
+    try:
+        combined_xml_path, folder_tree_xml_path, total_folders = run_extraction(directory, project_metadata, progress=progress)
+    finally:
+        progress.close()  # Already closed by a run that finished; this closes the window after an error
 
     # Call the custom completion window function
-    show_completion_window(folder_tree_xml_path, combined_xml_path, total_folders, directory)
\ No newline at end of file
+    show_completion_window(folder_tree_xml_path, combined_xml_path, total_folders, directory, parent)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import hashlib
+import mmap
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from config_performance import FINGERPRINT_ALGORITHM, FINGERPRINT_PARTIAL_BYTES, FINGERPRINT_CHUNK_SIZE
+from config_performance import FINGERPRINT_WORKERS, FINGERPRINT_PARALLEL_MIN_FILES
+
+##################
+##################
+######
+###### Content fingerprints and duplicate files
+######
+##################
+##################
+
+# Digests are written as 'algorithm:hex', e.g. 'sha256:9f86d0...', so the XML says how they were made
+def format_checksum(digest, algorithm=FINGERPRINT_ALGORITHM):
+    return f"{algorithm}:{digest}"
+
+# Hash of a whole file, streamed through a memory map in chunk_size pieces. hashlib releases the GIL
+# while it hashes each piece (and the page faults that read it happen inside that call), so several
+# threads hash on several cores at once. Falls back to ordinary reads where a file cannot be mapped.
+def full_hash(file_path, algorithm=FINGERPRINT_ALGORITHM, chunk_size=FINGERPRINT_CHUNK_SIZE):
+    digest = hashlib.new(algorithm)
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                digest.update(chunk)
+            return digest.hexdigest()
+        with mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+# Hash of the first and last partial_bytes of a file. Files no bigger than both pieces together are
+# read whole, so for them the partial hash is already the full hash.
+def partial_hash(file_path, size, algorithm=FINGERPRINT_ALGORITHM, partial_bytes=FINGERPRINT_PARTIAL_BYTES):
+    if size <= 2 * partial_bytes:
+        return full_hash(file_path, algorithm)
+    digest = hashlib.new(algorithm)
+    with open(file_path, 'rb') as file:
+        digest.update(file.read(partial_bytes))
+        file.seek(-partial_bytes, os.SEEK_END)
+        digest.update(file.read(partial_bytes))
+    return digest.hexdigest()
+
+# Files with identical content: the shared checksum, the size of one copy and the records of every copy
+class DuplicateGroup:
+    def __init__(self, checksum, size, records):
+        self.checksum = checksum
+        self.size = size
+        self.records = records
+
+    @property
+    def redundant_bytes(self):
+        return self.size * (len(self.records) - 1)
+
+class FingerprintResult:
+    def __init__(self, checksums, duplicate_groups):
+        self.checksums = checksums  # File path -> 'algorithm:hex', for every file that was hashed in full
+        self.duplicate_groups = duplicate_groups  # DuplicateGroups in scan order of their first copy
+
+    def checksum(self, file_path):
+        return self.checksums.get(file_path, '')
+
+    @property
+    def redundant_bytes(self):
+        return sum(group.redundant_bytes for group in self.duplicate_groups)
+
+# Finds files with identical content without reading every byte of the archive:
+#   1. files are bucketed by size from the scan; a file with a unique size cannot have a copy
+#   2. files sharing a size get a partial hash of their first and last FINGERPRINT_PARTIAL_BYTES
+#   3. only files that still collide on (size, partial hash) are hashed in full
+# With checksum_all every file is hashed in full instead, so every <File> gets a FILE_CHECKSUM.
+# Hashes are kept in the metadata cache (as the 'ContentFingerprinter' extractor), so unchanged
+# files are not read again on the next run.
+class ContentFingerprinter:
+    EXTRACTOR_VERSION = 1  # Bump when the hashes change so cached ones are recomputed
+
+    def __init__(self, algorithm=FINGERPRINT_ALGORITHM, workers=FINGERPRINT_WORKERS, checksum_all=False):
+        self.algorithm = algorithm
+        self.workers = workers or os.cpu_count() or 1
+        self.checksum_all = checksum_all
+
+    def _partial_hash(self, record):
+        try:
+            return partial_hash(record.path, record.size, self.algorithm)
+        except OSError as e:
+            print(f"Error hashing {record.path}: {e}")
+            return None
+
+    def _full_hash(self, record):
+        try:
+            return full_hash(record.path, self.algorithm)
+        except OSError as e:
+            print(f"Error hashing {record.path}: {e}")
+            return None
+
+    # Yield (record, digest) in order, on the executor's threads if given
+    def _hash_many(self, hash_function, records, executor):
+        digests = executor.map(hash_function, records) if executor is not None else map(hash_function, records)
+        return zip(records, digests)
+
+    # records defaults to every file in the inventory. Duplicate groups are only built from
+    # duplicate_records (default: records), which must be among the records hashed.
+    def fingerprint(self, inventory, cache=None, executor=None, progress=None, records=None, duplicate_records=None):
+        # Links point at files hashed elsewhere
+        records = [record for record in (inventory.files if records is None else records) if not record.is_link]
+
+        # Hashes from the cache are only used when the file's size and mtime are unchanged
+        partial = {}
+        full = {}
+        if cache is not None:
+            for record in records:
+                hit, payload = cache.get(self, record)
+                if hit and payload.get('ALGORITHM') == self.algorithm:
+                    if payload.get('PARTIAL'):
+                        partial[record.path] = payload['PARTIAL']
+                    if payload.get('CHECKSUM'):
+                        full[record.path] = payload['CHECKSUM']
+        cached_partial, cached_full = dict(partial), dict(full)
+
+        own_executor = None
+        if executor is None and self.workers != 1 and len(records) >= FINGERPRINT_PARALLEL_MIN_FILES:
+            executor = own_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='metadata-hash')
+        try:
+            if self.checksum_all:
+                to_hash = records
+            else:
+                # Stage 1: only sizes shared by two or more files can hold duplicates (empty files are all alike)
+                by_size = {}
+                for record in records:
+                    if record.size > 0:
+                        by_size.setdefault(record.size, []).append(record)
+                candidates = [record for group in by_size.values() if len(group) > 1 for record in group]
+
+                # Stage 2: partial hashes of the candidates
+                pending = [record for record in candidates if record.path not in partial]
+                for record, digest in self._track(progress, 'fingerprint_partial', pending,
+                                                  self._hash_many(self._partial_hash, pending, executor)):
+                    if digest is not None:
+                        partial[record.path] = digest
+
+                by_partial = {}
+                for record in candidates:
+                    if record.path in partial:
+                        by_partial.setdefault((record.size, partial[record.path]), []).append(record)
+                to_hash = []
+                for group in by_partial.values():
+                    if len(group) < 2:
+                        continue
+                    for record in group:
+                        # A small file's partial hash already covers the whole file
+                        if record.size <= 2 * FINGERPRINT_PARTIAL_BYTES:
+                            full[record.path] = partial[record.path]
+                        else:
+                            to_hash.append(record)
+
+            # Stage 3: full hashes, streamed through a memory map
+            pending = [record for record in to_hash if record.path not in full]
+            for record, digest in self._track(progress, 'fingerprint_full', pending,
+                                              self._hash_many(self._full_hash, pending, executor)):
+                if digest is not None:
+                    full[record.path] = digest
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(cancel_futures=True)
+
+        if cache is not None:
+            for record in records:
+                path = record.path
+                if partial.get(path) != cached_partial.get(path) or full.get(path) != cached_full.get(path):
+                    cache.put(self, record, {'ALGORITHM': self.algorithm, 'PARTIAL': partial.get(path, ''), 'CHECKSUM': full.get(path, '')})
+
+        if duplicate_records is not None:
+            records = [record for record in duplicate_records if not record.is_link]
+        return FingerprintResult(
+            {path: format_checksum(digest, self.algorithm) for path, digest in full.items()},
+            self.duplicate_groups(records, full),
+        )
+
+    # Groups of two or more non-empty files with the same size and full hash, in scan order
+    def duplicate_groups(self, records, full):
+        groups = {}
+        for record in records:
+            if record.size > 0 and record.path in full:
+                groups.setdefault((record.size, full[record.path]), []).append(record)
+        return [DuplicateGroup(format_checksum(digest, self.algorithm), size, group)
+                for (size, digest), group in groups.items() if len(group) > 1]
+
+    def _track(self, progress, stage, records, iterator):
+        if progress is None:
+            return iterator
+        return progress.track(stage, records, iterator)
+
+# <Duplicate_Group> element listing every copy of one file
+def duplicate_group_element(group):
+    element = ET.Element("Duplicate_Group")
+    ET.SubElement(element, "FILE_CHECKSUM").text = group.checksum
+    ET.SubElement(element, "FILE_SIZE").text = f"{group.size / (1024 * 1024):.2f}MB"
+    ET.SubElement(element, "DUPLICATE_COUNT").text = str(len(group.records))
+    ET.SubElement(element, "DUPLICATE_REDUNDANT_SIZE").text = f"{group.redundant_bytes / (1024 * 1024):.2f}MB"
+    for record in group.records:
+        ET.SubElement(element, "FILE_PATH").text = record.path
+    return element
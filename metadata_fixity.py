@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from metadata_scanner import scan_directory, is_excluded_dir
+from metadata_xml_writer import StreamingXMLWriter
+from metadata_fingerprint import full_hash, format_checksum
+from metadata_progress import PROGRESS_SINKS, build_progress_reporter
+from metadata_extractor_cli import positive_int
+from config_performance import FINGERPRINT_WORKERS
+
+##################
+##################
+######
+###### Fixity manifest and verification
+######
+##################
+##################
+
+FIXITY_XML_NAME = 'METADATA_Fixity.xml'
+
+# Files the extractor writes itself; they change on every run, so they are not part of the manifest
+GENERATED_FILE_NAMES = ['METADATA.xml', 'METADATA_FolderTree.xml', FIXITY_XML_NAME]
+
+# Manifest paths are relative to the project folder and use '/', so the manifest still applies after
+# the project has been copied to another drive, server or operating system
+def manifest_path(directory, file_path):
+    return os.path.relpath(file_path, directory).replace(os.sep, '/')
+
+# The scan skips Agisoft and ArcGIS folders (.files, .gdb, .Overviews), but their files are part of
+# the deposit, so every file below them is added to the manifest
+def excluded_folder_records(inventory):
+    records = []
+    for folder_path in inventory.folders:
+        for name, is_dir in inventory.entries.get(folder_path, []):
+            if is_dir and is_excluded_dir(name):
+                records.extend(scan_directory(os.path.join(folder_path, name), apply_exclusions=False).files)
+    return records
+
+# Every file whose fixity is recorded: the scanned files and those in excluded folders, without links
+# and without the XML files written by the extractor into the project folder
+def fixity_records(inventory, output_dir=None):
+    generated = {os.path.join(output_dir or inventory.start_dir, name) for name in GENERATED_FILE_NAMES}
+    return [record for record in inventory.files + excluded_folder_records(inventory)
+            if not record.is_link and record.path not in generated]
+
+# Write METADATA_Fixity.xml: the algorithm and totals, then a <File> per file with its path, size,
+# modification time and checksum. checksums maps file paths to 'algorithm:hex' (see metadata_fingerprint.py).
+def write_fixity_manifest(fixity_xml_path, directory, records, checksums, algorithm):
+    with StreamingXMLWriter(fixity_xml_path, 'Fixity_Manifest') as writer:
+        writer.write_metadata({
+            'ALGORITHM': algorithm,
+            'CREATED': datetime.now().isoformat(timespec='seconds'),
+            'FILE_COUNT': len(records),
+            'TOTAL_BYTES': sum(record.size for record in records),
+        }, tag='Manifest_Info')
+        for record in records:
+            writer.write_metadata({
+                'FILE_PATH': manifest_path(directory, record.path),
+                'FILE_BYTES': record.size,
+                'FILE_MTIME': record.mtime,
+                'FILE_CHECKSUM': checksums.get(record.path, ''),
+            })
+
+# Read a manifest back as (algorithm, {relative path: (size, mtime, checksum)})
+def read_fixity_manifest(fixity_xml_path):
+    algorithm = None
+    entries = {}
+    for _, element in ET.iterparse(fixity_xml_path):
+        if element.tag == 'Manifest_Info':
+            algorithm = element.findtext('ALGORITHM')
+            element.clear()
+        elif element.tag == 'File':
+            entries[element.findtext('FILE_PATH')] = (
+                int(element.findtext('FILE_BYTES')),
+                float(element.findtext('FILE_MTIME')),
+                element.findtext('FILE_CHECKSUM') or '',
+            )
+            element.clear()
+    return algorithm, entries
+
+######
+###### Verification
+######
+
+VERIFY_STATUSES = ['ok', 'modified', 'size_changed', 'missing', 'unreadable', 'added']
+
+# Re-hash a project against its manifest. Files are only read when their size still matches:
+# a different size is already a certain mismatch, so it is reported without hashing. Everything
+# else is hashed in full on a thread pool, since fixity is about changes that leave size and mtime alone.
+# Returns a summary dictionary with per-status paths, bytes hashed and MB/s.
+def verify_fixity(directory, fixity_xml_path=None, workers=FINGERPRINT_WORKERS, progress=None):
+    fixity_xml_path = fixity_xml_path or os.path.join(directory, FIXITY_XML_NAME)
+    algorithm, entries = read_fixity_manifest(fixity_xml_path)
+    if algorithm is None:
+        raise ValueError(f"{fixity_xml_path} has no Manifest_Info/ALGORITHM")
+
+    start_time = time.perf_counter()
+    inventory = scan_directory(directory, progress=progress)
+    on_disk = {manifest_path(directory, record.path): record
+               for record in fixity_records(inventory, os.path.dirname(os.path.abspath(fixity_xml_path)))}
+
+    results = {status: [] for status in VERIFY_STATUSES}
+    to_hash = []
+    for path, (size, _, checksum) in entries.items():
+        record = on_disk.get(path)
+        if record is None:
+            results['missing'].append(path)
+        elif record.size != size:
+            results['size_changed'].append(path)
+        else:
+            to_hash.append((path, record, checksum))
+    results['added'] = [path for path in on_disk if path not in entries]
+
+    def hash_file(record):
+        try:
+            return format_checksum(full_hash(record.path, algorithm), algorithm)
+        except OSError as e:
+            print(f"Error hashing {record.path}: {e}")
+            return None
+
+    records = [record for _, record, _ in to_hash]
+    executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix='metadata-verify')
+    try:
+        hashed = zip(records, executor.map(hash_file, records))
+        if progress is not None:
+            hashed = progress.track('verify', records, hashed)
+        for (path, _, expected), (_, actual) in zip(to_hash, hashed):
+            if actual is None:
+                results['unreadable'].append(path)
+            elif actual == expected:
+                results['ok'].append(path)
+            else:
+                results['modified'].append(path)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    seconds = time.perf_counter() - start_time
+    hashed_bytes = sum(record.size for record in records)
+    return {
+        'project': directory,
+        'manifest': fixity_xml_path,
+        'algorithm': algorithm,
+        'files': len(entries),
+        'hashed_files': len(records),
+        'hashed_bytes': hashed_bytes,
+        'seconds': round(seconds, 3),
+        'mb_per_second': round(hashed_bytes / 1e6 / seconds, 2) if seconds > 0 else None,
+        'counts': {status: len(paths) for status, paths in results.items()},
+        'results': {status: paths for status, paths in results.items() if status != 'ok'},
+    }
+
+def print_verify_summary(summary):
+    counts = summary['counts']
+    for status in VERIFY_STATUSES[1:]:
+        for path in summary['results'][status]:
+            print(f"{status.upper():<13} {path}")
+    print(f"{counts['ok']}/{summary['files']} files verified: {summary['hashed_files']} hashed, "
+          f"{summary['hashed_bytes'] / 1e6:.1f} MB in {summary['seconds']:.1f}s ({summary['mb_per_second']} MB/s)")
+    problems = ', '.join(f"{counts[status]} {status}" for status in VERIFY_STATUSES[1:] if counts[status])
+    print(f"Problems: {problems}" if problems else "No problems found")
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description=f"Re-verify a project against the {FIXITY_XML_NAME} written by the extractor's --fixity option.")
+    parser.add_argument('project_dir', help="Project directory to verify")
+    parser.add_argument('--manifest', metavar='FILE', help=f"Fixity manifest (default: PROJECT_DIR/{FIXITY_XML_NAME})")
+    parser.add_argument('--workers', type=positive_int, default=FINGERPRINT_WORKERS,
+                        help="Hashing threads (default: one per CPU core; 1 = serial)")
+    parser.add_argument('--report', metavar='FILE', help="Write the verification results as JSON")
+    parser.add_argument('--progress', choices=['none'] + list(PROGRESS_SINKS), default='console',
+                        help="Where to send progress events (default: console; jsonl writes one JSON object per line)")
+    parser.add_argument('--progress-file', metavar='FILE', help="Append --progress jsonl events to FILE instead of stdout")
+    return parser
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.project_dir):
+        parser.error(f"project directory not found: {args.project_dir}")
+    manifest = args.manifest or os.path.join(args.project_dir, FIXITY_XML_NAME)
+    if not os.path.isfile(manifest):
+        parser.error(f"fixity manifest not found: {manifest}")
+
+    progress = build_progress_reporter(args.progress, args.progress_file)
+    try:
+        summary = verify_fixity(args.project_dir, manifest, args.workers, progress)
+        progress.finished(**summary['counts'])
+    except (ET.ParseError, ValueError) as e:
+        parser.error(f"could not read {manifest}: {e}")
+    finally:
+        progress.close()
+    print_verify_summary(summary)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    return 0 if summary['counts']['ok'] == summary['files'] and not summary['counts']['added'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
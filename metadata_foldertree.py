@@ -3,50 +3,74 @@ import tkinter as tk
 from tkinter import filedialog
 import xml.etree.ElementTree as ET
 
-def get_folder_size_and_file_count(folder_path):
-    total_size = 0
-    file_count = 0
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not os.path.islink(file_path):  # Skip symbolic links
-                total_size += os.path.getsize(file_path)
-                file_count += 1
+from metadata_scanner import scan_directory
+from metadata_xml_writer import StreamingXMLWriter
+
+def get_folder_size_and_file_count(folder_path, inventory):
+    total_size, file_count = inventory.folder_totals(folder_path)  # Aggregated once, bottom-up
     SizeMB = total_size / (1024 * 1024)  # Convert bytes to megabytes
     return round(SizeMB, 2), file_count  # Round to 2 decimal places
 
-def create_folder_element(folder_path, parent_xml_element):
+def create_folder_element(folder_path, parent_xml_element, inventory):
     folder_name = os.path.basename(folder_path)
-    folder_size, file_count = get_folder_size_and_file_count(folder_path)
+    folder_size, file_count = get_folder_size_and_file_count(folder_path, inventory)
     folder_element = ET.SubElement(parent_xml_element, 'FOLDER', {
         'Name': folder_name,
         'Size_MB': str(folder_size),
         'FileCount': str(file_count)
     })
 
-    for item in os.listdir(folder_path):
+    for item, is_dir in inventory.entries.get(folder_path, []):
         item_full_path = os.path.join(folder_path, item)
-        if os.path.isdir(item_full_path):
-            create_folder_element(item_full_path, folder_element)
+        if is_dir:
+            create_folder_element(item_full_path, folder_element, inventory)
         else:
             file_element = ET.SubElement(folder_element, 'FILE', {'Name': item})
 
+def write_folder_element(folder_path, writer, inventory):
+    folder_name = os.path.basename(folder_path)
+    folder_size, file_count = get_folder_size_and_file_count(folder_path, inventory)
+    writer.start('FOLDER', {
+        'Name': folder_name,
+        'Size_MB': str(folder_size),
+        'FileCount': str(file_count)
+    })
+
+    for item, is_dir in inventory.entries.get(folder_path, []):
+        item_full_path = os.path.join(folder_path, item)
+        if is_dir:
+            write_folder_element(item_full_path, writer, inventory)
+        else:
+            writer.write_element(ET.Element('FILE', {'Name': item}))
+
+    writer.end()
+
+# Stream the folder tree to disk instead of building it in memory first
+def write_folder_tree_xml(start_dir, folder_tree_xml_path):
+    inventory = scan_directory(start_dir, apply_exclusions=False)
+    with StreamingXMLWriter(folder_tree_xml_path, 'Folder_Tree') as writer:
+        write_folder_element(start_dir, writer, inventory)
+
 def create_folder_tree_xml(start_dir):
+    # Every file is stat'ed once here; folder sizes are rolled up from the scan
+    inventory = scan_directory(start_dir, apply_exclusions=False)
     root = ET.Element('Folder_Tree')
-    create_folder_element(start_dir, root)
+    create_folder_element(start_dir, root, inventory)
     return root
 
-def generate_folder_tree():
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
-    directory = filedialog.askdirectory(title="Select Directory for Folder Tree")
-    root.destroy()
+# parent is MainMenu's window when launched from the menu; run standalone, a hidden Tk root hosts the dialog
+def generate_folder_tree(parent=None):
+    root = None
+    if parent is None:
+        root = tk.Tk()
+        root.withdraw()  # Hide the main window
+    directory = filedialog.askdirectory(title="Select Directory for Folder Tree", parent=parent if parent is not None else root)
+    if root is not None:
+        root.destroy()
 
     if directory:
-        folder_tree_root = create_folder_tree_xml(directory)
-        folder_tree = ET.ElementTree(folder_tree_root)
         folder_tree_xml_path = os.path.join(directory, 'METADATA_FolderTree.xml')
-        folder_tree.write(folder_tree_xml_path, encoding='utf-8', xml_declaration=True)
+        write_folder_tree_xml(directory, folder_tree_xml_path)
         print(f"Folder tree file has been created at: {folder_tree_xml_path}")
     else:
         print("No directory selected, operation cancelled.")
@@ -0,0 +1,209 @@
+import re
+import warnings
+
+import numpy as np
+
+from config_performance import GEOPHYSICS_DUMMY_VALUE, GEOPHYSICS_CHUNK_SIZE, GEOPHYSICS_HEADER_BYTES
+
+##################
+##################
+######
+###### Geophysics headers (.xgd/.xcp) and survey data (.xyz)
+######
+##################
+##################
+
+# Header field -> accepted key spellings, compared with case, spaces and punctuation removed.
+# TerraSurveyor writes XML tags; older exports and hand-edited files use "Key = value" or "Key: value" lines.
+HEADER_FIELDS = {
+    'instrument': ['instrument', 'instrumenttype', 'instrumentname', 'gradiometer'],
+    'units': ['units', 'unit', 'dataunits'],
+    'method': ['method', 'surveymethod', 'surveytype', 'technique'],
+    'sensors': ['sensors', 'numberofsensors', 'sensorcount', 'nsensors'],
+    'grid_size': ['gridsize', 'grid', 'griddimensions'],
+    'x_interval': ['xinterval', 'sampleinterval', 'xsampleinterval', 'samplespacing'],
+    'y_interval': ['yinterval', 'traverseinterval', 'lineinterval', 'traversespacing'],
+    'traverse_direction': ['traversedirection', 'firsttraversedirection', 'direction', '1sttraversedirection'],
+    'dummy_value': ['dummyvalue', 'dummy', 'nodatavalue'],
+    'composite_size': ['compositesize', 'compositedimensions'],
+    'survey_size': ['surveysize', 'surveyarea'],
+    'nw_coordinate': ['nwcoordinate', 'nw', 'topleft', 'northwest'],
+    'se_coordinate': ['secoordinate', 'se', 'bottomright', 'southeast'],
+    'central_coordinate': ['centralcoordinate', 'centrecoordinate', 'centercoordinate', 'centre', 'center'],
+    'comments': ['comments', 'comment', 'notes', 'description'],
+}
+KEY_TO_FIELD = {spelling: field for field, spellings in HEADER_FIELDS.items() for spelling in spellings}
+
+XML_FIELD = re.compile(r'<([A-Za-z][\w.-]*)(?:\s[^>]*)?>([^<]*)</\1\s*>')
+LINE_FIELD = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9 _./()-]*?)\s*[=:]\s*(.+?)\s*$', re.M)
+
+def _normalise_key(key):
+    return re.sub(r'[^a-z0-9]', '', key.lower())
+
+# Read the known header fields from a TerraSurveyor grid (.xgd) or composite (.xcp).
+# Only the first GEOPHYSICS_HEADER_BYTES are read, and the embedded readings (if any) are skipped.
+def read_terrasurveyor_header(file_path, header_bytes=GEOPHYSICS_HEADER_BYTES):
+    with open(file_path, 'rb') as f:
+        text = f.read(header_bytes).decode('utf-8', errors='replace')
+    data_start = re.search(r'<Data[\s>]', text)
+    if data_start:
+        text = text[:data_start.start()]
+
+    header = {}
+    for key, value in XML_FIELD.findall(text) + LINE_FIELD.findall(text):
+        field = KEY_TO_FIELD.get(_normalise_key(key))
+        value = value.strip()
+        if field and value and field not in header:
+            header[field] = value
+    return header
+
+# Typical spacing of gridded coordinates: the median gap between neighbouring distinct values
+def _sample_interval(values, decimals=3):
+    distinct = np.unique(np.round(values, decimals))
+    if len(distinct) < 2:
+        return None
+    return float(np.median(np.diff(distinct)))
+
+# Yield the rows of a whitespace- or comma-separated numeric file as (n, columns) arrays,
+# reading chunk_size bytes at a time. Leading header lines that are not numbers are skipped.
+def iter_xyz_chunks(file_path, chunk_size=GEOPHYSICS_CHUNK_SIZE):
+    columns = None
+    remainder = b''
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block and not remainder:
+                break
+            data = remainder + block
+            if block:
+                cut = data.rfind(b'\n') + 1
+                if cut == 0:
+                    remainder = data  # No complete line yet
+                    continue
+                data, remainder = data[:cut], data[cut:]
+            else:
+                remainder = b''
+            data = data.replace(b',', b' ').replace(b';', b' ')
+
+            if columns is None:
+                lines = data.split(b'\n')
+                while lines and _parse_line(lines[0]) is None:
+                    lines.pop(0)  # Header, blank line or comment
+                if not lines:
+                    continue
+                columns = len(_parse_line(lines[0]))
+                data = b'\n'.join(lines)
+
+            rows = _parse_block(data, columns)
+            if len(rows):
+                yield rows
+
+def _parse_line(line):
+    parts = line.split()
+    if not parts:
+        return None
+    try:
+        return [float(part) for part in parts]
+    except ValueError:
+        return None
+
+def _parse_block(data, columns):
+    try:
+        # Older NumPy warns instead of raising when it meets something that is not a number
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(data, dtype=np.float64, sep=' ')
+        if len(values) % columns == 0:
+            return values.reshape(-1, columns)
+    except (ValueError, DeprecationWarning):
+        pass
+    # Ragged or partly non-numeric block: parse it line by line, keeping rows of the expected width
+    rows = [row for row in (_parse_line(line) for line in data.split(b'\n')) if row and len(row) >= columns]
+    return np.array([row[:columns] for row in rows], dtype=np.float64).reshape(-1, columns)
+
+# Extent, sample intervals, dummy count and value range of an x y value[...] survey file,
+# computed chunk by chunk so large magnetometry/GPR exports are never held in memory whole.
+def read_xyz_stats(file_path, dummy_value=GEOPHYSICS_DUMMY_VALUE, chunk_size=GEOPHYSICS_CHUNK_SIZE):
+    count = dummy_count = valid_count = 0
+    value_sum = 0.0
+    x_range = y_range = value_range = None
+    x_intervals, y_intervals = [], []
+
+    for rows in iter_xyz_chunks(file_path, chunk_size):
+        if rows.shape[1] < 3:
+            continue
+        x, y, values = rows[:, 0], rows[:, 1], rows[:, 2]
+        count += len(rows)
+        is_dummy = np.isclose(values, dummy_value)
+        dummy_count += int(np.count_nonzero(is_dummy))
+        valid = values[~is_dummy]
+        if len(valid):
+            valid_count += len(valid)
+            value_sum += float(valid.sum())
+            value_range = _merge_range(value_range, float(valid.min()), float(valid.max()))
+        x_range = _merge_range(x_range, float(x.min()), float(x.max()))
+        y_range = _merge_range(y_range, float(y.min()), float(y.max()))
+        for interval, intervals in ((_sample_interval(x), x_intervals), (_sample_interval(y), y_intervals)):
+            if interval is not None:
+                intervals.append(interval)
+
+    if not count:
+        return None
+    return {
+        'count': count,
+        'columns': rows.shape[1],
+        'x_range': x_range,
+        'y_range': y_range,
+        'x_interval': round(float(np.median(x_intervals)), 4) if x_intervals else None,
+        'y_interval': round(float(np.median(y_intervals)), 4) if y_intervals else None,
+        'dummy_value': dummy_value,
+        'dummy_count': dummy_count,
+        'value_range': value_range,
+        'value_mean': value_sum / valid_count if valid_count else None,
+    }
+
+def _merge_range(current, low, high):
+    if current is None:
+        return low, high
+    return min(current[0], low), max(current[1], high)
+
+# Metadata fields for a geophysics file, ready to merge into the extractor's record
+def geophysics_fields(file_path):
+    lower_path = file_path.lower()
+    fields = {}
+    if lower_path.endswith(('.xgd', '.xcp')):
+        header = read_terrasurveyor_header(file_path)
+        fields = {
+            'FILE_INSTRUMENT': header.get('instrument', ''),
+            'FILE_UNITS': header.get('units', ''),
+            'FILE_CENTRAL_COORDINATE': header.get('central_coordinate', ''),
+            'FILE_NW_COORDINATE': header.get('nw_coordinate', ''),
+            'FILE_SE_COORDINATE': header.get('se_coordinate', ''),
+            'FILE_COMMENTS': header.get('comments', ''),
+            'FILE_1ST_TRAVERSE_DIRECTION': header.get('traverse_direction', ''),
+            'FILE_METHOD': header.get('method', ''),
+            'FILE_SENSORS': header.get('sensors', ''),
+            'FILE_DUMMY_VALUE': header.get('dummy_value', ''),
+            'FILE_COMPOSITE_SIZE': header.get('composite_size', ''),
+            'FILE_SURVEY_SIZE': header.get('survey_size', ''),
+            'FILE_GRID_SIZE': header.get('grid_size', ''),
+            'FILE_X_INTERVAL': header.get('x_interval', ''),
+            'FILE_Y_INTERVAL': header.get('y_interval', ''),
+        }
+    elif lower_path.endswith('.xyz'):
+        stats = read_xyz_stats(file_path)
+        if stats is not None:
+            (x_min, x_max), (y_min, y_max) = stats['x_range'], stats['y_range']
+            fields = {
+                'FILE_NW_COORDINATE': f"{x_min:.3f}, {y_max:.3f}",
+                'FILE_SE_COORDINATE': f"{x_max:.3f}, {y_min:.3f}",
+                'FILE_CENTRAL_COORDINATE': f"{(x_min + x_max) / 2:.3f}, {(y_min + y_max) / 2:.3f}",
+                'FILE_DUMMY_VALUE': stats['dummy_value'],
+                'FILE_SURVEY_SIZE': f"{x_max - x_min:.2f} x {y_max - y_min:.2f}",
+                'FILE_X_INTERVAL': stats['x_interval'] if stats['x_interval'] is not None else '',
+                'FILE_Y_INTERVAL': stats['y_interval'] if stats['y_interval'] is not None else '',
+                'FILE_POINT_COUNT': stats['count'],
+                'FILE_DUMMY_COUNT': stats['dummy_count'],
+                'FILE_VALUE_RANGE': f"{stats['value_range'][0]:.3f} to {stats['value_range'][1]:.3f}" if stats['value_range'] else '',
+            }
+    return fields
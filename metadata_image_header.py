@@ -0,0 +1,257 @@
+import io
+import math
+import struct
+
+##################
+##################
+######
+###### Header-only image probing (TIFF, PNG, JPEG)
+######
+##################
+##################
+
+# Only the header segments are read, so the size of the pixel data does not matter
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# PNG colour type -> mode
+PNG_COLOUR_TYPES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+# TIFF field type -> (struct format, size in bytes)
+TIFF_FIELD_TYPES = {
+    1: ('B', 1), 3: ('H', 2), 4: ('I', 4), 5: ('II', 8), 6: ('b', 1), 8: ('h', 2),
+    9: ('i', 4), 10: ('ii', 8), 11: ('f', 4), 12: ('d', 8), 16: ('Q', 8), 17: ('q', 8),
+}
+
+TIFF_TAG_WIDTH = 256
+TIFF_TAG_HEIGHT = 257
+TIFF_TAG_BITS_PER_SAMPLE = 258
+TIFF_TAG_PHOTOMETRIC = 262
+TIFF_TAG_SAMPLES_PER_PIXEL = 277
+TIFF_TAG_X_RESOLUTION = 282
+TIFF_TAG_Y_RESOLUTION = 283
+TIFF_TAG_RESOLUTION_UNIT = 296
+TIFF_TAG_SAMPLE_FORMAT = 339
+
+# Read the header of a TIFF, PNG or JPEG file without decoding it.
+# Returns a dict with format, width, height, mode and dpi, or None if the file is not understood.
+def probe_image_header(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            signature = f.read(8)
+            f.seek(0)
+            if signature.startswith(PNG_SIGNATURE):
+                return _probe_png(f)
+            if signature.startswith(b'\xff\xd8'):
+                return _probe_jpeg(f)
+            if signature[:4] in (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'):
+                return _probe_tiff(f)
+    except (OSError, struct.error, ValueError, KeyError, IndexError) as e:
+        print(f"Error reading image header {file_path}: {e}")
+    return None
+
+def _probe_png(f):
+    f.seek(len(PNG_SIGNATURE))
+    length, chunk_type = struct.unpack('>I4s', f.read(8))
+    if chunk_type != b'IHDR':
+        return None
+    width, height, bits, colour_type = struct.unpack('>IIBB', f.read(10))
+    mode = PNG_COLOUR_TYPES[colour_type]
+    if mode == 'L' and bits == 1:
+        mode = '1'
+    elif mode == 'L' and bits == 16:
+        mode = 'I;16'
+    f.seek(length - 10 + 4, 1)  # Rest of IHDR and its CRC
+
+    # pHYs must come before the image data, so stop at the first IDAT chunk
+    dpi = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        length, chunk_type = struct.unpack('>I4s', chunk_header)
+        if chunk_type in (b'IDAT', b'IEND'):
+            break
+        if chunk_type == b'pHYs':
+            px, py, unit = struct.unpack('>IIB', f.read(9))
+            if unit == 1:  # Pixels per metre
+                dpi = (px * 0.0254, py * 0.0254)
+            f.seek(length - 9 + 4, 1)
+        else:
+            f.seek(length + 4, 1)
+
+    return _header_metadata('PNG', width, height, mode, dpi)
+
+# Markers are read up to the start of the image data, as PIL does, so an EXIF segment after the
+# frame header is still found
+def _probe_jpeg(f):
+    f.seek(2)
+    dpi = None
+    exif = None
+    frame = None
+    while True:
+        byte = f.read(1)
+        if not byte:
+            break
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':  # Fill bytes
+            marker = f.read(1)
+        if not marker:
+            break
+        marker = marker[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue  # Markers without a length
+        if marker in (0xD9, 0xDA):
+            break  # Reached the image data
+        length = struct.unpack('>H', f.read(2))[0]
+        if marker == 0xE0:
+            segment = f.read(length - 2)
+            if segment[:4] == b'JFIF' and len(segment) >= 12:
+                units, x_density, y_density = struct.unpack('>BHH', segment[7:12])
+                if units == 1:  # Dots per inch
+                    dpi = (x_density, y_density)
+                elif units == 2:  # Dots per centimetre
+                    dpi = (x_density * 2.54, y_density * 2.54)
+        elif marker == 0xE1:
+            segment = f.read(length - 2)
+            if segment[:6] == b'Exif\x00\x00' and exif is None:
+                exif = segment[6:]
+        elif marker in JPEG_SOF_MARKERS and frame is None:
+            frame = struct.unpack('>BHHB', f.read(6))
+            f.seek(length - 8, 1)
+        else:
+            f.seek(length - 2, 1)
+
+    if frame is None:
+        return None  # No frame header before the image data
+    _, height, width, components = frame
+    mode = {1: 'L', 3: 'RGB', 4: 'CMYK'}.get(components, f"{components}-band")
+    # Camera and drone JPEGs often have no JFIF density, only the EXIF resolution tags
+    if dpi is None and exif is not None:
+        dpi = _exif_dpi(exif)
+    return _header_metadata('JPEG', width, height, mode, dpi)
+
+# DPI from the IFD0 XResolution and ResolutionUnit tags of a JPEG's EXIF block, which is laid out as a
+# small TIFF file. Like PIL, a block without usable resolution tags counts as 72 dpi.
+def _exif_dpi(exif):
+    try:
+        f = io.BytesIO(exif)
+        byte_order, big_tiff, ifd_offset = _tiff_header(f)
+        tags = _read_ifd(f, byte_order, big_tiff, ifd_offset)
+        unit = tags[TIFF_TAG_RESOLUTION_UNIT][0]
+        resolution = tags[TIFF_TAG_X_RESOLUTION][0]
+        if math.isnan(resolution):
+            raise ValueError("XResolution is not a number")
+        if unit == 3:  # Centimetres
+            resolution *= 2.54
+        return (resolution, resolution)
+    except (struct.error, KeyError, IndexError, ValueError):
+        return (72, 72)
+
+# Byte order, BigTIFF flag and first IFD offset from a TIFF header
+def _tiff_header(f):
+    header = f.read(16)
+    if header[:2] not in (b'II', b'MM'):
+        raise ValueError("not a TIFF header")
+    byte_order = '<' if header[:2] == b'II' else '>'
+    big_tiff = struct.unpack(byte_order + 'H', header[2:4])[0] == 43
+    if big_tiff:
+        return byte_order, big_tiff, struct.unpack(byte_order + 'Q', header[8:16])[0]
+    return byte_order, big_tiff, struct.unpack(byte_order + 'I', header[4:8])[0]
+
+# Tag -> tuple of values for one IFD. Rationals become floats, NaN where the denominator is zero.
+def _read_ifd(f, byte_order, big_tiff, ifd_offset):
+    if big_tiff:
+        count_format, value_count_format, entry_size, value_size = 'Q', 'Q', 20, 8
+    else:
+        count_format, value_count_format, entry_size, value_size = 'H', 'I', 12, 4
+
+    # Read the whole IFD in one go
+    f.seek(ifd_offset)
+    entry_count = struct.unpack(byte_order + count_format, f.read(struct.calcsize(count_format)))[0]
+    ifd = f.read(entry_count * entry_size)
+
+    tags = {}
+    for i in range(entry_count):
+        entry = ifd[i * entry_size:(i + 1) * entry_size]
+        tag, field_type = struct.unpack(byte_order + 'HH', entry[:4])
+        if field_type not in TIFF_FIELD_TYPES:
+            continue
+        value_count = struct.unpack(byte_order + value_count_format, entry[4:4 + value_size])[0]
+        value_field = entry[4 + value_size:]
+        item_format, item_size = TIFF_FIELD_TYPES[field_type]
+        value_count = min(value_count, 16)  # Only the first few values of any tag are needed
+        if item_size * value_count <= value_size:
+            data = value_field[:item_size * value_count]
+        else:
+            offset = struct.unpack(byte_order + ('Q' if big_tiff else 'I'), value_field)[0]
+            position = f.tell()
+            f.seek(offset)
+            data = f.read(item_size * value_count)
+            f.seek(position)
+        values = struct.unpack(byte_order + item_format * value_count, data)
+        if field_type in (5, 10):  # Rationals are stored as numerator/denominator pairs
+            values = tuple(values[j] / values[j + 1] if values[j + 1] else math.nan for j in range(0, len(values), 2))
+        tags[tag] = values
+    return tags
+
+def _probe_tiff(f):
+    byte_order, big_tiff, ifd_offset = _tiff_header(f)
+    tags = _read_ifd(f, byte_order, big_tiff, ifd_offset)
+
+    width = tags[TIFF_TAG_WIDTH][0]
+    height = tags[TIFF_TAG_HEIGHT][0]
+    samples = tags.get(TIFF_TAG_SAMPLES_PER_PIXEL, (1,))[0]
+    bits = tags.get(TIFF_TAG_BITS_PER_SAMPLE, (1,))[0]
+    photometric = tags.get(TIFF_TAG_PHOTOMETRIC, (1,))[0]
+    sample_format = tags.get(TIFF_TAG_SAMPLE_FORMAT, (1,))[0]
+
+    if photometric in (0, 1):
+        if samples == 1:
+            if bits == 1:
+                mode = '1'
+            elif bits == 8:
+                mode = 'L'
+            elif sample_format == 3:
+                mode = 'F'
+            else:
+                mode = f"I;{bits}" if bits == 16 else 'I'
+        elif samples == 2:
+            mode = 'LA'
+        else:
+            mode = f"{samples}-band"
+    elif photometric == 2:
+        mode = 'RGB' if samples == 3 else 'RGBA' if samples == 4 else f"{samples}-band"
+    elif photometric == 3:
+        mode = 'P'
+    elif photometric == 5:
+        mode = 'CMYK'
+    elif photometric == 6:
+        mode = 'YCbCr'
+    else:
+        mode = f"{samples}-band"
+
+    # As PIL reads it: missing resolutions count as 1, and a missing unit as inches. ResolutionUnit 1
+    # (no absolute unit) gives no DPI.
+    dpi = None
+    x_resolution = tags.get(TIFF_TAG_X_RESOLUTION, (1,))[0]
+    y_resolution = tags.get(TIFF_TAG_Y_RESOLUTION, (1,))[0]
+    if x_resolution and y_resolution:
+        unit = tags.get(TIFF_TAG_RESOLUTION_UNIT, (None,))[0]
+        if unit in (2, None):  # Inches
+            dpi = (x_resolution, y_resolution)
+        elif unit == 3:  # Centimetres
+            dpi = (x_resolution * 2.54, y_resolution * 2.54)
+
+    return _header_metadata('BigTIFF' if big_tiff else 'TIFF', width, height, mode, dpi)
+
+def _header_metadata(image_format, width, height, mode, dpi):
+    return {
+        'format': image_format,
+        'width': width,
+        'height': height,
+        'mode': mode,
+        'dpi': dpi,
+    }
@@ -0,0 +1,110 @@
+import os
+import xml.etree.ElementTree as ET
+
+from config_performance import MERGE_MANUAL_FIELDS
+
+##################
+##################
+######
+###### Incremental merge with an existing METADATA.xml
+######
+##################
+##################
+
+# In merge mode each <File> carries the source file and the signature it was extracted from as attributes,
+# e.g. <File path="/data/site/photo.jpg" size="1048576" mtime="1718012345.123" extractor_version="3">.
+# FILE_PATH cannot identify the file: shapefiles and 3D models record their folder there and control points
+# have no FILE_PATH at all. metadata_edit.py only shows and edits child elements, so the attributes survive
+# curation. Fields the extractor creates per run are never carried over from the old file.
+SIGNATURE_ATTRIBUTES = ('path', 'size', 'mtime', 'extractor_version')
+GENERATED_FIELDS = ['FILE_CHECKSUM']
+
+def signature_attributes(file_path, signature, extractor_version):
+    size, mtime = signature
+    return {'path': file_path, 'size': str(size), 'mtime': str(mtime), 'extractor_version': str(extractor_version)}
+
+# The File elements of an existing METADATA.xml, indexed by (section tag, source path), and its Project_Level
+# fields. XML written before the path attribute was added is indexed by FILE_PATH instead. Read with
+# iterparse, clearing each element once indexed, so only the field text is kept in memory.
+class ExistingMetadata:
+    def __init__(self, xml_path):
+        self.xml_path = xml_path
+        self.project_level = None  # {tag: text} or None
+        self.files = {}  # (section, path) -> (attrib, {tag: text})
+        self.used = set()  # Keys written out again by this run
+
+        depth = 0
+        section = None
+        for event, element in ET.iterparse(xml_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 2:
+                    section = element.tag
+                continue
+            depth -= 1
+            if element.tag == 'File' and depth == 2:
+                fields = {child.tag: child.text or '' for child in element}
+                path = element.get('path') or fields.get('FILE_PATH', '')
+                self.files[(section, path)] = (dict(element.attrib), fields)
+                element.clear()
+            elif element.tag == 'Project_Level' and depth == 1:
+                self.project_level = {child.tag: child.text or '' for child in element}
+                element.clear()
+
+    def get(self, section, path):
+        return self.files.get((section, path))
+
+    # Entries whose file was not written again: deleted, renamed or no longer classified into that section
+    def dropped(self):
+        return [key for key in self.files if key not in self.used]
+
+# Read the existing XML; a missing file just means this is the first run. With strict, a file that
+# cannot be read (e.g. one still being saved by the editor) raises rather than being extracted over.
+def load_existing_metadata(xml_path, strict=False):
+    if not os.path.exists(xml_path):
+        return None
+    try:
+        return ExistingMetadata(xml_path)
+    except (ET.ParseError, OSError) as e:
+        if strict:
+            raise
+        print(f"Could not read {xml_path} for merging, extracting everything: {e}")
+        return None
+
+# Combine freshly extracted fields with a curator-edited element. Extracted values win, except for the
+# manual fields (MERGE_MANUAL_FIELDS) and any field the extractor left empty, where a value already
+# filled in is kept. Fields the extractor no longer produces are dropped.
+def merge_fields(extracted, existing, manual_fields=MERGE_MANUAL_FIELDS):
+    merged = dict(extracted)
+    for tag, value in extracted.items():
+        existing_value = existing.get(tag, '')
+        if existing_value and (tag in manual_fields or str(value) == ''):
+            merged[tag] = existing_value
+    return merged
+
+# Stands in for the metadata cache while merging. A file whose size, mtime and extractor version match the
+# signature stored in the existing XML is served from that XML, as edited; everything else falls through
+# to the real cache (which may be None) and is extracted when that misses too.
+# sections maps extractor class names to the section tag their files are written under.
+class MergeCache:
+    def __init__(self, existing, cache, sections):
+        self.existing = existing
+        self.cache = cache
+        self.sections = sections
+        self.kept = 0
+
+    def get(self, extractor, record, signature=None):
+        signature = signature or (record.size, record.mtime)
+        entry = self.existing.get(self.sections.get(type(extractor).__name__), record.path)
+        if entry is not None:
+            attrib, fields = entry
+            if attrib == signature_attributes(record.path, signature, extractor.EXTRACTOR_VERSION):
+                self.kept += 1
+                return True, {tag: value for tag, value in fields.items() if tag not in GENERATED_FIELDS}
+        if self.cache is None:
+            return False, None
+        return self.cache.get(extractor, record, signature)
+
+    def put(self, extractor, record, metadata, signature=None):
+        if self.cache is not None:
+            self.cache.put(extractor, record, metadata, signature)
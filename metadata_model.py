@@ -0,0 +1,229 @@
+import mmap
+import os
+import re
+import struct
+
+import numpy as np
+
+from config_performance import MODEL_CHUNK_SIZE
+
+##################
+##################
+######
+###### Streaming 3D model statistics (OBJ, STL, PTS, MTL)
+######
+##################
+##################
+
+# Files are memory-mapped and read MODEL_CHUNK_SIZE bytes at a time (cut at line ends for text
+# formats), so multi-GB meshes and point clouds are summarised in bounded memory.
+
+OBJ_VERTEX = re.compile(rb'^v[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.M)
+OBJ_MTLLIB = re.compile(rb'^mtllib[ \t]+([^\r\n]+)', re.M)
+STL_VERTEX = re.compile(rb'^[ \t]*vertex[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.M)
+PTS_POINT = re.compile(rb'^[ \t]*(-?[\d.]+(?:[eE][-+]?\d+)?)[ \t,]+(\S+?)[ \t,]+(\S+?)(?:[ \t,]|\r?$)', re.M)
+STL_TRIANGLE = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+# Mapped file contents; empty files cannot be mapped and are returned as b''
+class _MappedFile:
+    def __init__(self, file_path):
+        self.file = open(file_path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def __enter__(self):
+        return self.map
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.size:
+            self.map.close()
+        self.file.close()
+        return False
+
+# Yield the mapped file in chunks of about chunk_size bytes, each ending at a line end
+def iter_line_chunks(mapped, chunk_size=MODEL_CHUNK_SIZE):
+    start, size = 0, len(mapped)
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = mapped.rfind(b'\n', start, end)
+            end = newline + 1 if newline >= start else mapped.find(b'\n', end) + 1 or size
+        yield mapped[start:end]
+        start = end
+
+# Running bounding box over (n, 3) coordinate arrays
+class BoundingBox:
+    def __init__(self):
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, points):
+        if not len(points):
+            return
+        points_min, points_max = points.min(axis=0), points.max(axis=0)
+        if self.minimum is None:
+            self.minimum, self.maximum = points_min, points_max
+        else:
+            self.minimum = np.minimum(self.minimum, points_min)
+            self.maximum = np.maximum(self.maximum, points_max)
+
+    def update_from_matches(self, matches):
+        if matches:
+            try:
+                self.update(np.array(matches, dtype=np.float64))
+            except ValueError:
+                # A malformed number somewhere in the chunk; keep the rows that do parse
+                self.update(np.array([row for row in (_parse_row(match) for match in matches) if row], dtype=np.float64).reshape(-1, 3))
+
+    def as_text(self):
+        if self.minimum is None:
+            return ''
+        low = ', '.join(f"{value:.3f}" for value in self.minimum)
+        high = ', '.join(f"{value:.3f}" for value in self.maximum)
+        return f"BoundingBox(min=({low}), max=({high}))"
+
+def _parse_row(values):
+    try:
+        return [float(value) for value in values]
+    except ValueError:
+        return None
+
+# Count lines by their first two bytes across a chunk, without splitting it into Python strings.
+# prefixes are two-byte strings such as b'v ' or b'vt'; a tab after a one-letter keyword counts as a space.
+def count_line_prefixes(chunk, prefixes):
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    if not len(data):
+        return {prefix: 0 for prefix in prefixes}
+    line_starts = np.concatenate(([0], np.flatnonzero(data[:-1] == 0x0A) + 1))
+    first = data[line_starts]
+    second = np.zeros(len(line_starts), dtype=np.uint8)
+    has_second = line_starts + 1 < len(data)
+    second[has_second] = data[line_starts[has_second] + 1]
+    second[second == 0x09] = 0x20  # Tab -> space
+    return {prefix: int(np.count_nonzero((first == prefix[0]) & (second == prefix[1]))) for prefix in prefixes}
+
+# Materials and texture maps named in a .mtl file
+def read_mtl(mtl_path):
+    materials, textures = [], []
+    with open(mtl_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            parts = line.strip().split(None, 1)
+            if len(parts) < 2:
+                continue
+            keyword, value = parts
+            if keyword == 'newmtl':
+                materials.append(value.strip())
+            elif keyword.startswith('map_') or keyword in ('bump', 'disp', 'decal', 'refl'):
+                texture = value.split()[-1]  # Options such as -s 1 1 1 come before the file name
+                if texture not in textures:
+                    textures.append(texture)
+    return {'materials': materials, 'textures': textures}
+
+def read_obj_stats(obj_path, chunk_size=MODEL_CHUNK_SIZE):
+    counts = {b'v ': 0, b'vt': 0, b'vn': 0, b'f ': 0, b'l ': 0}
+    bbox = BoundingBox()
+    mtllibs = []
+    with _MappedFile(obj_path) as mapped:
+        for chunk in iter_line_chunks(mapped, chunk_size):
+            for prefix, count in count_line_prefixes(chunk, counts).items():
+                counts[prefix] += count
+            bbox.update_from_matches(OBJ_VERTEX.findall(chunk))
+            mtllibs += [name.decode('utf-8', 'replace').strip() for name in OBJ_MTLLIB.findall(chunk)]
+
+    # Material libraries are looked up next to the .obj
+    materials, textures = [], []
+    folder = os.path.dirname(obj_path)
+    for mtllib in mtllibs:
+        mtl_path = os.path.join(folder, mtllib)
+        if os.path.isfile(mtl_path):
+            mtl = read_mtl(mtl_path)
+            materials += [name for name in mtl['materials'] if name not in materials]
+            textures += [name for name in mtl['textures'] if name not in textures]
+
+    if counts[b'f ']:
+        geometry_type = 'Polygon mesh'
+    elif counts[b'l ']:
+        geometry_type = 'Polyline'
+    else:
+        geometry_type = 'Point cloud' if counts[b'v '] else ''
+    return {
+        'vertices': counts[b'v '],
+        'polygons': counts[b'f '],
+        'texture_coordinates': counts[b'vt'],
+        'normals': counts[b'vn'],
+        'geometry_type': geometry_type,
+        'bbox': bbox.as_text(),
+        'materials': materials,
+        'textures': textures,
+        'material_libraries': mtllibs,
+    }
+
+# Binary STL: 80-byte header, triangle count, then 50 bytes per triangle
+def _is_binary_stl(mapped, size):
+    if size < 84:
+        return False
+    triangle_count = struct.unpack('<I', mapped[80:84])[0]
+    return size == 84 + 50 * triangle_count
+
+def read_stl_stats(stl_path, chunk_size=MODEL_CHUNK_SIZE):
+    bbox = BoundingBox()
+    with _MappedFile(stl_path) as mapped:
+        size = len(mapped)
+        if _is_binary_stl(mapped, size):
+            triangle_count = struct.unpack('<I', mapped[80:84])[0]
+            triangles_per_chunk = max(1, chunk_size // STL_TRIANGLE.itemsize)
+            for first in range(0, triangle_count, triangles_per_chunk):
+                count = min(triangles_per_chunk, triangle_count - first)
+                chunk = mapped[84 + first * 50:84 + (first + count) * 50]
+                triangles = np.frombuffer(chunk, dtype=STL_TRIANGLE, count=count)
+                bbox.update(triangles['vertices'].reshape(-1, 3))
+            stl_format = 'binary'
+        else:
+            triangle_count = 0
+            for chunk in iter_line_chunks(mapped, chunk_size):
+                triangle_count += chunk.count(b'facet normal')
+                bbox.update_from_matches(STL_VERTEX.findall(chunk))
+            stl_format = 'ASCII'
+    return {
+        'vertices': triangle_count * 3,  # STL stores every triangle's corners separately
+        'polygons': triangle_count,
+        'geometry_type': 'Triangle mesh' if triangle_count else '',
+        'bbox': bbox.as_text(),
+        'format': stl_format,
+    }
+
+# Leica-style .pts: an optional point count line, then x y z [intensity [r g b]] per line
+def read_pts_stats(pts_path, chunk_size=MODEL_CHUNK_SIZE):
+    bbox = BoundingBox()
+    points = 0
+    header_count = None
+    with _MappedFile(pts_path) as mapped:
+        for chunk_number, chunk in enumerate(iter_line_chunks(mapped, chunk_size)):
+            if chunk_number == 0:
+                first_line = chunk.split(b'\n', 1)[0].strip()
+                if first_line.isdigit():
+                    header_count = int(first_line)
+            matches = PTS_POINT.findall(chunk)
+            points += len(matches)
+            bbox.update_from_matches(matches)
+    return {
+        'vertices': points,
+        'declared_points': header_count,
+        'polygons': 0,
+        'geometry_type': 'Point cloud' if points else '',
+        'bbox': bbox.as_text(),
+    }
+
+# Summarise any supported model file; returns None for formats without a parser (e.g. .x3d)
+def read_model_stats(file_path, chunk_size=MODEL_CHUNK_SIZE):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.obj':
+        return read_obj_stats(file_path, chunk_size)
+    if extension == '.stl':
+        return read_stl_stats(file_path, chunk_size)
+    if extension == '.pts':
+        return read_pts_stats(file_path, chunk_size)
+    if extension == '.mtl':
+        mtl = read_mtl(file_path)
+        return {'materials': mtl['materials'], 'textures': mtl['textures']}
+    return None
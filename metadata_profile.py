@@ -0,0 +1,138 @@
+import cProfile
+import json
+import time
+from contextlib import contextmanager
+
+##################
+##################
+######
+###### Profiling: per-extractor latency and phase timers
+######
+##################
+##################
+
+# Time one extraction; module-level so it can run inside the image pool's worker processes
+def timed_call(function, file_path):
+    start = time.perf_counter()
+    result = function(file_path)
+    return result, time.perf_counter() - start
+
+# Nearest-rank percentile of an already sorted list
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+# Latencies of every extract_metadata call (grouped by extractor and file extension),
+# cache hits, and the total time of each phase of the run (scan, serialize, folder tree, ...).
+class Profiler:
+    def __init__(self):
+        self.latencies = {}  # (extractor, extension) -> [seconds]
+        self.bytes = {}  # (extractor, extension) -> bytes of the files extracted
+        self.cache_hits = {}  # extractor -> count
+        self.phases = {}  # phase -> [count, seconds]
+        self.start_time = time.perf_counter()
+
+    def record(self, extractor_name, record, seconds):
+        key = (extractor_name, record.extension.lower())
+        self.latencies.setdefault(key, []).append(seconds)
+        self.bytes[key] = self.bytes.get(key, 0) + record.size
+
+    def record_cache_hit(self, extractor_name):
+        self.cache_hits[extractor_name] = self.cache_hits.get(extractor_name, 0) + 1
+
+    def add_phase_time(self, phase, seconds):
+        totals = self.phases.setdefault(phase, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+    @contextmanager
+    def phase(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(phase, time.perf_counter() - start)
+
+    @staticmethod
+    def _summary(latencies, total_bytes):
+        ordered = sorted(latencies)
+        total = sum(ordered)
+        return {
+            'count': len(ordered),
+            'total_seconds': round(total, 6),
+            'mean_ms': round(total / len(ordered) * 1000, 3),
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+            'p90_ms': round(percentile(ordered, 0.90) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+            'max_ms': round(ordered[-1] * 1000, 3),
+            'bytes': total_bytes,
+        }
+
+    def report(self):
+        extractors = {}
+        for (extractor_name, extension), latencies in sorted(self.latencies.items()):
+            entry = extractors.setdefault(extractor_name, {'latencies': [], 'bytes': 0, 'by_extension': {}})
+            entry['latencies'].extend(latencies)
+            entry['bytes'] += self.bytes[(extractor_name, extension)]
+            entry['by_extension'][extension or '(none)'] = self._summary(latencies, self.bytes[(extractor_name, extension)])
+
+        report = {
+            'wall_seconds': round(time.perf_counter() - self.start_time, 3),
+            'phases': {phase: {'count': count, 'total_seconds': round(seconds, 6)} for phase, (count, seconds) in self.phases.items()},
+            'extractors': {},
+        }
+        for extractor_name, entry in extractors.items():
+            summary = self._summary(entry['latencies'], entry['bytes'])
+            summary['cache_hits'] = self.cache_hits.get(extractor_name, 0)
+            summary['by_extension'] = entry['by_extension']
+            report['extractors'][extractor_name] = summary
+        # Extractors whose files all came from the cache still show up
+        for extractor_name, hits in self.cache_hits.items():
+            report['extractors'].setdefault(extractor_name, {'count': 0, 'cache_hits': hits})
+        return report
+
+    def report_text(self, report=None):
+        report = report or self.report()
+        lines = [f"Run time: {report['wall_seconds']:.2f}s", "", "Phases:"]
+        for phase, totals in sorted(report['phases'].items(), key=lambda item: -item[1]['total_seconds']):
+            lines.append(f"  {phase:<24} {totals['total_seconds']:>10.3f}s  ({totals['count']} calls)")
+
+        lines += ["", "Extractors (latency per extract_metadata call):",
+                  f"  {'':<40} {'count':>8} {'total s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'MB':>10} {'cached':>8}"]
+        extractors = sorted(report['extractors'].items(), key=lambda item: -item[1].get('total_seconds', 0))
+        for extractor_name, summary in extractors:
+            lines.append(self._text_row(extractor_name, summary, summary.get('cache_hits', 0)))
+            for extension, extension_summary in sorted(summary.get('by_extension', {}).items(), key=lambda item: -item[1]['total_seconds']):
+                lines.append(self._text_row(f"  {extension}", extension_summary, ''))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _text_row(label, summary, cache_hits):
+        if not summary.get('count'):
+            return f"  {label:<40} {0:>8} {'':>10} {'':>9} {'':>9} {'':>9} {'':>9} {'':>10} {cache_hits:>8}"
+        return (f"  {label:<40} {summary['count']:>8} {summary['total_seconds']:>10.3f} {summary['p50_ms']:>9.2f} "
+                f"{summary['p90_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f} "
+                f"{summary['bytes'] / 1e6:>10.1f} {cache_hits:>8}")
+
+    # Write <prefix>.txt and <prefix>.json and return their paths
+    def write_report(self, prefix):
+        report = self.report()
+        text_path, json_path = prefix + '.txt', prefix + '.json'
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(self.report_text(report))
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return text_path, json_path
+
+# Run function under cProfile and dump the stats to dump_path (view with python -m pstats or snakeviz).
+# Only the calling process is profiled; work done in the image pool's worker processes is not included.
+def run_with_cprofile(dump_path, function, *args, **kwargs):
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profile.disable()
+        profile.dump_stats(dump_path)
@@ -0,0 +1,230 @@
+import json
+import sys
+import time
+
+from config_performance import PROGRESS_INTERVAL
+
+##################
+##################
+######
+###### Progress and throughput events
+######
+##################
+##################
+
+# Events are plain dictionaries with an 'event' name and a 'time' stamp:
+#   discovered     files/folders/bytes found so far while scanning
+#   scan_complete  totals and per-category counts once the scan has finished
+#   stage_start    an extractor (or the folder tree) starts, with its totals and unit (files or folders)
+#   progress       processed/total files and bytes, files/s, MB/s and ETA for the running stage
+#   stage_end      final counts for a stage with its per-file latency (mean and max)
+#   cache          metadata cache hits and misses for the run
+#   duplicates     groups of identical files found by fingerprinting, with the bytes the extra copies take up
+#   merge          files kept from, updated in, added to and dropped from an existing METADATA.xml
+#   done           the whole run has finished
+# A sink is any object with handle(event) and close() methods.
+
+# Feeds events from the running pipeline to the sinks. With no sinks it does nothing.
+# progress and discovered events are throttled to one per interval seconds (0 = every file).
+class ProgressReporter:
+    def __init__(self, sinks=(), interval=PROGRESS_INTERVAL):
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.start_time = time.perf_counter()
+        self._last_emit = 0.0
+        self.stage = None
+
+    def emit(self, event, **fields):
+        if not self.sinks:
+            return
+        fields = dict(event=event, time=round(time.time(), 3), **fields)
+        for sink in self.sinks:
+            sink.handle(fields)
+
+    def _due(self):
+        now = time.perf_counter()
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            return True
+        return False
+
+    # Called by the scanner after each folder
+    def discovered(self, files, folders, total_bytes):
+        if self.sinks and self._due():
+            self.emit('discovered', files=files, folders=folders, bytes=total_bytes)
+
+    def scan_complete(self, inventory, categories):
+        self.emit('scan_complete',
+                  files=len(inventory.files),
+                  folders=len(inventory.folders),
+                  bytes=sum(record.size for record in inventory.files),
+                  seconds=round(time.perf_counter() - self.start_time, 3),
+                  categories={category: inventory.count(category) for category in categories})
+
+    def stage_start(self, stage, total, total_bytes=0, unit='files'):
+        self.stage = {
+            'name': stage, 'unit': unit, 'total': total, 'total_bytes': total_bytes,
+            'processed': 0, 'bytes': 0, 'start': time.perf_counter(),
+            'latency_total': 0.0, 'latency_max': 0.0, 'last': time.perf_counter(),
+        }
+        self.emit('stage_start', stage=stage, unit=unit, total=total, total_bytes=total_bytes)
+
+    # One file has been handled by the running stage, taking latency seconds of wall time
+    def file_processed(self, record, latency):
+        self.item_processed(record.size, latency)
+
+    # One item of the running stage's unit (a file, or a folder of the folder tree) has been handled.
+    # Without a latency, the time since the previous item (or the stage start) is used.
+    def item_processed(self, size=0, latency=None):
+        stage = self.stage
+        now = time.perf_counter()
+        if latency is None:
+            latency = now - stage['last']
+        stage['last'] = now
+        stage['processed'] += 1
+        stage['bytes'] += size
+        stage['latency_total'] += latency
+        stage['latency_max'] = max(stage['latency_max'], latency)
+        if self.sinks and self._due():
+            self.emit('progress', **self._rates(stage))
+
+    def _rates(self, stage):
+        elapsed = time.perf_counter() - stage['start']
+        files_per_second = stage['processed'] / elapsed if elapsed > 0 else 0.0
+        remaining = max(stage['total'] - stage['processed'], 0)
+        return {
+            'stage': stage['name'],
+            'unit': stage['unit'],
+            'processed': stage['processed'],
+            'total': stage['total'],
+            'bytes': stage['bytes'],
+            'total_bytes': stage['total_bytes'],
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(files_per_second, 1),
+            'mb_per_second': round(stage['bytes'] / 1e6 / elapsed, 2) if elapsed > 0 else 0.0,
+            'eta_seconds': round(remaining / files_per_second, 1) if files_per_second > 0 else None,
+        }
+
+    def stage_end(self):
+        stage = self.stage
+        fields = self._rates(stage)
+        fields.pop('eta_seconds')
+        processed = stage['processed']
+        fields['mean_latency_ms'] = round(stage['latency_total'] / processed * 1000, 3) if processed else None
+        fields['max_latency_ms'] = round(stage['latency_max'] * 1000, 3)
+        self.emit('stage_end', **fields)
+        self.stage = None
+
+    # Pass an extractor's (record, metadata) iterator through, timing each file as it comes out
+    def track(self, stage, records, iterator):
+        self.stage_start(stage, len(records), sum(record.size for record in records))
+        last_time = time.perf_counter()
+        try:
+            for record, metadata in iterator:
+                now = time.perf_counter()
+                self.file_processed(record, now - last_time)
+                last_time = now
+                yield record, metadata
+        finally:
+            self.stage_end()
+
+    def finished(self, **fields):
+        self.emit('done', seconds=round(time.perf_counter() - self.start_time, 3), **fields)
+        self.close()
+
+    # Close the sinks (progress window, --progress-file) once; later events are dropped
+    def close(self):
+        sinks, self.sinks = self.sinks, []
+        for sink in sinks:
+            sink.close()
+
+# Human-readable lines on stderr
+class ConsoleProgressSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def handle(self, event):
+        name = event['event']
+        if name == 'discovered':
+            line = f"Scanning: {event['files']} files in {event['folders']} folders"
+        elif name == 'scan_complete':
+            line = f"Scan complete: {event['files']} files, {event['bytes'] / 1e6:.1f} MB in {event['seconds']:.1f}s"
+        elif name == 'stage_start':
+            line = f"{event['stage']}: {event['total']} {event['unit']}"
+        elif name == 'progress':
+            eta = f", ETA {event['eta_seconds']:.0f}s" if event['eta_seconds'] is not None else ""
+            line = (f"{event['stage']}: {event['processed']}/{event['total']} "
+                    f"({event['files_per_second']} files/s, {event['mb_per_second']} MB/s{eta})")
+        elif name == 'stage_end':
+            latency = f", {event['mean_latency_ms']} ms each" if event['mean_latency_ms'] is not None else ""
+            line = f"{event['stage']}: done, {event['processed']} {event['unit']} in {event['seconds']:.1f}s{latency}"
+        elif name == 'duplicates':
+            line = f"Duplicates: {event['groups']} groups, {event['files']} files, {event['redundant_bytes'] / 1e6:.1f} MB in extra copies"
+        elif name == 'merge':
+            line = f"Merge: {event['kept']} kept, {event['updated']} updated, {event['new']} new, {event['dropped']} dropped"
+        elif name == 'done':
+            line = f"Finished in {event['seconds']:.1f}s"
+        else:
+            return
+        print(line, file=self.stream, flush=True)
+
+    def close(self):
+        pass
+
+# One JSON object per line, for log collectors and dashboards
+class JSONLinesProgressSink:
+    def __init__(self, file_path=None):
+        self.file = open(file_path, 'a', encoding='utf-8') if file_path else sys.stdout
+        self.owns_file = file_path is not None
+
+    def handle(self, event):
+        self.file.write(json.dumps(event) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+# A small window with a progress bar, refreshed whenever an event arrives. Given a parent (MainMenu's
+# window) it is a Toplevel of that window rather than a second Tk root.
+class TkProgressSink:
+    def __init__(self, title="Processing", parent=None):
+        import tkinter as tk
+        from tkinter import ttk
+        self.root = tk.Toplevel(parent) if parent is not None else tk.Tk()
+        self.root.title(title)
+        self.label = tk.Label(self.root, text="Scanning project folder... please wait", width=60)
+        self.label.pack(padx=20, pady=(20, 10))
+        self.bar = ttk.Progressbar(self.root, length=400, mode='determinate')
+        self.bar.pack(padx=20, pady=(0, 20))
+        self.root.update()
+
+    def handle(self, event):
+        name = event['event']
+        if name == 'discovered':
+            self.label.config(text=f"Scanning: {event['files']} files in {event['folders']} folders")
+        elif name in ('stage_start', 'progress'):
+            processed = event.get('processed', 0)
+            self.bar.config(maximum=max(event['total'], 1), value=processed)
+            eta = f" (about {event['eta_seconds']:.0f}s left)" if event.get('eta_seconds') is not None else ""
+            self.label.config(text=f"{event['stage']}: {processed} of {event['total']} {event['unit']}{eta}")
+        elif name == 'stage_end':
+            self.bar.config(value=self.bar['maximum'])
+        self.root.update()
+
+    def close(self):
+        self.root.destroy()
+
+PROGRESS_SINKS = {
+    'console': ConsoleProgressSink,
+    'jsonl': JSONLinesProgressSink,
+    'tk': TkProgressSink,
+}
+
+# Build a reporter from a sink name ('none', 'console', 'jsonl' or 'tk'); file_path is used by 'jsonl'
+def build_progress_reporter(kind, file_path=None):
+    if kind in (None, 'none'):
+        return ProgressReporter()
+    if kind == 'jsonl':
+        return ProgressReporter([JSONLinesProgressSink(file_path)])
+    return ProgressReporter([PROGRESS_SINKS[kind]()])
@@ -0,0 +1,209 @@
+import bisect
+import os
+
+# Import the configuration file
+from config_file_types import EXCLUDED_DIRECTORY_SUFFIXES
+from metadata_classifier import FILE_CLASSIFIER
+from config_performance import CACHE_FILE_NAME
+
+##################
+##################
+######
+###### Single-pass directory scan
+######
+##################
+##################
+
+# Excludes Agisoft and ArcGIS files
+def is_excluded_dir(dir_name):
+    return any(dir_name.endswith(suffix) for suffix in EXCLUDED_DIRECTORY_SUFFIXES)
+
+# Work out which extractors a file belongs to (a file can belong to several, e.g. .tif)
+classify_file = FILE_CLASSIFIER.classify
+
+def is_geophysics_file(file_name):
+    return FILE_CLASSIFIER.is_category(file_name, 'geophysics')
+
+# One file found by the scan, with the stat result taken during the scan
+class FileRecord:
+    __slots__ = ('path', 'name', 'dirpath', 'extension', 'size', 'mtime', 'ctime', 'is_link', 'categories')
+
+    def __init__(self, path, name, dirpath, stat_result, is_link, categories):
+        self.path = path
+        self.name = name
+        self.dirpath = dirpath
+        self.extension = os.path.splitext(name)[1]
+        self.size = stat_result.st_size if stat_result else 0
+        self.mtime = stat_result.st_mtime if stat_result else 0
+        self.ctime = stat_result.st_ctime if stat_result else 0
+        self.is_link = is_link
+        self.categories = categories
+
+# In-memory inventory of a project directory, built once and shared by all extractors
+class FileInventory:
+    def __init__(self, start_dir):
+        self.start_dir = start_dir
+        self.files = []  # FileRecords in os.walk order
+        self.folders = []  # Non-excluded folders in os.walk order, starting with start_dir
+        self.entries = {}  # Folder path -> [(name, is_dir)] in os.listdir order
+        self.parents = {}  # Folder path -> parent folder path
+        self._by_category = {}
+        self._by_path = {}
+        self._folder_totals = None
+        self._directory_index = None
+
+    def add_file(self, record):
+        self.files.append(record)
+        self._by_path[record.path] = record
+        for category in record.categories:
+            self._by_category.setdefault(category, []).append(record)
+
+    def files_in_category(self, category):
+        return self._by_category.get(category, [])
+
+    def count(self, category):
+        return len(self.files_in_category(category))
+
+    def get(self, file_path):
+        return self._by_path.get(file_path)
+
+    def list_dir(self, folder_path):
+        return [name for name, _ in self.entries.get(folder_path, [])]
+
+    def subfolders(self, folder_path):
+        return [name for name, is_dir in self.entries.get(folder_path, []) if is_dir]
+
+    # Sorted folder listings shared by every extractor that looks for sidecar files
+    @property
+    def directory_index(self):
+        if self._directory_index is None:
+            self._directory_index = DirectoryIndex(self)
+        return self._directory_index
+
+    # Total size in bytes and file count for a folder and everything below it
+    def folder_totals(self, folder_path):
+        if self._folder_totals is None:
+            self._folder_totals = aggregate_folder_sizes(self)
+        return self._folder_totals.get(folder_path, (0, 0))
+
+# Per-run index of folder listings, sorted once per folder so sidecar files (same stem,
+# different extension) are found with a binary search instead of a scan of the whole folder
+class DirectoryIndex:
+    def __init__(self, inventory):
+        self.inventory = inventory
+        self._sorted_names = {}
+
+    def names(self, folder_path):
+        names = self._sorted_names.get(folder_path)
+        if names is None:
+            names = sorted(self.inventory.list_dir(folder_path))
+            self._sorted_names[folder_path] = names
+        return names
+
+    # Names in the folder starting with prefix, in sorted order
+    def with_prefix(self, folder_path, prefix):
+        names = self.names(folder_path)
+        matches = []
+        for index in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[index].startswith(prefix):
+                break
+            matches.append(names[index])
+        return matches
+
+    # Files sharing a file's stem (the file itself included), e.g. x.shp, x.shx, x.dbf, x.prj
+    def siblings(self, file_path):
+        folder_path, file_name = os.path.split(file_path)
+        return self.with_prefix(folder_path, os.path.splitext(file_name)[0])
+
+    # Combined size and latest modification time of a file and its sidecars
+    def sidecar_signature(self, record):
+        total_size = 0
+        latest_mtime = 0
+        for name in self.siblings(record.path):
+            sibling = self.inventory.get(os.path.join(record.dirpath, name))
+            if sibling is not None:
+                total_size += sibling.size
+                latest_mtime = max(latest_mtime, sibling.mtime)
+        return total_size, latest_mtime
+
+# Roll file sizes and counts up to every parent folder in a single post-order pass
+def aggregate_folder_sizes(inventory):
+    totals = {folder_path: [0, 0] for folder_path in inventory.folders}
+
+    # Each file is counted once, in the folder that directly contains it
+    for record in inventory.files:
+        if not record.is_link:  # Skip symbolic links
+            folder_totals = totals[record.dirpath]
+            folder_totals[0] += record.size
+            folder_totals[1] += 1
+
+    # Folders are stored parents-first, so walking them backwards visits children before parents
+    for folder_path in reversed(inventory.folders[1:]):
+        parent_totals = totals[inventory.parents[folder_path]]
+        parent_totals[0] += totals[folder_path][0]
+        parent_totals[1] += totals[folder_path][1]
+
+    return {folder_path: (size, count) for folder_path, (size, count) in totals.items()}
+
+# List one folder: returns its (name, is_dir) entries, the subfolders to visit and a FileRecord per file.
+# Only reads the file system, so several folders can be listed at once (see metadata_async.py).
+def list_folder(folder_path, apply_exclusions=True):
+    entries = []
+    subdirs = []
+    records = []
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.name.startswith(CACHE_FILE_NAME):
+                    continue  # The metadata cache is not part of the project
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+
+                if is_dir:
+                    if not (apply_exclusions and is_excluded_dir(entry.name)):  # Apply exclusion
+                        subdirs.append(entry.path)
+                    continue
+
+                is_link = entry.is_symlink()
+                if is_link and os.path.isdir(entry.path):
+                    continue  # Symbolic links to folders are listed but not followed
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    stat_result = None  # Broken link or file removed during the scan
+                records.append(FileRecord(entry.path, entry.name, folder_path, stat_result, is_link, classify_file(entry.name)))
+    except OSError as e:
+        print(f"Error scanning folder {folder_path}: {e}")
+    return entries, subdirs, records
+
+# Walk the project once with os.scandir, recording every file and folder
+def scan_directory(start_dir, apply_exclusions=True, progress=None):
+    inventory = FileInventory(start_dir)
+    stack = [start_dir]
+    discovered_bytes = 0
+
+    while stack:
+        folder_path = stack.pop()
+        entries, subdirs, records = list_folder(folder_path, apply_exclusions)
+        discovered_bytes += add_folder_listing(inventory, folder_path, entries, subdirs, records)
+        # Reverse so subfolders are visited in listing order, matching os.walk
+        stack.extend(reversed(subdirs))
+
+        # Report what has been found so far (the reporter decides how often to pass it on)
+        if progress is not None:
+            progress.discovered(len(inventory.files), len(inventory.folders), discovered_bytes)
+
+    return inventory
+
+# Add a listed folder to the inventory; returns the bytes of the files it holds
+def add_folder_listing(inventory, folder_path, entries, subdirs, records):
+    inventory.folders.append(folder_path)
+    inventory.entries[folder_path] = entries
+    for subdir in subdirs:
+        inventory.parents[subdir] = folder_path
+    for record in records:
+        inventory.add_file(record)
+    return sum(record.size for record in records)
@@ -0,0 +1,143 @@
+import os
+import re
+import struct
+
+##################
+##################
+######
+###### Header-only shapefile reading (.shp, .shx, .dbf, .prj)
+######
+##################
+##################
+
+SHP_FILE_CODE = 9994
+SHP_HEADER_SIZE = 100
+
+# Shape type -> geometry type as reported by geopandas (Z and M variants report the base type)
+SHAPE_TYPES = {
+    0: 'Unknown',
+    1: 'Point', 11: 'Point', 21: 'Point',
+    3: 'LineString', 13: 'LineString', 23: 'LineString',
+    5: 'Polygon', 15: 'Polygon', 25: 'Polygon',
+    8: 'MultiPoint', 18: 'MultiPoint', 28: 'MultiPoint',
+}
+POINT_SHAPE_TYPES = (1, 11, 21)
+MULTIPOINT_SHAPE_TYPES = (8, 18, 28)
+Z_SHAPE_TYPES = (11, 13, 15, 18)
+
+# Find a sidecar file next to the .shp, allowing for upper or lower case extensions.
+# With the scan's DirectoryIndex the folder listing is searched instead of stat-ing each candidate.
+def find_sidecar(shp_path, extension, directory_index=None):
+    base_path = os.path.splitext(shp_path)[0]
+    candidates = (base_path + extension, base_path + extension.upper())
+    if directory_index is not None:
+        siblings = directory_index.siblings(shp_path)
+        for candidate in candidates:
+            if os.path.basename(candidate) in siblings:
+                return candidate
+        return None
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+# Read the shape type and bounding box from the 100-byte .shp header
+def read_shp_header(shp_path):
+    with open(shp_path, 'rb') as f:
+        header = f.read(SHP_HEADER_SIZE)
+    if len(header) < SHP_HEADER_SIZE or struct.unpack('>i', header[:4])[0] != SHP_FILE_CODE:
+        return None
+    shape_type = struct.unpack('<i', header[32:36])[0]
+    xmin, ymin, xmax, ymax, zmin, zmax = struct.unpack('<6d', header[36:84])
+    return {
+        'shape_type': shape_type,
+        'bbox': (xmin, ymin, xmax, ymax),
+        'z_range': (zmin, zmax) if shape_type in Z_SHAPE_TYPES else None,
+    }
+
+# Every .shx record is 8 bytes after the 100-byte header, so the file size gives the feature count
+def read_shx_feature_count(shx_path):
+    return max(0, (os.path.getsize(shx_path) - SHP_HEADER_SIZE) // 8)
+
+# Read the record count and field definitions from the .dbf header
+def read_dbf_header(dbf_path):
+    with open(dbf_path, 'rb') as f:
+        header = f.read(32)
+        record_count, header_length, record_length = struct.unpack('<IHH', header[4:12])
+        descriptors = f.read(header_length - 32)
+
+    fields = []
+    for offset in range(0, len(descriptors) - 31, 32):
+        descriptor = descriptors[offset:offset + 32]
+        if descriptor[0] == 0x0D:  # Field descriptor terminator
+            break
+        name = descriptor[:11].split(b'\x00')[0].decode('latin-1').strip()
+        fields.append({
+            'name': name,
+            'type': chr(descriptor[11]),
+            'length': descriptor[16],
+            'decimals': descriptor[17],
+        })
+    return {'record_count': record_count, 'header_length': header_length, 'record_length': record_length, 'fields': fields}
+
+def read_prj(prj_path):
+    with open(prj_path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read().strip()
+
+# 'AUTH:CODE' for a pyproj CRS, e.g. 'EPSG:27700'. A .prj holds ESRI WKT, which rarely matches an
+# authority definition exactly, so a close match is accepted; to_string() alone would give the whole WKT.
+def crs_authority_string(crs):
+    authority = crs.to_authority(min_confidence=70)
+    return ':'.join(authority) if authority else crs.to_string()
+
+# PCS and GCS strings for the CRS in a .prj, e.g. 'EPSG:27700' and 'EPSG:4277'
+def crs_from_wkt(wkt):
+    try:
+        from pyproj import CRS  # Installed alongside geopandas
+        crs = CRS.from_wkt(wkt)
+        pcs = crs_authority_string(crs)
+        gcs = crs_authority_string(crs.geodetic_crs) if crs.geodetic_crs else 'Unknown'
+        return pcs, gcs
+    except ImportError:
+        # Without pyproj, report the names given in the WKT itself
+        projcs = re.search(r'PROJCS\["([^"]+)"', wkt)
+        geogcs = re.search(r'GEOGCS\["([^"]+)"', wkt)
+        pcs = projcs.group(1) if projcs else geogcs.group(1) if geogcs else 'Unknown'
+        return pcs, geogcs.group(1) if geogcs else 'Unknown'
+    except Exception as e:
+        print(f"Could not interpret projection {wkt[:60]}...: {e}")
+        return 'Unknown', 'Unknown'
+
+# Summarise a shapefile from its headers alone, without reading any geometries.
+# Returns None if the headers cannot be read, so the caller can fall back to geopandas.
+def read_shapefile_header(shp_path, directory_index=None):
+    try:
+        shp_header = read_shp_header(shp_path)
+        if shp_header is None or shp_header['shape_type'] not in SHAPE_TYPES:
+            return None
+
+        shx_path = find_sidecar(shp_path, '.shx', directory_index)
+        dbf_path = find_sidecar(shp_path, '.dbf', directory_index)
+        prj_path = find_sidecar(shp_path, '.prj', directory_index)
+
+        dbf_header = read_dbf_header(dbf_path) if dbf_path else None
+        if shx_path:
+            feature_count = read_shx_feature_count(shx_path)
+        elif dbf_header:
+            feature_count = dbf_header['record_count']
+        else:
+            return None
+
+        return {
+            'shape_type': shp_header['shape_type'],
+            'geometry_type': SHAPE_TYPES[shp_header['shape_type']] if feature_count > 0 else 'Unknown',
+            'bbox': shp_header['bbox'],
+            'z_range': shp_header['z_range'],
+            'feature_count': feature_count,
+            'record_count': dbf_header['record_count'] if dbf_header else feature_count,
+            'fields': dbf_header['fields'] if dbf_header else [],
+            'prj_wkt': read_prj(prj_path) if prj_path else None,
+        }
+    except (OSError, struct.error, ValueError) as e:
+        print(f"Error reading shapefile header {shp_path}: {e}")
+        return None
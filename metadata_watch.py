@@ -0,0 +1,367 @@
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import metadata_extractor_main as extractor
+from metadata_extractor_cli import build_project_metadata, add_fingerprint_arguments
+from metadata_scanner import FileInventory, list_folder, add_folder_listing
+from metadata_fixity import GENERATED_FILE_NAMES
+from metadata_progress import PROGRESS_SINKS, build_progress_reporter
+from config_performance import CACHE_FILE_NAME, WATCH_DEBOUNCE_SECONDS, WATCH_MAX_DELAY_SECONDS, WATCH_POLL_INTERVAL
+
+##################
+##################
+######
+###### Watch mode: keep METADATA.xml current while files arrive
+######
+##################
+##################
+
+# The last listing of every folder in the project. When files change, only the folders they are in are
+# listed again, and the inventory is rebuilt from the stored listings in the same order as scan_directory,
+# so a change costs one folder listing rather than a walk of the whole project.
+class FolderListings:
+    def __init__(self, start_dir):
+        self.start_dir = start_dir
+        self.listings = {}  # Folder path -> (entries, subdirs, records) from list_folder
+
+    def refresh_all(self):
+        self.listings.clear()
+        self.refresh([self.start_dir])
+
+    # List the folders again, along with any subfolders not seen before (new or moved in)
+    def refresh(self, folders):
+        stack = [folder for folder in folders if folder == self.start_dir or folder in self.listings]
+        while stack:
+            folder_path = stack.pop()
+            if not os.path.isdir(folder_path):
+                self.listings.pop(folder_path, None)  # Its parent's new listing no longer points to it
+                continue
+            listing = list_folder(folder_path)
+            self.listings[folder_path] = listing
+            stack.extend(subdir for subdir in listing[1] if subdir not in self.listings)
+
+    def inventory(self):
+        inventory = FileInventory(self.start_dir)
+        reachable = set()
+        stack = [self.start_dir]
+        while stack:
+            folder_path = stack.pop()
+            listing = self.listings.get(folder_path)
+            if listing is None:
+                continue
+            reachable.add(folder_path)
+            entries, subdirs, records = listing
+            add_folder_listing(inventory, folder_path, entries, subdirs, records)
+            stack.extend(reversed(subdirs))
+        # Forget folders that were deleted or moved away
+        for folder_path in [folder for folder in self.listings if folder not in reachable]:
+            del self.listings[folder_path]
+        return inventory
+
+    @property
+    def folders(self):
+        return list(self.listings)
+
+######
+###### Change notification
+######
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+
+# IN_MODIFY keeps the debounce timer running while a large file is still being copied in
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# Linux inotify through ctypes, one watch per folder. wait() returns the folders whose contents changed.
+# Raises OSError when inotify is unavailable (other systems, or the watch limit is reached).
+class InotifyWatcher:
+    def __init__(self, ignored_paths=()):
+        library = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or library is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.libc = ctypes.CDLL(library, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.ignored_paths = set(ignored_paths)
+        self.paths = {}  # wd -> folder path
+        self.watches = {}  # folder path -> wd
+        self.overflowed = False
+
+    # Watch exactly these folders; watches on folders that have gone (or moved) are removed first
+    def sync(self, folders):
+        folders = set(folders)
+        for folder_path in [folder for folder in self.watches if folder not in folders]:
+            wd = self.watches.pop(folder_path)
+            self.paths.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+        for folder_path in folders:
+            if folder_path in self.watches:
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder_path), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # Removed since it was listed; the next event on its parent picks that up
+                raise OSError(error, f"inotify_add_watch failed for {folder_path} (raise fs.inotify.max_user_watches?)")
+            self.watches[folder_path] = wd
+            self.paths[wd] = folder_path
+
+    def wait(self, timeout=None):
+        changed = set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not changed and not self.overflowed:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                break
+            changed.update(self._read_events())
+        return changed
+
+    def _read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True  # Events were lost; the caller lists everything again
+                continue
+            folder_path = self.paths.get(wd)
+            if folder_path is None:
+                continue
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                self.watches.pop(folder_path, None)
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changed.add(os.path.dirname(folder_path))  # The parent's listing shows where it went
+                continue
+            if name and os.path.join(folder_path, os.fsdecode(name)) in self.ignored_paths:
+                continue  # Files this process writes itself
+            changed.add(folder_path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+# For systems (and SMB/NFS shares) without inotify: list every folder each interval and report the folders
+# whose entries, sizes or modification times differ from the previous poll. While debouncing, the quiet
+# period is one poll: wait() with a timeout polls once more and returns nothing if that poll saw no change.
+class PollingWatcher:
+    def __init__(self, listings, interval=WATCH_POLL_INTERVAL, ignored_paths=()):
+        self.start_dir = listings.start_dir
+        self.interval = interval
+        self.ignored_paths = set(ignored_paths)
+        self.overflowed = False
+        self.snapshot = {folder: self._folder_signature(folder, listing) for folder, listing in listings.listings.items()}
+        self.next_poll = time.monotonic() + interval
+
+    def _folder_signature(self, folder_path, listing):
+        entries, _, records = listing
+        return (frozenset(entry for entry in entries if os.path.join(folder_path, entry[0]) not in self.ignored_paths),
+                frozenset((record.path, record.size, record.mtime) for record in records if record.path not in self.ignored_paths))
+
+    def sync(self, folders):
+        pass  # Every poll lists the whole project anyway
+
+    def wait(self, timeout=None):
+        while True:
+            time.sleep(max(self.next_poll - time.monotonic(), 0))
+            self.next_poll = time.monotonic() + self.interval
+            changed = self._poll()
+            if changed or timeout is not None:
+                return changed
+
+    def _poll(self):
+        snapshot = {}
+        stack = [self.start_dir]
+        while stack:
+            folder_path = stack.pop()
+            listing = list_folder(folder_path)
+            snapshot[folder_path] = self._folder_signature(folder_path, listing)
+            stack.extend(listing[1])
+        changed = {folder for folder, signature in snapshot.items() if self.snapshot.get(folder) != signature}
+        changed.update(os.path.dirname(folder) for folder in self.snapshot if folder not in snapshot)
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+######
+###### Watch loop
+######
+
+# Files written by the extractor itself, which must not trigger another update
+def generated_paths(directory, output_dir):
+    paths = set()
+    for name in GENERATED_FILE_NAMES:
+        paths.update((os.path.join(output_dir, name), os.path.join(output_dir, name + '.tmp')))
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        paths.add(os.path.join(directory, CACHE_FILE_NAME + suffix))
+    return paths
+
+def build_watcher(listings, ignored_paths, polling=False, poll_interval=WATCH_POLL_INTERVAL):
+    if not polling:
+        try:
+            watcher = InotifyWatcher(ignored_paths)
+            watcher.sync(listings.folders)
+            return watcher
+        except OSError as e:
+            print(f"inotify unavailable ({e}); polling every {poll_interval}s instead")
+    return PollingWatcher(listings, poll_interval, ignored_paths)
+
+# Collect changes until none have arrived for debounce seconds (or max_delay has passed since the first),
+# so a batch of files copied in together leads to one update once the copy has finished
+def wait_for_changes(watcher, debounce=WATCH_DEBOUNCE_SECONDS, max_delay=WATCH_MAX_DELAY_SECONDS):
+    changed = watcher.wait()
+    first_change = time.monotonic()
+    while True:
+        remaining = min(debounce, max_delay - (time.monotonic() - first_change))
+        if remaining <= 0:
+            return changed
+        more = watcher.wait(remaining)
+        if not more:
+            return changed
+        changed |= more
+
+# Bring METADATA.xml and METADATA_FolderTree.xml up to date with the inventory. Merge mode serves
+# every unchanged file from the existing XML, so only new and changed files go through the extractors.
+# Returns False, leaving the XML alone, when the existing METADATA.xml cannot be read: a curator may be
+# saving it, and extracting over it would lose their edits.
+def update_metadata(directory, inventory, project_metadata, args, progress):
+    try:
+        extractor.run_extraction(
+            directory,
+            project_metadata,
+            output_dir=args.output_dir,
+            inventory=inventory,
+            progress=progress,
+            merge=True,
+            merge_strict=True,
+            fingerprint=args.fingerprint or args.checksum_all,
+            checksum_all=args.checksum_all,
+            fingerprint_workers=args.hash_workers,
+            fixity=args.fixity,
+        )
+    except (ET.ParseError, OSError) as e:
+        print(f"{datetime.now():%H:%M:%S} Update skipped, retrying after the next quiet period: {e}")
+        return False
+    finally:
+        progress.close()
+    return True
+
+def watch(directory, project_metadata, args):
+    output_dir = args.output_dir or directory
+    listings = FolderListings(directory)
+    listings.refresh_all()
+
+    # Watching starts before the first update, so files arriving while it runs are picked up afterwards
+    watcher = build_watcher(listings, generated_paths(directory, output_dir), args.poll, args.poll_interval)
+    try:
+        up_to_date = update_metadata(directory, listings.inventory(), project_metadata, args,
+                                     build_progress_reporter(args.progress, args.progress_file))
+        if up_to_date:
+            project_metadata = None
+            print(f"{datetime.now():%H:%M:%S} Metadata up to date; watching {directory} (Ctrl+C to stop)")
+
+        pending = set()  # Folders changed since the last successful update
+        while True:
+            if up_to_date:
+                changed = wait_for_changes(watcher, args.debounce, args.max_delay)
+            else:
+                # A failed update is retried after one debounce period, with or without new changes
+                changed = watcher.wait(args.debounce)
+            pending |= changed
+            start_time = time.perf_counter()
+            if watcher.overflowed:
+                watcher.overflowed = False
+                listings.refresh_all()
+            else:
+                listings.refresh(changed)
+            inventory = listings.inventory()
+            watcher.sync(listings.folders)
+            # Project fields are only applied once they have been written; afterwards they come from the merged XML
+            up_to_date = update_metadata(directory, inventory, project_metadata, args,
+                                         build_progress_reporter(args.progress, args.progress_file))
+            if up_to_date:
+                project_metadata = None
+                print(f"{datetime.now():%H:%M:%S} Updated after changes in {len(pending)} folder(s): "
+                      f"{len(inventory.files)} files in {time.perf_counter() - start_time:.1f}s")
+                pending.clear()
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        watcher.close()
+    return 0
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Keep METADATA.xml and METADATA_FolderTree.xml up to date while files are added, changed or removed.")
+    parser.add_argument('project_dir', help="Project directory to watch")
+    parser.add_argument('--metadata', metavar='FILE', help="JSON or YAML file with the project metadata fields")
+    parser.add_argument('--field', metavar='KEY=VALUE', action='append', default=[],
+                        help="Set a project metadata field (repeatable, overrides --metadata)")
+    parser.add_argument('--output-dir', metavar='DIR', help="Where to write the XML files (default: the project directory)")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE_SECONDS,
+                        help=f"Seconds without changes before updating (default: {WATCH_DEBOUNCE_SECONDS})")
+    parser.add_argument('--max-delay', type=float, default=WATCH_MAX_DELAY_SECONDS,
+                        help=f"Update at least this many seconds after the first change (default: {WATCH_MAX_DELAY_SECONDS})")
+    parser.add_argument('--poll', action='store_true', help="Poll instead of using inotify (e.g. for SMB/NFS shares)")
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_INTERVAL,
+                        help=f"Seconds between polls (default: {WATCH_POLL_INTERVAL})")
+    add_fingerprint_arguments(parser)
+    parser.add_argument('--progress', choices=['none'] + list(PROGRESS_SINKS), default='none',
+                        help="Where to send progress events for each update (default: none)")
+    parser.add_argument('--progress-file', metavar='FILE', help="Append --progress jsonl events to FILE instead of stdout")
+    return parser
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.project_dir):
+        parser.error(f"project directory not found: {args.project_dir}")
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        parser.error(f"output directory not found: {args.output_dir}")
+    project_metadata = None
+    if args.metadata or args.field:
+        try:
+            project_metadata = extractor.project_metadata_element(build_project_metadata(args.metadata, args.field))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    return watch(args.project_dir, project_metadata, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import os
+import xml.etree.ElementTree as ET
+
+##################
+##################
+######
+###### Streaming XML writer
+######
+##################
+##################
+
+# Build a <File> element from an extractor's metadata dictionary
+def metadata_element(metadata, tag="File", attrib=None):
+    element = ET.Element(tag, attrib or {})
+    for key, value in metadata.items():
+        ET.SubElement(element, key).text = str(value)
+    return element
+
+# ElementTree's own start tag for an element, so streamed output matches ElementTree.write
+def _start_tag(tag, attrib):
+    empty_tag = ET.tostring(ET.Element(tag, attrib), encoding='unicode')  # '<tag a="b" />'
+    return empty_tag[:-3] + '>'
+
+# Writes an XML file element by element instead of building the whole tree in memory.
+# The output is byte-for-byte what ElementTree.write(encoding='utf-8', xml_declaration=True)
+# would produce for the same tree, including self-closing tags for empty elements.
+class StreamingXMLWriter:
+    def __init__(self, file_path, root_tag, root_attrib=None):
+        self.file_path = file_path
+        self.temp_path = file_path + '.tmp'  # Only replaces the real file once writing succeeds
+        self.file = open(self.temp_path, 'w', encoding='utf-8')
+        self.file.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        self.open_elements = []  # [tag, start tag text, has_children]
+        self.start(root_tag, root_attrib)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # Start tags are held back until the first child arrives, so empty elements can self-close
+    def _flush_open_tags(self):
+        for open_element in self.open_elements:
+            if not open_element[2]:
+                self.file.write(open_element[1])
+                open_element[2] = True
+
+    def start(self, tag, attrib=None):
+        self._flush_open_tags()
+        self.open_elements.append([tag, _start_tag(tag, attrib or {}), False])
+
+    def end(self):
+        tag, start_tag, has_children = self.open_elements.pop()
+        if has_children:
+            self.file.write(f"</{tag}>")
+        else:
+            self.file.write(start_tag[:-1] + " />")
+
+    # Write a complete element (and its children) under the currently open element
+    def write_element(self, element):
+        self._flush_open_tags()
+        self.file.write(ET.tostring(element, encoding='unicode'))
+
+    def write_metadata(self, metadata, tag="File", attrib=None):
+        self.write_element(metadata_element(metadata, tag, attrib))
+
+    # Write one section element containing a <File> per metadata dictionary
+    def write_section(self, section_tag, metadata_records):
+        self.start(section_tag)
+        for metadata in metadata_records:
+            self.write_metadata(metadata)
+        self.end()
+
+    def close(self):
+        while self.open_elements:
+            self.end()
+        self.file.close()
+        os.replace(self.temp_path, self.file_path)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.temp_path)
@@ -1,8 +1,6 @@
 ## version 3.2 of the folder structure.
 
 import os
-import tkinter as tk
-from tkinter import ttk, filedialog
 
 # The directory structure
 directory_structure = {
@@ -127,58 +125,75 @@ def create_directory_structure(base_path, directory_structure):
         if subdirectories:
             create_directory_structure(current_path, subdirectories)
 
-def create_project_structure():
-    # Get values from entry widgets
-    top_level_folder_name = top_level_folder_name_entry.get()
-
-    # Ask the user to select the project location
-    project_location = filedialog.askdirectory()
-    if not project_location:
-        return  # User canceled the selection
-
-    # Create the top-level folder
-    top_level_folder = os.path.join(project_location, top_level_folder_name)
-    os.makedirs(top_level_folder, exist_ok=True)
-
-    # Create the directory structure
-    create_directory_structure(top_level_folder, directory_structure)
-
-    # Display the completion message in a window
-    completion_message = f"Project folder structure created successfully under {top_level_folder}"
-    result_label.config(text=completion_message)
-
-def close_window():
-    root.destroy()
-
-# Create a tkinter window
-root = tk.Tk()
-root.title("Folder Structure Creator")
-root.geometry("400x400")
-
-# Set the style
-style = ttk.Style()
-style.theme_use('default')  # Or try 'alt', 'default', 'classic', 'vista'
-style.configure('TButton', font=('Helvetica', 12), padding=6)
-style.configure('TLabel', font=('Helvetica', 12), background='#f0f0f0')
-style.configure('TFrame', background='#f0f0f0')
-
-# Create and place labels and entry widgets
-top_level_folder_name_label = ttk.Label(root, text="Enter the top-level folder name:")
-top_level_folder_name_label.pack(pady=10)
-top_level_folder_name_entry = ttk.Entry(root)
-top_level_folder_name_entry.pack()
-
-# Create a button to trigger folder structure creation
-create_button = ttk.Button(root, text="Create Folder Structure", command=create_project_structure)
-create_button.pack(pady=20)
-
-# Create a label to display the completion message
-result_label = ttk.Label(root, text="", background='#f0f0f0')
-result_label.pack()
-
-# Create a button to close the window
-close_button = ttk.Button(root, text="Close", command=close_window)
-close_button.pack()
-
-# Start the tkinter main loop
-root.mainloop()
\ No newline at end of file
+# The GUI is only built when main() runs, so the structure can be imported (e.g. by benchmarks/)
+# and MainMenu can open the window without starting another Python process. From the menu, parent is
+# the menu's window and the form opens as a Toplevel of it.
+def main(parent=None):
+    import tkinter as tk
+    from tkinter import ttk, filedialog
+
+    # Each window keeps its own widgets, so forms opened from the menu do not share state
+    class FolderStructureCreator:
+        def __init__(self, root):
+            self.root = root
+
+            # Set the style
+            style = ttk.Style()
+            style.theme_use('default')  # Or try 'alt', 'default', 'classic', 'vista'
+            style.configure('TButton', font=('Helvetica', 12), padding=6)
+            style.configure('TLabel', font=('Helvetica', 12), background='#f0f0f0')
+            style.configure('TFrame', background='#f0f0f0')
+
+            # Create and place labels and entry widgets
+            top_level_folder_name_label = ttk.Label(root, text="Enter the top-level folder name:")
+            top_level_folder_name_label.pack(pady=10)
+            self.top_level_folder_name_entry = ttk.Entry(root)
+            self.top_level_folder_name_entry.pack()
+
+            # Create a button to trigger folder structure creation
+            create_button = ttk.Button(root, text="Create Folder Structure", command=self.create_project_structure)
+            create_button.pack(pady=20)
+
+            # Create a label to display the completion message
+            self.result_label = ttk.Label(root, text="", background='#f0f0f0')
+            self.result_label.pack()
+
+            # Create a button to close the window
+            close_button = ttk.Button(root, text="Close", command=self.close_window)
+            close_button.pack()
+
+        def create_project_structure(self):
+            # Get values from entry widgets
+            top_level_folder_name = self.top_level_folder_name_entry.get()
+
+            # Ask the user to select the project location
+            project_location = filedialog.askdirectory(parent=self.root)
+            if not project_location:
+                return  # User canceled the selection
+
+            # Create the top-level folder
+            top_level_folder = os.path.join(project_location, top_level_folder_name)
+            os.makedirs(top_level_folder, exist_ok=True)
+
+            # Create the directory structure
+            create_directory_structure(top_level_folder, directory_structure)
+
+            # Display the completion message in a window
+            completion_message = f"Project folder structure created successfully under {top_level_folder}"
+            self.result_label.config(text=completion_message)
+
+        def close_window(self):
+            self.root.destroy()
+
+    # Create a tkinter window
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
+    root.title("Folder Structure Creator")
+    root.geometry("400x400")
+    app = FolderStructureCreator(root)
+
+    # Start the tkinter main loop; from the menu, the menu's loop already runs
+    if parent is None:
+        root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,8 @@
 import os
-import tkinter as tk
-from tkinter import ttk, filedialog
 
-def create_project_structure():
-    # Get values from entry widgets
-    project_name = project_name_entry.get()
-    project_year = project_year_entry.get()
-    survey_name = survey_name_entry.get()
-    survey_year = survey_year_entry.get()
-
-
-    # Ask the user to select the project location
-    project_location = filedialog.askdirectory()
-    if not project_location:
-        return  # User canceled the selection
-
-    # Define the project structure
-    project_structure = {
+# The folder structure for one geophysics survey
+def geophys_project_structure(project_name, project_year, survey_name, survey_year):
+    return {
         f"{project_name}_{project_year}": {
             f"{survey_name}_{survey_year}": {
                 "GEOPHYS_Data": {
@@ -37,69 +23,100 @@ def create_project_structure():
         }
     }
 
-    # Function to create directories from the nested dictionary
-    def create_directories(base_path, structure):
-        for key, value in structure.items():
-            new_path = os.path.join(base_path, key)
-            os.makedirs(new_path, exist_ok=True)
-            if isinstance(value, dict):
-                create_directories(new_path, value)
-
-    # Create directories based on the project structure
-    create_directories(project_location, project_structure)
-
-    # Display the completion message in a window
-    completion_message = "Project folder structure created successfully"
-    result_label.config(text=completion_message)
-
-def close_window():
-    root.destroy()
-
-# Create a tkinter window
-root = tk.Tk()
-root.title("Folder Structure Creator")
-root.geometry("400x300")
-
-# Set the style
-style = ttk.Style()
-style.theme_use('default')  # Or try 'alt', 'default', 'classic', 'vista'
-style.configure('TButton', font=('Helvetica', 12), padding=6)
-style.configure('TLabel', font=('Helvetica', 12), background='#f0f0f0')
-style.configure('TFrame', background='#f0f0f0')
-
-# Create and place labels and entry widgets
-survey_name_label = ttk.Label(root, text="Enter the top-level folder name (i.e. the broader project):")
-survey_name_label.pack(pady=10)
-survey_name_entry = ttk.Entry(root)
-survey_name_entry.pack()
-
-survey_year_label = ttk.Label(root, text="Enter the year of the project:")
-survey_year_label.pack()
-survey_year_entry = ttk.Entry(root)
-survey_year_entry.pack()
-
-project_name_label = ttk.Label(root, text="Enter the site/survey name:")
-project_name_label.pack(pady=10)
-project_name_entry = ttk.Entry(root)
-project_name_entry.pack()
-
-project_year_label = ttk.Label(root, text="Enter the year of the survey:")
-project_year_label.pack()
-project_year_entry = ttk.Entry(root)
-project_year_entry.pack()
-
-# Create a button to trigger folder structure creation
-create_button = ttk.Button(root, text="Create Folder Structure", command=create_project_structure)
-create_button.pack(pady=20)
-
-# Create a label to display the completion message
-result_label = ttk.Label(root, text="", background='#f0f0f0')
-result_label.pack()
-
-# Create a button to close the window
-close_button = ttk.Button(root, text="Close", command=close_window)
-close_button.pack()
-
-
-# Start the tkinter main loop
-root.mainloop()
+# Function to create directories from the nested dictionary
+def create_directories(base_path, structure):
+    for key, value in structure.items():
+        new_path = os.path.join(base_path, key)
+        os.makedirs(new_path, exist_ok=True)
+        if isinstance(value, dict):
+            create_directories(new_path, value)
+
+# The GUI is only built when main() runs, so the structure can be imported (e.g. by benchmarks/)
+# and MainMenu can open the window without starting another Python process. From the menu, parent is
+# the menu's window and the form opens as a Toplevel of it.
+def main(parent=None):
+    import tkinter as tk
+    from tkinter import ttk, filedialog
+
+    # Each window keeps its own widgets, so forms opened from the menu do not share state
+    class FolderStructureCreator:
+        def __init__(self, root):
+            self.root = root
+
+            # Set the style
+            style = ttk.Style()
+            style.theme_use('default')  # Or try 'alt', 'default', 'classic', 'vista'
+            style.configure('TButton', font=('Helvetica', 12), padding=6)
+            style.configure('TLabel', font=('Helvetica', 12), background='#f0f0f0')
+            style.configure('TFrame', background='#f0f0f0')
+
+            # Create and place labels and entry widgets
+            survey_name_label = ttk.Label(root, text="Enter the top-level folder name (i.e. the broader project):")
+            survey_name_label.pack(pady=10)
+            self.survey_name_entry = ttk.Entry(root)
+            self.survey_name_entry.pack()
+
+            survey_year_label = ttk.Label(root, text="Enter the year of the project:")
+            survey_year_label.pack()
+            self.survey_year_entry = ttk.Entry(root)
+            self.survey_year_entry.pack()
+
+            project_name_label = ttk.Label(root, text="Enter the site/survey name:")
+            project_name_label.pack(pady=10)
+            self.project_name_entry = ttk.Entry(root)
+            self.project_name_entry.pack()
+
+            project_year_label = ttk.Label(root, text="Enter the year of the survey:")
+            project_year_label.pack()
+            self.project_year_entry = ttk.Entry(root)
+            self.project_year_entry.pack()
+
+            # Create a button to trigger folder structure creation
+            create_button = ttk.Button(root, text="Create Folder Structure", command=self.create_project_structure)
+            create_button.pack(pady=20)
+
+            # Create a label to display the completion message
+            self.result_label = ttk.Label(root, text="", background='#f0f0f0')
+            self.result_label.pack()
+
+            # Create a button to close the window
+            close_button = ttk.Button(root, text="Close", command=self.close_window)
+            close_button.pack()
+
+        def create_project_structure(self):
+            # Get values from entry widgets
+            project_name = self.project_name_entry.get()
+            project_year = self.project_year_entry.get()
+            survey_name = self.survey_name_entry.get()
+            survey_year = self.survey_year_entry.get()
+
+            # Ask the user to select the project location
+            project_location = filedialog.askdirectory(parent=self.root)
+            if not project_location:
+                return  # User canceled the selection
+
+            # Define the project structure
+            project_structure = geophys_project_structure(project_name, project_year, survey_name, survey_year)
+
+            # Create directories based on the project structure
+            create_directories(project_location, project_structure)
+
+            # Display the completion message in a window
+            completion_message = "Project folder structure created successfully"
+            self.result_label.config(text=completion_message)
+
+        def close_window(self):
+            self.root.destroy()
+
+    # Create a tkinter window
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
+    root.title("Folder Structure Creator")
+    root.geometry("400x300")
+    app = FolderStructureCreator(root)
+
+    # Start the tkinter main loop; from the menu, the menu's loop already runs
+    if parent is None:
+        root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests live one level below the scripts they test
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,69 @@
+import os
+import xml.etree.ElementTree as ET
+
+from metadata_extractor_main import project_metadata_element, run_extraction
+
+# Plain text files only go through the Other_Files extractor, so these runs need none of the optional libraries
+
+def make_project(tmp_path):
+    project_dir = tmp_path / "project"
+    (project_dir / "DOCUMENTS_Reports").mkdir(parents=True)
+    (project_dir / "DOCUMENTS_Reports" / "kept.txt").write_text("unchanged")
+    (project_dir / "DOCUMENTS_Reports" / "changed.txt").write_text("first")
+    return project_dir
+
+def extract(project_dir, output_dir):
+    xml_path, _, _ = run_extraction(str(project_dir), project_metadata_element({'Title': 'Merge test'}),
+                                    output_dir=str(output_dir), use_cache=False, merge=True)
+    return xml_path
+
+def other_files(xml_path):
+    section = ET.parse(xml_path).getroot().find('Other_Files_Metadata')
+    return {os.path.basename(element.get('path')): element for element in section.findall('File')}
+
+# Edit fields the way metadata_edit.py does: change the child text and write the tree back
+def curate(xml_path, edits):
+    tree = ET.parse(xml_path)
+    for element in tree.getroot().iter('File'):
+        for tag, value in edits.get(os.path.basename(element.get('path')), {}).items():
+            element.find(tag).text = value
+    tree.write(xml_path, encoding='utf-8', xml_declaration=True)
+
+def test_manual_field_survives_rerun(tmp_path):
+    project_dir = make_project(tmp_path)
+    xml_path = extract(project_dir, tmp_path)
+    curate(xml_path, {'kept.txt': {'FILE_KEYWORDS': 'ditch, pottery', 'FILE_COPYRIGHT': 'Site archive'}})
+
+    extract(project_dir, tmp_path)
+
+    kept = other_files(xml_path)['kept.txt']
+    assert kept.findtext('FILE_KEYWORDS') == 'ditch, pottery'
+    assert kept.findtext('FILE_COPYRIGHT') == 'Site archive'
+    assert ET.parse(xml_path).getroot().find('Project_Level').findtext('Title') == 'Merge test'
+
+def test_changed_file_is_reextracted(tmp_path):
+    project_dir = make_project(tmp_path)
+    xml_path = extract(project_dir, tmp_path)
+    # FILE_EXTENSION is not a manual field, so a re-extraction overwrites the edit
+    curate(xml_path, {name: {'FILE_KEYWORDS': 'survey', 'FILE_EXTENSION': 'edited'} for name in ('kept.txt', 'changed.txt')})
+    (project_dir / "DOCUMENTS_Reports" / "changed.txt").write_text("second, longer version")
+
+    extract(project_dir, tmp_path)
+
+    files = other_files(xml_path)
+    changed = files['changed.txt']
+    assert changed.get('size') == str(len("second, longer version"))
+    assert changed.findtext('FILE_EXTENSION') == '.txt'
+    assert changed.findtext('FILE_KEYWORDS') == 'survey'
+    # The unchanged file is written back as curated
+    assert files['kept.txt'].findtext('FILE_EXTENSION') == 'edited'
+
+def test_deleted_file_is_dropped(tmp_path):
+    project_dir = make_project(tmp_path)
+    xml_path = extract(project_dir, tmp_path)
+    curate(xml_path, {'changed.txt': {'FILE_KEYWORDS': 'survey'}})
+    os.remove(project_dir / "DOCUMENTS_Reports" / "changed.txt")
+
+    extract(project_dir, tmp_path)
+
+    assert sorted(other_files(xml_path)) == ['kept.txt']
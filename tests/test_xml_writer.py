@@ -0,0 +1,49 @@
+import xml.etree.ElementTree as ET
+
+from metadata_xml_writer import StreamingXMLWriter, metadata_element
+
+RECORDS = [
+    {'FILE_NAME': 'trench <1> & "fill"', 'FILE_SIZE': 1.5, 'FILE_KEYWORDS': ''},
+    {'FILE_NAME': 'Ångström café', 'FILE_PATH': '/data/site/photo.jpg'},
+]
+
+def build_tree():
+    root = ET.Element('CombinedMetadata')
+    project = ET.SubElement(root, 'Project_Level')
+    ET.SubElement(project, 'Title').text = 'Test project'
+    section = ET.SubElement(root, 'Other_Files_Metadata')
+    for metadata in RECORDS:
+        section.append(metadata_element(metadata))
+    ET.SubElement(root, 'Geospatial_Files')  # Empty section
+    folder = ET.SubElement(root, 'FOLDER', {'name': 'DATA & "Geodata"'})
+    ET.SubElement(folder, 'FOLDER', {'name': 'empty'})
+    return root
+
+def test_streamed_output_matches_elementtree(tmp_path):
+    expected_path = tmp_path / "expected.xml"
+    ET.ElementTree(build_tree()).write(expected_path, encoding='utf-8', xml_declaration=True)
+
+    streamed_path = tmp_path / "streamed.xml"
+    with StreamingXMLWriter(str(streamed_path), 'CombinedMetadata') as writer:
+        project = ET.Element('Project_Level')
+        ET.SubElement(project, 'Title').text = 'Test project'
+        writer.write_element(project)
+        writer.write_section('Other_Files_Metadata', RECORDS)
+        writer.write_section('Geospatial_Files', [])
+        writer.start('FOLDER', {'name': 'DATA & "Geodata"'})
+        writer.start('FOLDER', {'name': 'empty'})
+        writer.end()
+        writer.end()
+
+    assert streamed_path.read_bytes() == expected_path.read_bytes()
+
+def test_failed_write_leaves_no_file(tmp_path):
+    output_path = tmp_path / "METADATA.xml"
+    try:
+        with StreamingXMLWriter(str(output_path), 'CombinedMetadata') as writer:
+            writer.write_section('Other_Files_Metadata', RECORDS)
+            raise RuntimeError("extractor failed")
+    except RuntimeError:
+        pass
+    assert not output_path.exists()
+    assert list(tmp_path.iterdir()) == []